@@ -12,5 +12,14 @@ class ProfileAdmin(admin.ModelAdmin):
     search_fields = ('nickname', 'user__username', 'user__email')
     list_filter = ('gender', 'looking_for', 'brain_type')
 
+    def save_model(self, request, obj, form, change):
+        # Full saves leave lore_score to the ledger, so an edited score is
+        # applied as an adjustment by the difference from what was shown
+        super().save_model(request, obj, form, change)
+        if change and 'lore_score' in form.changed_data:
+            from .lore import adjust_lore
+            adjust_lore(obj.user_id, form.cleaned_data['lore_score'] - form.initial['lore_score'])
+            obj.refresh_from_db(fields=['lore_score'])
+
 admin.site.register(User, ImprovedUserAdmin)
 admin.site.register(Profile, ProfileAdmin)
@@ -1,3 +1,4 @@
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 import uuid
 from rest_framework import viewsets, permissions, status
@@ -5,16 +6,22 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.throttling import UserRateThrottle
 from .models import User, Profile
 from .serializers import UserSerializer, ProfileSerializer
-from .utils import generate_thematic_nickname
+from .nicknames import NicknamesExhausted, allocate_nickname
+from .lore import award_lore
 from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from allauth.socialaccount.providers.oauth2.client import OAuth2Client
 from dj_rest_auth.registration.views import SocialLoginView
 
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+from . import me_cache
+from .bootstrap import bootstrap_user, daily_check_in, ensure_profile, login_payload
+from .google_auth import verify_google_id_token
+
+class NicknameRateThrottle(UserRateThrottle):
+    scope = 'generate_nickname'
+
 
 class GoogleLogin(APIView):
     permission_classes = [AllowAny]
@@ -26,30 +33,9 @@ class GoogleLogin(APIView):
             return Response({'error': 'No token provided'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Verify the Google ID token
-            # Accept multiple client IDs (localhost + Vercel)
-            ALLOWED_CLIENT_IDS = [
-                '482173332213-f7jpvem0soc2dgobvajsev1t0okk1avl.apps.googleusercontent.com',  # Original (localhost)
-                '482173332213-69fdrbrg42vduu7j80k0q5cguldjg5uk.apps.googleusercontent.com',  # Vercel (Corrected based on error)
-            ]
-            
-            idinfo = None
-            verification_errors = []
-            for client_id in ALLOWED_CLIENT_IDS:
-                try:
-                    idinfo = id_token.verify_oauth2_token(
-                        token, 
-                        google_requests.Request(), 
-                        client_id
-                    )
-                    break
-                except ValueError as e:
-                    verification_errors.append(str(e))
-                    continue
-            
-            if not idinfo:
-                print(f"Auth DEBUG: Verification failed. Errors: {verification_errors}")
-                return Response({'error': f'Invalid token: Could not verify with any client ID. Last error: {verification_errors[-1] if verification_errors else "Unknown"}'}, status=status.HTTP_400_BAD_REQUEST)
+            # One signature check against cached keys; `aud` may be any of
+            # settings.GOOGLE_OAUTH_CLIENT_IDS (localhost, Vercel)
+            idinfo = verify_google_id_token(token)
             
             # Extract user info
             email = idinfo.get('email')
@@ -57,32 +43,9 @@ class GoogleLogin(APIView):
             if not email:
                 return Response({'error': 'Email not found in token'}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Get or create user
-            user, created = User.objects.get_or_create(
-                email=email,
-                defaults={
-                    'username': email.split('@')[0],
-                    'is_verified': True
-                }
-            )
-            
-            # Mark as verified if existing user
-            if not created and not user.is_verified:
-                user.is_verified = True
-                user.save()
-            
-            # Create profile if needed
-            profile, _ = Profile.objects.get_or_create(user=user)
-            
-            # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
-            
-            return Response({
-                'access': str(refresh.access_token),
-                'refresh': str(refresh),
-                'user': UserSerializer(user).data,
-                'is_new_user': created or not profile.nickname
-            })
+            # User + profile in one round trip (created together on first login)
+            user, profile, created = bootstrap_user(email, verified=True)
+            return Response(login_payload(user, profile, is_new_user=created))
             
         except ValueError as e:
             return Response({'error': f'Invalid token: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
@@ -104,49 +67,29 @@ class AuthViewSet(viewsets.ViewSet):
         if not email or not password:
             return Response({'error': 'Email and password required'}, status=status.HTTP_400_BAD_REQUEST)
             
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
-            
-        if not user.check_password(password):
+        user = User.objects.select_related('profile').filter(email=email).first()
+        if user is None or not user.check_password(password):
             return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
-            
-            
-        # Ensure profile exists
-        Profile.objects.get_or_create(user=user)
-        
-        # Reward Lore for daily login
-        profile = user.profile
-        meta = profile.lore_meta or {}
-        today = timezone.now().date().isoformat()
-        if meta.get('daily_login') != today:
-            profile.lore_score += 2
-            meta['daily_login'] = today
-            profile.lore_meta = meta
-            profile.save(update_fields=['lore_score', 'lore_meta'])
-
-        refresh = RefreshToken.for_user(user)
-        return Response({
-            'refresh': str(refresh),
-            'access': str(refresh.access_token),
-            'user': UserSerializer(user).data,
-            'is_new_user': not bool(user.profile.nickname)
-        })
+
+        profile = ensure_profile(user)
+        daily_check_in(user, profile)
+        return Response(login_payload(user, profile))
 
     @action(detail=False, methods=['post'])
     def verify_otp(self, request):
         return Response({'error': 'OTP verification is disabled. Use Google Sign-In.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated],
+            throttle_classes=[NicknameRateThrottle])
     def generate_nickname(self, request):
-        # Retry up to 5 times to ensure uniqueness if needed, 
-        # though collisions are extremely unlikely with 2-4 digit numbers
-        for _ in range(5):
-            nickname = generate_thematic_nickname()
-            if not Profile.objects.filter(nickname=nickname).exists():
-                return Response({'nickname': nickname})
-        return Response({'nickname': generate_thematic_nickname()})
+        # Next name from the shuffled nickname sequence; never handed out
+        # before and not held by any profile. Every call uses up a name, so
+        # it needs a login and is rate limited.
+        try:
+            return Response({'nickname': allocate_nickname()})
+        except NicknamesExhausted:
+            return Response({'error': 'No thematic nicknames are left; pick your own'},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.all()
@@ -158,6 +101,55 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(request.user)
         return Response(serializer.data)
 
+class LeaderboardViewSet(viewsets.ViewSet):
+    """
+    GET /api/leaderboard/?scope=global|campus|weekly&limit=100
+    Top of the chosen Lore board plus the viewer's own rank.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    SCOPES = ('global', 'campus', 'weekly')
+
+    def list(self, request):
+        from .leaderboard import get_leaderboard
+
+        kind = request.query_params.get('scope', 'global')
+        if kind not in self.SCOPES:
+            return Response({"error": f"scope must be one of {', '.join(self.SCOPES)}"}, status=400)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 100)), 1), 100)
+        except ValueError:
+            return Response({"error": "limit must be a number"}, status=400)
+
+        campus = Profile.objects.filter(user=request.user).values_list('campus', flat=True).first()
+        board = get_leaderboard()
+        scope = board.scope(kind, campus=campus)
+        standings = board.standings(scope, limit)
+
+        profiles = {
+            str(row['user_id']): row for row in
+            Profile.objects.filter(user_id__in=[user_id for _, user_id, _ in standings])
+            .values('user_id', 'nickname', 'avatar_emoji', 'campus')
+        }
+        me = str(request.user.pk)
+        results = [
+            {
+                'rank': rank,
+                'nickname': profiles[user_id]['nickname'],
+                'avatar_emoji': profiles[user_id]['avatar_emoji'],
+                'campus': profiles[user_id]['campus'],
+                'score': score,
+                'is_me': user_id == me,
+            }
+            for rank, user_id, score in standings if user_id in profiles
+        ]
+        mine = board.rank_of(scope, me)
+        return Response({
+            'scope': kind,
+            'results': results,
+            'me': {'rank': mine[0], 'score': mine[1]} if mine else None,
+            'total': board.size(scope),
+        })
+
 class ProfileViewSet(viewsets.ModelViewSet):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
@@ -168,37 +160,40 @@ class ProfileViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get', 'patch'])
     def me(self, request):
-        profile, created = Profile.objects.get_or_create(user=request.user)
-        
-        # Check for daily streak/lore update
-        streak_increased = profile.update_streak()
-        
-        # Consolidation of lore rewards for daily check-in
-        # (Only reward if they haven't been rewarded today via lore_meta)
-        meta = profile.lore_meta or {}
-        today = timezone.now().date().isoformat()
-        if meta.get('daily_login') != today:
-            profile.lore_score += 2
-            meta['daily_login'] = today
-            profile.lore_meta = meta
-            profile.save(update_fields=['lore_score', 'lore_meta'])
-
         if request.method == 'PATCH':
+            profile, created = Profile.objects.get_or_create(user=request.user)
             # Reward +1 Lore for completing profile setup (first time nickname is set)
+            awarded = 0
             if 'nickname' in request.data and not profile.nickname:
                 profile.nickname = request.data['nickname']
-                profile.lore_score += 1
-                profile.save(update_fields=['nickname', 'lore_score'])
+                try:
+                    with transaction.atomic():
+                        profile.save(update_fields=['nickname'])
+                except IntegrityError:
+                    return Response({'error': 'That nickname is already taken'}, status=status.HTTP_400_BAD_REQUEST)
+                awarded = award_lore(request.user, 'profile_setup')
                 
             serializer = self.get_serializer(profile, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
+            if awarded:
+                profile.refresh_from_db(fields=['lore_score'])
             return Response(serializer.data)
-        
-        serializer = self.get_serializer(profile)
-        data = serializer.data
-        data['streak_increased'] = streak_increased
-        return Response(data)
+
+        # Polled on every page load: once today's check-in is recorded this
+        # is served from the per-user cache without touching the database
+        today = timezone.localdate()
+        data = me_cache.get(request.user.pk)
+        streak_increased = False
+        if data is None or data['last_checkin_date'] != today.isoformat():
+            profile, created = Profile.objects.get_or_create(user=request.user)
+            streak_increased = profile.check_in(today)
+            # Lore for the daily check-in (once per day, enforced by the ledger)
+            if streak_increased and award_lore(request.user, 'daily_login'):
+                profile.refresh_from_db(fields=['lore_score'])
+            data = self.get_serializer(profile).data
+            me_cache.store(request.user.pk, dict(data))
+        return Response({**data, 'streak_increased': streak_increased})
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -0,0 +1,98 @@
+"""
+Login bootstrap shared by Google Sign-In and password login.
+
+A returning user costs one SELECT (user joined to profile) plus the
+daily-login reward. That reward is a single ledger read once it has been
+claimed for the day, so repeat logins do no writes. A first login creates
+the user and profile in one transaction.
+
+The response carries tokens and a slim user (the fields the app shell
+needs to route and render its header); the client loads the full profile
+from /profiles/me/ afterwards.
+"""
+import secrets
+
+from django.db import IntegrityError, transaction
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .lore import award_lore
+from .models import Profile, User
+
+SIGNUP_ATTEMPTS = 3
+
+
+def _free_username(email):
+    base = email.split('@')[0][:140]
+    if not User.objects.filter(username=base).exists():
+        return base
+    return f'{base}{secrets.randbelow(10 ** 6):06d}'
+
+
+def bootstrap_user(email, verified=False):
+    """
+    Return (user, profile, created) for `email` with today's login Lore
+    claimed. A first login creates user, profile and reward in one
+    transaction. `verified` marks the account verified, e.g. when Google
+    vouched for the address.
+    """
+    user = User.objects.select_related('profile').filter(email=email).first()
+    attempts = 0
+    while user is None:
+        try:
+            with transaction.atomic():
+                user = User.objects.create(email=email, username=_free_username(email), is_verified=verified)
+                profile = Profile.objects.create(user=user)
+                daily_check_in(user, profile)
+            return user, profile, True
+        except IntegrityError:
+            attempts += 1
+            # Either a parallel login for the same email created it first, or
+            # another signup took the username we picked and we pick again
+            user = User.objects.select_related('profile').filter(email=email).first()
+            if user is None and attempts == SIGNUP_ATTEMPTS:
+                raise
+
+    if verified and not user.is_verified:
+        User.objects.filter(pk=user.pk, is_verified=False).update(is_verified=True)
+        user.is_verified = True
+    profile = ensure_profile(user)
+    daily_check_in(user, profile)
+    return user, profile, False
+
+
+def ensure_profile(user):
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        profile, _ = Profile.objects.get_or_create(user=user)
+        return profile
+
+
+def daily_check_in(user, profile):
+    """Claim today's login Lore (once per day, enforced by the ledger) and mirror it on `profile`."""
+    points = award_lore(user, 'daily_login')
+    profile.lore_score += points
+    return points
+
+
+def login_payload(user, profile, is_new_user=False):
+    refresh = RefreshToken.for_user(user)
+    return {
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+        'user': {
+            'id': str(user.pk),
+            'username': user.username,
+            'email': user.email,
+            'is_verified': user.is_verified,
+            'profile': {
+                'id': profile.pk,
+                'nickname': profile.nickname,
+                'avatar_emoji': profile.avatar_emoji,
+                'avatar_config': profile.avatar_config,
+                'lore_score': profile.lore_score,
+                'is_developer': profile.is_developer,
+            },
+        },
+        'is_new_user': is_new_user or not profile.nickname,
+    }
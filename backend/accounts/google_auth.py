@@ -0,0 +1,134 @@
+"""
+Google ID-token verification.
+
+Google rotates its signing keys every few days and publishes them as a JWK
+set with a Cache-Control max-age. `GoogleKeySet` keeps the parsed keys for
+exactly that long and refreshes them through one pooled requests.Session, so
+a login normally does no network I/O at all. A token is verified with a
+single signature check; its `aud` only has to match one of
+settings.GOOGLE_OAUTH_CLIENT_IDS.
+
+An unknown `kid` (keys rotated before our copy expired) triggers an early
+refresh, at most once every MIN_REFRESH_INTERVAL so junk tokens can't turn
+into a stream of requests to Google.
+"""
+import re
+import threading
+import time
+
+import jwt
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+DEFAULT_MAX_AGE = 300
+MIN_REFRESH_INTERVAL = 30
+CLOCK_SKEW = 10
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+class InvalidGoogleToken(ValueError):
+    pass
+
+
+def cache_lifetime(headers):
+    """Seconds a response stays fresh per its Cache-Control max-age minus Age."""
+    match = _MAX_AGE.search(headers.get('Cache-Control', ''))
+    if not match:
+        return DEFAULT_MAX_AGE
+    try:
+        age = int(headers.get('Age', 0))
+    except ValueError:
+        age = 0
+    return max(int(match.group(1)) - age, 0)
+
+
+class GoogleKeySet:
+    """Google's JWKS, parsed once and kept until its max-age runs out."""
+
+    def __init__(self, url, session=None):
+        self.url = url
+        self.session = session or self._session()
+        self._keys = {}
+        self._expires_at = 0
+        self._fetched_at = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _session():
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=2))
+        session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=2))
+        return session
+
+    def _refresh(self):
+        response = self.session.get(self.url, timeout=5)
+        response.raise_for_status()
+        keys = {}
+        for jwk in jwt.PyJWKSet.from_dict(response.json()).keys:
+            if jwk.key_id and jwk.public_key_use in ('sig', None):
+                keys[jwk.key_id] = jwk
+        now = time.monotonic()
+        self._keys = keys
+        self._fetched_at = now
+        self._expires_at = now + cache_lifetime(response.headers)
+
+    def get(self, kid):
+        """The signing key for `kid`, refreshing the set if stale or if `kid` is new."""
+        now = time.monotonic()
+        key = self._keys.get(kid)
+        if key is not None and now < self._expires_at:
+            return key
+        with self._lock:
+            key = self._keys.get(kid)
+            stale = time.monotonic() >= self._expires_at
+            if stale or (key is None and time.monotonic() - self._fetched_at >= MIN_REFRESH_INTERVAL):
+                try:
+                    self._refresh()
+                except (requests.RequestException, ValueError, jwt.PyJWTError):
+                    # Keep serving the keys we have if Google is unreachable
+                    if not self._keys:
+                        raise InvalidGoogleToken("Could not fetch Google's signing keys")
+                key = self._keys.get(kid)
+        if key is None:
+            raise InvalidGoogleToken(f'Unknown signing key "{kid}"')
+        return key
+
+
+class GoogleTokenVerifier:
+    def __init__(self, keyset, client_ids):
+        self.keyset = keyset
+        self.client_ids = list(client_ids)
+
+    def verify(self, token):
+        """Return the token's claims, raising InvalidGoogleToken if it doesn't check out."""
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise InvalidGoogleToken(str(e))
+        key = self.keyset.get(header.get('kid'))
+        try:
+            return jwt.decode(
+                token, key.key, algorithms=[key.algorithm_name], audience=self.client_ids,
+                issuer=GOOGLE_ISSUERS, leeway=CLOCK_SKEW, options={'require': ['exp', 'iat', 'aud', 'iss']},
+            )
+        except jwt.PyJWTError as e:
+            raise InvalidGoogleToken(str(e))
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_google_verifier():
+    global _verifier
+    with _verifier_lock:
+        if _verifier is None:
+            _verifier = GoogleTokenVerifier(GoogleKeySet(settings.GOOGLE_JWKS_URL), settings.GOOGLE_OAUTH_CLIENT_IDS)
+        return _verifier
+
+
+def verify_google_id_token(token):
+    return get_google_verifier().verify(token)
@@ -0,0 +1,346 @@
+"""
+Lore leaderboards.
+
+Three scopes are kept, each as a sorted score structure updated on every
+Lore change rather than re-sorting Profile.lore_score per request:
+
+    global              every non-developer profile by lore_score
+    campus:<campus>     the same, per campus
+    weekly:<YYYY-Www>   Lore earned in the current ISO week (ledger amounts)
+
+Ranks are competition ranks: 1 + the number of members with a strictly
+higher score, so ties share a rank. Both "top N" and "my rank" are
+O(log n) (plus N for the listing).
+
+Backends are picked with settings.LORE_LEADERBOARD:
+    {'BACKEND': 'local'}                       # in-process boards (default)
+    {'BACKEND': 'redis', 'URL': 'redis://...'} # one sorted set per scope
+
+A scope is loaded from the database the first time it is read and kept up
+to date by `record` afterwards, which award_lore calls after commit. Updates
+to a scope nobody has read yet are dropped; it loads fresh when needed.
+"""
+import bisect
+import heapq
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import LoreTransaction, Profile
+
+WEEKLY_TTL = int(timedelta(days=15).total_seconds())
+
+
+def week_label(day=None):
+    year, week, _ = (day or timezone.localdate()).isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+def week_start(day=None):
+    day = day or timezone.localdate()
+    return day - timedelta(days=day.weekday())
+
+
+class _Board:
+    """
+    Scores for one scope: member -> score, the members at each score, the
+    distinct scores in order, and a Fenwick tree of member counts indexed by
+    score so "how many are ahead of X" is a prefix sum.
+    """
+
+    def __init__(self, items):
+        self.scores = dict(items)
+        self.buckets = defaultdict(set)
+        for member, score in self.scores.items():
+            self.buckets[score].add(member)
+        self.distinct = sorted(self.buckets)
+        self._reindex()
+
+    def _reindex(self):
+        low, high = (self.distinct[0], self.distinct[-1]) if self.distinct else (0, 0)
+        span = high - low + 1
+        # Leave headroom on both sides so scores drifting past the ends don't
+        # force a rebuild on every award
+        self.lo = low - span // 2 - 64
+        self.size = 2 * span + 128
+        self.tree = [0] * (self.size + 1)
+        for score, members in self.buckets.items():
+            self._add(score, len(members))
+
+    def _add(self, score, delta):
+        i = score - self.lo + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def _at_most(self, score):
+        i = min(score - self.lo + 1, self.size)
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def _discard(self, member, score):
+        bucket = self.buckets[score]
+        bucket.discard(member)
+        if not bucket:
+            del self.buckets[score]
+            del self.distinct[bisect.bisect_left(self.distinct, score)]
+        self._add(score, -1)
+
+    def remove(self, member):
+        score = self.scores.pop(member, None)
+        if score is not None:
+            self._discard(member, score)
+
+    def set(self, member, score):
+        old = self.scores.get(member)
+        if old == score:
+            return
+        if old is not None:
+            self._discard(member, old)
+        self.scores[member] = score
+        if score not in self.buckets:
+            bisect.insort(self.distinct, score)
+        self.buckets[score].add(member)
+        if self.lo <= score < self.lo + self.size:
+            self._add(score, 1)
+        else:
+            self._reindex()
+
+    def rank(self, member):
+        score = self.scores.get(member)
+        if score is None:
+            return None
+        return len(self.scores) - self._at_most(score) + 1, score
+
+    def top(self, limit):
+        found = []
+        for score in reversed(self.distinct):
+            need = limit - len(found)
+            if need <= 0:
+                break
+            found.extend((member, score) for member in heapq.nsmallest(need, self.buckets[score]))
+        return found
+
+
+class LocalLeaderboardBackend:
+    """Per-process boards guarded by one lock."""
+
+    def __init__(self):
+        self._boards = {}
+        self._lock = threading.Lock()
+
+    def is_loaded(self, scope):
+        return scope in self._boards
+
+    def replace(self, scope, items):
+        board = _Board(items)
+        with self._lock:
+            self._boards[scope] = board
+
+    def set_many(self, scope, items):
+        with self._lock:
+            board = self._boards.get(scope)
+            if board is not None:
+                for member, score in items.items():
+                    board.set(member, score)
+
+    def incr(self, scope, member, delta):
+        with self._lock:
+            board = self._boards.get(scope)
+            if board is not None:
+                board.set(member, board.scores.get(member, 0) + delta)
+
+    def remove(self, scope, member):
+        with self._lock:
+            board = self._boards.get(scope)
+            if board is not None:
+                board.remove(member)
+
+    def top(self, scope, limit):
+        with self._lock:
+            return self._boards[scope].top(limit)
+
+    def rank(self, scope, member):
+        with self._lock:
+            return self._boards[scope].rank(member)
+
+    def size(self, scope):
+        with self._lock:
+            return len(self._boards[scope].scores)
+
+    def clear(self):
+        with self._lock:
+            self._boards.clear()
+
+
+class RedisLeaderboardBackend:
+    """One sorted set per scope, shared by every worker."""
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    @staticmethod
+    def key(scope):
+        return f'lore:board:{scope}'
+
+    def is_loaded(self, scope):
+        return bool(self.client.exists(self.key(scope) + ':ready'))
+
+    def replace(self, scope, items):
+        key, staging = self.key(scope), self.key(scope) + ':staging'
+        pipe = self.client.pipeline()
+        pipe.delete(staging)
+        items = list(items)
+        for start in range(0, len(items), 5000):
+            pipe.zadd(staging, dict(items[start:start + 5000]))
+        if items:
+            pipe.rename(staging, key)
+        else:
+            pipe.delete(key)
+        pipe.set(key + ':ready', 1)
+        if scope.startswith('weekly:'):
+            pipe.expire(key, WEEKLY_TTL)
+            pipe.expire(key + ':ready', WEEKLY_TTL)
+        pipe.execute()
+
+    def set_many(self, scope, items):
+        self.client.zadd(self.key(scope), items)
+
+    def incr(self, scope, member, delta):
+        self.client.zincrby(self.key(scope), delta, member)
+
+    def remove(self, scope, member):
+        self.client.zrem(self.key(scope), member)
+
+    def top(self, scope, limit):
+        rows = self.client.zrevrange(self.key(scope), 0, limit - 1, withscores=True)
+        return [(member, int(score)) for member, score in rows]
+
+    def rank(self, scope, member):
+        key = self.key(scope)
+        score = self.client.zscore(key, member)
+        if score is None:
+            return None
+        return self.client.zcount(key, f'({score}', '+inf') + 1, int(score)
+
+    def size(self, scope):
+        return self.client.zcard(self.key(scope))
+
+    def clear(self):
+        for key in self.client.scan_iter('lore:board:*'):
+            self.client.delete(key)
+
+
+class LoreLeaderboard:
+    def __init__(self, backend):
+        self.backend = backend
+        self._load_lock = threading.Lock()
+
+    @staticmethod
+    def scope(kind='global', campus=None, day=None):
+        if kind == 'campus':
+            return f'campus:{campus}'
+        if kind == 'weekly':
+            return f'weekly:{week_label(day)}'
+        return 'global'
+
+    def _rows(self, scope):
+        ranked = Profile.objects.filter(is_developer=False)
+        if scope == 'global':
+            return ranked.values_list('user_id', 'lore_score')
+        if scope.startswith('campus:'):
+            return ranked.filter(campus=scope.partition(':')[2]).values_list('user_id', 'lore_score')
+        if scope == f'weekly:{week_label()}':
+            return (
+                LoreTransaction.objects.filter(day__gte=week_start(), user__profile__is_developer=False)
+                .exclude(kind='opening_balance')
+                .order_by().values('user_id').annotate(total=Sum('amount')).values_list('user_id', 'total')
+            )
+        return []
+
+    def ensure(self, scope):
+        if self.backend.is_loaded(scope):
+            return
+        with self._load_lock:
+            if not self.backend.is_loaded(scope):
+                self.backend.replace(scope, ((str(user_id), score) for user_id, score in self._rows(scope)))
+
+    def record(self, user_id, points=0, old_campus=None):
+        """
+        Bring `user_id`'s entries up to date after a Lore change of `points`
+        (or a profile save; pass `old_campus` when the campus changed).
+        """
+        row = Profile.objects.filter(user_id=user_id).values('lore_score', 'campus', 'is_developer').first()
+        member = str(user_id)
+        if old_campus is not None:
+            self.backend.remove(self.scope('campus', old_campus), member)
+        if row is None or row['is_developer']:
+            for scope in ('global', self.scope('campus', row['campus']) if row else None, self.scope('weekly')):
+                if scope:
+                    self.backend.remove(scope, member)
+            return
+        for scope in ('global', self.scope('campus', row['campus'])):
+            self.backend.set_many(scope, {member: row['lore_score']})
+        if points:
+            self.backend.incr(self.scope('weekly'), member, points)
+
+    def standings(self, scope, limit=100):
+        """[(rank, user_id, score)] for the top `limit` members of `scope`."""
+        self.ensure(scope)
+        standings, rank, previous = [], 0, None
+        for position, (member, score) in enumerate(self.backend.top(scope, limit), start=1):
+            if score != previous:
+                rank, previous = position, score
+            standings.append((rank, member, score))
+        return standings
+
+    def rank_of(self, scope, user_id):
+        """(rank, score) of `user_id` in `scope`, or None if they aren't on it."""
+        self.ensure(scope)
+        return self.backend.rank(scope, str(user_id))
+
+    def size(self, scope):
+        self.ensure(scope)
+        return self.backend.size(scope)
+
+    def reset(self):
+        """Forget every board; each reloads from the database when next read."""
+        self.backend.clear()
+
+
+_leaderboard = None
+_leaderboard_lock = threading.Lock()
+
+
+def record_on_commit(user_id, points=0, old_campus=None):
+    """
+    Queue `record` for after commit. A board failure is logged, not raised:
+    the Lore change itself has committed and recompute_lore can resync.
+    """
+    def record_lore_change():
+        get_leaderboard().record(user_id, points, old_campus=old_campus)
+
+    # A named function, not a partial: Django's robust hook logging reads __qualname__
+    transaction.on_commit(record_lore_change, robust=True)
+
+
+def get_leaderboard():
+    global _leaderboard
+    with _leaderboard_lock:
+        if _leaderboard is None:
+            config = getattr(settings, 'LORE_LEADERBOARD', {})
+            if config.get('BACKEND') == 'redis':
+                backend = RedisLeaderboardBackend(config.get('URL') or settings.REDIS_URL)
+            else:
+                backend = LocalLeaderboardBackend()
+            _leaderboard = LoreLeaderboard(backend)
+        return _leaderboard
@@ -0,0 +1,126 @@
+"""
+Lore rewards.
+
+Every change to Profile.lore_score goes through `award_lore` (or
+`adjust_lore` for staff corrections), which appends a LoreTransaction and
+bumps the score with a single F() update, so concurrent actions never
+overwrite each other. The score is read under a row lock first, and the
+ledger records the change that survives the 0 and NON_DEV_CAP clamps rather
+than the nominal points, so the ledger always sums to the score. Daily
+limits live in the ledger's unique constraints instead of the old
+Profile.lore_meta counters.
+"""
+from collections import namedtuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import me_cache
+from .leaderboard import record_on_commit
+from .models import LoreTransaction, Profile
+
+Rule = namedtuple('Rule', 'points daily_limit once')
+
+LORE_RULES = {
+    'daily_login': Rule(2, daily_limit=1, once=False),
+    'post': Rule(4, daily_limit=2, once=False),
+    'post_revoked': Rule(-4, daily_limit=None, once=True),
+    'vote': Rule(3, daily_limit=5, once=False),
+    'comment': Rule(2, daily_limit=3, once=False),
+    'event_approved': Rule(5, daily_limit=None, once=True),
+    'profile_setup': Rule(1, daily_limit=None, once=True),
+}
+
+# Lore 500+ is reserved for developer accounts
+NON_DEV_CAP = 499
+
+
+def _applicable(user_id, amount):
+    """
+    How much of `amount` `user_id`'s score can take without leaving 0 ..
+    NON_DEV_CAP (no upper bound for developers). Locks the profile row, so
+    call it inside the transaction that applies the change.
+    """
+    row = Profile.objects.select_for_update().filter(user_id=user_id).values_list('lore_score', 'is_developer').first()
+    if row is None:
+        return 0
+    score, is_developer = row
+    target = max(score + amount, 0)
+    if not is_developer:
+        target = min(target, NON_DEV_CAP)
+    return target - score
+
+
+def _apply(user_id, applied):
+    if applied:
+        Profile.objects.filter(user_id=user_id).update(lore_score=F('lore_score') + applied)
+        me_cache.invalidate(user_id)
+        record_on_commit(user_id, applied)
+
+
+def award_lore(user, kind, ref='', points=None):
+    """
+    Apply `kind`'s reward (or `points` instead of the rule's) to `user` (a
+    User or its pk) if its limits allow. Returns the points applied: 0 when
+    the daily cap is spent, `ref` was already rewarded, or the score is
+    already at its cap (the reward still counts against the limits).
+    """
+    user_id = getattr(user, 'pk', user)
+    rule = LORE_RULES[kind]
+    points = rule.points if points is None else points
+    ref = str(ref or (kind if rule.once else ''))
+    today = timezone.localdate()
+
+    if rule.daily_limit:
+        taken = LoreTransaction.objects.filter(user_id=user_id, kind=kind, day=today).count()
+        slots = range(taken, rule.daily_limit)
+        if not slots:
+            return 0
+    else:
+        slots = [None]
+
+    with transaction.atomic():
+        applied = _applicable(user_id, points)
+        for slot in slots:
+            try:
+                with transaction.atomic():
+                    LoreTransaction.objects.create(
+                        user_id=user_id, kind=kind, amount=applied, day=today, slot=slot, ref=ref,
+                    )
+            except IntegrityError:
+                # Either `ref` was already rewarded, or a concurrent award took
+                # this slot and the next one may still be free
+                if ref and LoreTransaction.objects.filter(user_id=user_id, kind=kind, ref=ref).exists():
+                    return 0
+                continue
+            _apply(user_id, applied)
+            return applied
+    return 0
+
+
+def adjust_lore(user, amount):
+    """
+    Staff correction: add `amount` (may be negative) to `user`'s Lore as an
+    'admin_adjust' ledger entry, clamped like any award. An `amount` of 0
+    just re-applies the clamps, e.g. once is_developer is cleared. Returns
+    the change applied.
+    """
+    user_id = getattr(user, 'pk', user)
+    with transaction.atomic():
+        applied = _applicable(user_id, amount)
+        if applied:
+            LoreTransaction.objects.create(user_id=user_id, kind='admin_adjust', amount=applied,
+                                           day=timezone.localdate())
+            _apply(user_id, applied)
+    return applied
+
+
+def revoke_lore(user, kind, ref):
+    """Take back what the `kind` reward for `ref` applied, if there was one."""
+    earned = LoreTransaction.objects.filter(
+        user_id=getattr(user, 'pk', user), kind=kind, ref=str(ref),
+    ).values_list('amount', flat=True).first()
+    if earned is None:
+        return 0
+    return award_lore(user, f'{kind}_revoked', ref, points=-earned)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from accounts import me_cache
+from accounts.leaderboard import get_leaderboard
+from accounts.models import LoreTransaction, Profile
+
+
+class Command(BaseCommand):
+    help = "Rebuild every Profile.lore_score from the LoreTransaction ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drifted profiles without fixing them.")
+
+    def handle(self, *args, **options):
+        ledger_sum = Coalesce(Subquery(
+            LoreTransaction.objects.filter(user_id=OuterRef('user_id'))
+            .order_by().values('user_id').annotate(total=Sum('amount')).values('total'),
+            output_field=IntegerField(),
+        ), 0)
+        # The ledger records the change each award actually applied, caps
+        # included, so its sum is the score
+        drifted = Profile.objects.annotate(expected=ledger_sum).exclude(lore_score=F('expected'))
+        count = drifted.count()
+        if not count:
+            self.stdout.write(self.style.SUCCESS("All Lore scores match the ledger."))
+            return
+        if options['dry_run']:
+            self.stdout.write(f"{count} profile(s) differ from the ledger.")
+            return
+
+        user_ids = list(drifted.values_list('user_id', flat=True))
+        Profile.objects.filter(user_id__in=user_ids).update(lore_score=ledger_sum)
+        me_cache.invalidate(*user_ids)
+        get_leaderboard().reset()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed Lore for {count} profile(s)."))
@@ -0,0 +1,43 @@
+"""
+Per-user cache of the GET /profiles/me/ payload.
+
+The app shell polls /profiles/me/ on every page load, so the serialized
+profile is kept in Django's cache under the owner's user id. Anything that
+changes a profile row invalidates its entry: Profile.save, award_lore and
+recompute_lore. The entry is dropped right away and again after commit, so
+a reader that re-cached the old row mid-transaction doesn't keep it.
+
+An invalidation only reaches other workers through a shared cache, so
+caching is on only with settings.PROFILE_ME_CACHE (set when REDIS_URL
+configures a Redis CACHES backend). Otherwise every call is a miss.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+TIMEOUT = 60 * 60
+
+
+def key(user_id):
+    return f'profile:me:{user_id}'
+
+
+def enabled():
+    return getattr(settings, 'PROFILE_ME_CACHE', False)
+
+
+def get(user_id):
+    return cache.get(key(user_id)) if enabled() else None
+
+
+def store(user_id, data):
+    if enabled():
+        cache.set(key(user_id), data, TIMEOUT)
+
+
+def invalidate(*user_ids):
+    if not enabled():
+        return
+    keys = [key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TAG_FIELDS = {
+    'interest': 'interests',
+    'social': 'social_energy',
+    'intent': 'connection_intent',
+    'brain': 'brain_type',
+}
+
+
+def backfill_tags(apps, schema_editor):
+    Profile = apps.get_model('accounts', 'Profile')
+    ProfileTag = apps.get_model('accounts', 'ProfileTag')
+    batch = []
+    for profile in Profile.objects.only('pk', *TAG_FIELDS.values()).iterator():
+        tags = set()
+        for kind, field in TAG_FIELDS.items():
+            values = getattr(profile, field)
+            for value in ([values] if isinstance(values, str) else values or ()):
+                if value:
+                    tags.add((kind, str(value)[:50]))
+        batch.extend(ProfileTag(profile_id=profile.pk, kind=kind, value=value) for kind, value in tags)
+        Profile.objects.filter(pk=profile.pk).update(tag_count=len(tags))
+        if len(batch) >= 5000:
+            ProfileTag.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    ProfileTag.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_alter_profile_nickname'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='tag_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ProfileTag',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('interest', 'Interest'), ('social', 'Social energy'), ('intent', 'Connection intent'), ('brain', 'Brain type')], max_length=20)),
+                ('value', models.CharField(max_length=50)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tags', to='accounts.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'value', 'profile'], name='accounts_pr_kind_dc8d64_idx')],
+                'unique_together': {('profile', 'kind', 'value')},
+            },
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# Old lore_meta counters -> ledger kind; only today's still matter
+META_COUNTERS = {'posts_today': 'post', 'votes_today': 'vote', 'comments_today': 'comment'}
+
+
+def opening_balances(apps, schema_editor):
+    """
+    Seed the ledger with each profile's current score, plus zero-point rows
+    for today's already-used daily allowances so nobody earns them twice.
+    """
+    Profile = apps.get_model('accounts', 'Profile')
+    LoreTransaction = apps.get_model('accounts', 'LoreTransaction')
+    today = timezone.localdate()
+    batch = []
+    for profile in Profile.objects.only('user_id', 'lore_score', 'lore_meta').iterator():
+        batch.append(LoreTransaction(user_id=profile.user_id, kind='opening_balance',
+                                     amount=profile.lore_score, day=today, ref='opening_balance'))
+        meta = profile.lore_meta or {}
+        if meta.get('daily_login') == today.isoformat():
+            batch.append(LoreTransaction(user_id=profile.user_id, kind='daily_login', amount=0, day=today, slot=0))
+        for key, kind in META_COUNTERS.items():
+            counter = meta.get(key) or {}
+            if counter.get('date') == today.isoformat():
+                batch.extend(
+                    LoreTransaction(user_id=profile.user_id, kind=kind, amount=0, day=today, slot=slot)
+                    for slot in range(counter.get('count', 0))
+                )
+        if len(batch) >= 5000:
+            LoreTransaction.objects.bulk_create(batch)
+            batch = []
+    LoreTransaction.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_profiletag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoreTransaction',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=30)),
+                ('amount', models.IntegerField()),
+                ('day', models.DateField()),
+                ('slot', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('ref', models.CharField(blank=True, default='', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lore_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('slot__isnull', False)), fields=('user', 'kind', 'day', 'slot'), name='lore_daily_slot'), models.UniqueConstraint(condition=models.Q(('ref', ''), _negated=True), fields=('user', 'kind', 'ref'), name='lore_once_per_ref')],
+            },
+        ),
+        migrations.RunPython(opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_loretransaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NicknameSequence',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('multiplier', models.BigIntegerField()),
+                ('offset', models.BigIntegerField()),
+                ('position', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
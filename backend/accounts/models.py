@@ -58,7 +58,7 @@ class Profile(models.Model):
     interests = models.JSONField(default=list)
     avatar_config = models.JSONField(default=dict, blank=True)
     vibe_settings = models.JSONField(default=dict, blank=True)
-    lore_meta = models.JSONField(default=dict, blank=True) # Tracks daily limits: {"daily_login": "YYYY-MM-DD", "votes_today": {"date": "...", "count": 0}, ...}
+    lore_meta = models.JSONField(default=dict, blank=True) # Legacy daily-limit counters; limits now live in LoreTransaction
     privacy_settings = models.JSONField(default=dict, blank=True) # {"show_gender": false, "show_match_preference": false, "show_looking_for": false}
     
     # Gender & Discovery
@@ -80,58 +80,246 @@ class Profile(models.Model):
     # Matching System Fields
     campus = models.CharField(max_length=100, default='Main Campus', blank=True)
     matching_cooldown_until = models.DateTimeField(null=True, blank=True)
+    tag_count = models.PositiveSmallIntegerField(default=0)  # len(tag_set()), kept by sync_tags
     
+    # ProfileTag kind -> the Profile field it indexes
+    TAG_FIELDS = {
+        'interest': 'interests',
+        'social': 'social_energy',
+        'intent': 'connection_intent',
+        'brain': 'brain_type',
+    }
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(field in field_names for field in cls.TAG_FIELDS.values()):
+            instance._saved_tags = instance.tag_set()
+        if 'campus' in field_names:
+            instance._saved_campus = instance.campus
+        if 'is_developer' in field_names:
+            instance._saved_is_developer = instance.is_developer
+        return instance
+
     def save(self, *args, **kwargs):
         # Reserve Lore 500+ for dev accounts only
         if self.lore_score >= 500 and not self.is_developer:
             self.lore_score = 499
+        adding = self._state.adding
+        if adding:
+            self._saved_tags = set()
+        elif kwargs.get('update_fields') is None:
+            # lore_score is maintained by accounts.lore with F() updates; a
+            # full save of a stale instance must not write it back
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'lore_score'
+            ]
         super().save(*args, **kwargs)
+        if not adding and getattr(self, '_saved_is_developer', False) and not self.is_developer:
+            # The Lore cap above can't reach a score full saves don't write;
+            # re-clamp it through the ledger
+            from .lore import adjust_lore
+            adjust_lore(self.user_id, 0)
+            self.lore_score = min(self.lore_score, 499)
+        self._saved_is_developer = self.is_developer
+        from . import me_cache
+        me_cache.invalidate(self.user_id)
+        if adding:
+            # The starting score opens the profile's Lore ledger
+            LoreTransaction.objects.create(user_id=self.user_id, kind='opening_balance', amount=self.lore_score,
+                                           day=timezone.localdate(), ref='opening_balance')
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(self.TAG_FIELDS.values()):
+            self.sync_tags()
+
+        old_campus = getattr(self, '_saved_campus', self.campus)
+        if adding or (old_campus != self.campus and (update_fields is None or 'campus' in update_fields)):
+            from .leaderboard import record_on_commit
+            record_on_commit(self.user_id, old_campus=None if adding else old_campus)
+            self._saved_campus = self.campus
 
-    def update_streak(self):
-        """Update the user's check-in streak based on current date."""
-        today = timezone.now().date()
-        
+    def tag_set(self):
+        """{(kind, value)} for every indexed attribute on this profile."""
+        tags = set()
+        for kind, field in self.TAG_FIELDS.items():
+            values = getattr(self, field)
+            for value in ([values] if isinstance(values, str) else values or ()):
+                if value:
+                    tags.add((kind, str(value)[:50]))
+        return tags
+
+    def sync_tags(self):
+        """Bring this profile's ProfileTag rows in line with its fields."""
+        wanted = self.tag_set()
+        saved = getattr(self, '_saved_tags', None)
+        if saved is None:
+            saved = set(self.tags.values_list('kind', 'value'))
+        if wanted != saved:
+            stale = saved - wanted
+            if stale:
+                stale_q = models.Q()
+                for kind, value in stale:
+                    stale_q |= models.Q(kind=kind, value=value)
+                self.tags.filter(stale_q).delete()
+            ProfileTag.objects.bulk_create(
+                [ProfileTag(profile=self, kind=kind, value=value) for kind, value in wanted - saved],
+                ignore_conflicts=True,
+            )
+        if self.tag_count != len(wanted):
+            self.tag_count = len(wanted)
+            Profile.objects.filter(pk=self.pk).update(tag_count=self.tag_count)
+        self._saved_tags = wanted
+
+    def similar_profiles(self, limit=20, same_campus=True):
+        """
+        Other profiles ranked by Jaccard similarity of their tags to ours,
+        as (profile_id, shared, score) rows. Only profiles sharing at least
+        one tag are considered, via the (kind, value) index.
+        """
+        mine = self.tag_set()
+        if not mine:
+            return []
+        shares = models.Q()
+        for kind, value in mine:
+            shares |= models.Q(kind=kind, value=value)
+        rows = ProfileTag.objects.filter(shares).exclude(profile=self)
+        if same_campus:
+            rows = rows.filter(profile__campus=self.campus)
+        rows = (
+            rows.order_by().values('profile', 'profile__tag_count')
+            .annotate(shared=models.Count('pk'))
+            .annotate(score=models.ExpressionWrapper(
+                models.F('shared') * 1.0 / (len(mine) + models.F('profile__tag_count') - models.F('shared')),
+                output_field=models.FloatField(),
+            ))
+            .order_by('-score', 'profile')
+            .values_list('profile', 'shared', 'score')
+        )
+        return list(rows[:limit])
+
+    def check_in(self, today=None):
+        """
+        Record today's check-in, moving the streak along. Idempotent: a
+        conditional UPDATE keyed on the last check-in date, so only the first
+        call of the day (across every request) writes; returns whether it was
+        this one.
+        """
+        today = today or timezone.localdate()
         if self.last_checkin_date == today:
             return False # Already checked in today
-            
-        is_increase = False
+
         yesterday = today - timedelta(days=1)
-        
+        streak, freezes = self.current_streak_count, self.streak_freezes
         if self.last_checkin_date is None:
             # First time check-in
-            self.current_streak_count = 1
-            is_increase = True
+            streak = 1
         elif self.last_checkin_date == yesterday:
             # Consistent check-in
-            self.current_streak_count += 1
-            is_increase = True
+            streak += 1
+        elif freezes > 0:
+            # Missed a day, but a freeze saves the streak (no credit for the gap)
+            freezes -= 1
+            streak += 1
         else:
-            # Missed a day
-            # Grace/Freeze logic:
-            if self.streak_freezes > 0:
-                self.streak_freezes -= 1
-                # Streak is saved but count doesn't increase for the missed day
-                # We treat it as if they checked in today now
-                self.current_streak_count += 1 
-                is_increase = True
-            else:
-                self.current_streak_count = 1 # Reset to 1 since they are checking in now
-                is_increase = True
-
-        # Update longest streak
-        if self.current_streak_count > self.longest_streak:
-            self.longest_streak = self.current_streak_count
-            
-        self.last_checkin_date = today
-        
+            streak = 1 # Reset to 1 since they are checking in now
+
+        changes = {
+            'current_streak_count': streak,
+            'longest_streak': max(streak, self.longest_streak),
+            'streak_freezes': freezes,
+            'last_checkin_date': today,
+            'last_active': timezone.now(),
+        }
         # 14-day freeze grant logic
-        # If last_freeze_grant is None or > 14 days ago, grant a freeze
         if self.last_freeze_grant is None or (today - self.last_freeze_grant).days >= 14:
-            self.streak_freezes += 1
-            self.last_freeze_grant = today
-            
-        self.save()
-        return is_increase
+            changes['streak_freezes'] += 1
+            changes['last_freeze_grant'] = today
+
+        if self.last_checkin_date is None:
+            seen = models.Q(last_checkin_date__isnull=True)
+        else:
+            seen = models.Q(last_checkin_date=self.last_checkin_date)
+        if not Profile.objects.filter(seen, pk=self.pk).update(**changes):
+            return False # Another request checked in first
+        for field, value in changes.items():
+            setattr(self, field, value)
+        return True
 
     def __str__(self):
         return self.nickname or self.user.username
+
+
+class ProfileTag(models.Model):
+    """
+    One row per (profile, attribute value), mirroring the JSON list fields
+    so "who shares X" is an index lookup instead of a scan. Kept in sync by
+    Profile.save.
+    """
+    KIND_CHOICES = [
+        ('interest', 'Interest'),
+        ('social', 'Social energy'),
+        ('intent', 'Connection intent'),
+        ('brain', 'Brain type'),
+    ]
+
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='tags')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    value = models.CharField(max_length=50)
+
+    class Meta:
+        unique_together = ('profile', 'kind', 'value')
+        indexes = [models.Index(fields=['kind', 'value', 'profile'])]
+
+    def __str__(self):
+        return f"{self.profile_id} {self.kind}:{self.value}"
+
+
+class LoreTransaction(models.Model):
+    """
+    Append-only record of every Lore change. Profile.lore_score is the
+    materialized sum; `python manage.py recompute_lore` rebuilds it from here.
+
+    Rate limits are enforced by the database rather than by reading counters:
+    a kind capped at N per day may only use slots 0..N-1 for a given day, and
+    a non-empty `ref` (the post, event, ... that earned it) can be rewarded
+    once per kind.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='lore_transactions')
+    kind = models.CharField(max_length=30)
+    amount = models.IntegerField()
+    day = models.DateField()
+    slot = models.PositiveSmallIntegerField(null=True, blank=True)
+    ref = models.CharField(max_length=64, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'kind', 'day', 'slot'], condition=models.Q(slot__isnull=False),
+                name='lore_daily_slot',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'kind', 'ref'], condition=~models.Q(ref=''),
+                name='lore_once_per_ref',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.kind} {self.amount:+d}"
+
+
+class NicknameSequence(models.Model):
+    """
+    Cursor over a fixed shuffle of the thematic nickname space (see
+    accounts.nicknames). The shuffle is the affine map
+    i -> (multiplier * i + offset) mod N, a permutation because
+    gcd(multiplier, N) == 1, so walking `position` upward never repeats.
+    """
+    multiplier = models.BigIntegerField()
+    offset = models.BigIntegerField()
+    position = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"nickname #{self.position}"
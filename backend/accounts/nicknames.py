@@ -0,0 +1,88 @@
+"""
+Nickname allocation.
+
+Every thematic nickname is a point in SNACKS x SUFFIXES x NUMBERS
+(34 x 19 x 9990 = 6,453,540 names), so index i in [0, N) maps to one name
+by mixed-radix decoding. NicknameSequence holds a random affine permutation
+of [0, N) and a cursor. Handing out names means bumping the cursor with one
+UPDATE, which hands out names nobody else was given, in an order
+that looks random, without storing the shuffled sequence.
+
+Names chosen some other way (legacy random draws, hand-picked ones) can
+still sit on a slot. Each attempt claims a single slot and checks it, moving
+on to the next slot only when the name is held, so no slot is skipped
+unless it was genuinely taken. An allocation is two queries unless it lands
+on one of those names.
+"""
+import math
+import secrets
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import NicknameSequence, Profile
+from .utils import NUMBERS, SNACKS, SUFFIXES
+
+NAMESPACE = len(SNACKS) * len(SUFFIXES) * len(NUMBERS)
+
+
+class NicknamesExhausted(RuntimeError):
+    pass
+
+
+def nickname_at(index):
+    """The index-th name of the (unshuffled) namespace."""
+    index, number = divmod(index, len(NUMBERS))
+    snack, suffix = divmod(index, len(SUFFIXES))
+    return f"{SNACKS[snack]}{SUFFIXES[suffix]}{NUMBERS[number]}"
+
+
+def _random_permutation():
+    while True:
+        multiplier = secrets.randbelow(NAMESPACE - 2) + 2
+        if math.gcd(multiplier, NAMESPACE) == 1:
+            return {'multiplier': multiplier, 'offset': secrets.randbelow(NAMESPACE)}
+
+
+def _supports_update_returning():
+    if connection.vendor == 'postgresql':
+        return True
+    return connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 35, 0)
+
+
+def _claim_slot():
+    """Advance the cursor by one; returns (multiplier, offset, claimed position)."""
+    if _supports_update_returning():
+        # One autocommitted statement: bump the cursor and read it back
+        table = connection.ops.quote_name(NicknameSequence._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} SET "position" = "position" + 1 WHERE "id" = 1 AND "position" < %s '
+                f'RETURNING "multiplier", "offset", "position"',
+                [NAMESPACE],
+            )
+            row = cursor.fetchone()
+        if row:
+            multiplier, offset, end = row
+            return multiplier, offset, end - 1
+    with transaction.atomic():
+        claimed = NicknameSequence.objects.filter(pk=1, position__lt=NAMESPACE).update(position=F('position') + 1)
+        if not claimed:
+            _, created = NicknameSequence.objects.get_or_create(pk=1, defaults=_random_permutation())
+            if not created:
+                raise NicknamesExhausted("Every thematic nickname has been handed out")
+            return _claim_slot()
+        multiplier, offset, end = NicknameSequence.objects.values_list('multiplier', 'offset', 'position').get(pk=1)
+    return multiplier, offset, end - 1
+
+
+def allocate_nickname():
+    """
+    A thematic nickname no profile has and no other caller was handed.
+    Raises NicknamesExhausted once the whole namespace has been handed out.
+    """
+    while True:
+        multiplier, offset, position = _claim_slot()
+        name = nickname_at((multiplier * position + offset) % NAMESPACE)
+        if not Profile.objects.filter(nickname=name).exists():
+            return name
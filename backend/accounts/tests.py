@@ -1,3 +1,448 @@
-from django.test import TestCase
+import random
+import time
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .google_auth import GoogleKeySet, GoogleTokenVerifier, InvalidGoogleToken
+from .leaderboard import _Board, get_leaderboard
+from .lore import adjust_lore, award_lore, revoke_lore
+from .models import User, Profile, ProfileTag, LoreTransaction, NicknameSequence
+from .nicknames import NAMESPACE, allocate_nickname, nickname_at
+
+
+def make_profile(name, **fields):
+    user = User.objects.create_user(username=name, email=f'{name}@campus.test')
+    return Profile.objects.create(user=user, nickname=name, **fields)
+
+
+class ProfileTagTests(TestCase):
+    def test_tags_follow_profile_fields(self):
+        profile = make_profile('tagged', interests=['memes', 'chai'], brain_type='chaos', connection_intent=['random'])
+        self.assertEqual(
+            set(profile.tags.values_list('kind', 'value')),
+            {('interest', 'memes'), ('interest', 'chai'), ('brain', 'chaos'), ('intent', 'random')},
+        )
+
+        profile = Profile.objects.get(pk=profile.pk)
+        profile.interests = ['chai', 'music']
+        profile.brain_type = ''
+        profile.save()
+        self.assertEqual(
+            set(profile.tags.values_list('kind', 'value')),
+            {('interest', 'chai'), ('interest', 'music'), ('intent', 'random')},
+        )
+
+    def test_unrelated_saves_do_not_touch_tags(self):
+        profile = make_profile('quiet', interests=['memes'])
+        profile = Profile.objects.get(pk=profile.pk)
+        with self.assertNumQueries(1):
+            profile.save(update_fields=['lore_score'])
+        with self.assertNumQueries(1):
+            profile.save()
+
+    def test_similar_profiles_rank_by_jaccard(self):
+        me = make_profile('me', interests=['memes', 'chai', 'music'], brain_type='chaos')
+        twin = make_profile('twin', interests=['memes', 'chai', 'music'], brain_type='chaos')
+        close = make_profile('close', interests=['memes', 'chai'], brain_type='flow')
+        make_profile('stranger', interests=['art'])
+        make_profile('elsewhere', interests=['memes', 'chai', 'music'], brain_type='chaos', campus='North Campus')
+
+        rows = me.similar_profiles()
+        self.assertEqual([row[0] for row in rows], [twin.pk, close.pk])
+        self.assertEqual(rows[0][1:], (4, 1.0))
+        self.assertAlmostEqual(rows[1][2], 2 / 5)
+
+    def test_people_like_me_endpoint(self):
+        me = make_profile('viewer', interests=['memes', 'chai'])
+        twin = make_profile('twin', interests=['memes', 'chai'])
+        client = APIClient()
+        client.force_authenticate(me.user)
+        data = client.get('/api/matching/people_like_me/').json()
+        self.assertEqual([member['id'] for member in data], [str(twin.user_id)])
+        self.assertEqual(data[0]['similarity'], 1.0)
+        self.assertNotIn('nickname', data[0]['profile'])
+        self.assertEqual(ProfileTag.objects.count(), 4)
+
+    def test_people_like_me_without_a_profile_yet(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='fresh', email='fresh@campus.test'))
+        response = client.get('/api/matching/people_like_me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+
+class LoreLedgerTests(TestCase):
+    def setUp(self):
+        self.profile = make_profile('earner', lore_score=10)
+        self.user = self.profile.user
+
+    def score(self):
+        return Profile.objects.get(pk=self.profile.pk).lore_score
+
+    def test_daily_limits_and_refs(self):
+        awarded = [award_lore(self.user, 'vote', ref=f'event{i}') for i in range(7)]
+        self.assertEqual(awarded, [3, 3, 3, 3, 3, 0, 0])
+        self.assertEqual(award_lore(self.user, 'comment', ref='c1'), 2)
+        self.assertEqual(award_lore(self.user, 'daily_login'), 2)
+        self.assertEqual(award_lore(self.user, 'daily_login'), 0)
+        self.assertEqual(self.score(), 10 + 15 + 2 + 2)
+
+    def test_revoking_a_post_only_takes_back_what_it_earned(self):
+        award_lore(self.user, 'post', ref='p1')
+        award_lore(self.user, 'post', ref='p2')
+        self.assertEqual(award_lore(self.user, 'post', ref='p3'), 0)
+        self.assertEqual(revoke_lore(self.user, 'post', ref='p3'), 0)
+        self.assertEqual(revoke_lore(self.user, 'post', ref='p1'), -4)
+        self.assertEqual(revoke_lore(self.user, 'post', ref='p1'), 0)
+        self.assertEqual(self.score(), 14)
+
+    def test_score_is_capped_for_non_developers(self):
+        Profile.objects.filter(pk=self.profile.pk).update(lore_score=498)
+        award_lore(self.user, 'daily_login')
+        self.assertEqual(self.score(), 499)
+
+    def test_full_save_of_stale_profile_keeps_awarded_lore(self):
+        stale = Profile.objects.get(pk=self.profile.pk)
+        award_lore(self.user, 'daily_login')
+        stale.bio = 'night owl'
+        stale.save()
+        self.assertEqual(self.score(), 12)
+
+    def test_staff_edits_go_through_the_ledger(self):
+        from django.contrib.admin.sites import site
+        from django.forms import modelform_factory
+
+        shown = Profile.objects.get(pk=self.profile.pk)
+        form = modelform_factory(Profile, fields=['bio', 'lore_score'])(
+            data={'bio': 'mod note', 'lore_score': 50}, instance=shown,
+        )
+        award_lore(self.user, 'daily_login')  # lands while the form is open
+        self.assertTrue(form.is_valid(), form.errors)
+        site._registry[Profile].save_model(None, form.save(commit=False), form, change=True)
+
+        self.assertEqual(self.score(), 52)
+        self.assertEqual(LoreTransaction.objects.get(user=self.user, kind='admin_adjust').amount, 40)
+
+    def test_clearing_developer_flag_reapplies_the_cap(self):
+        dev = make_profile('dev', lore_score=900, is_developer=True)
+        dev = Profile.objects.get(pk=dev.pk)
+        dev.is_developer = False
+        dev.save()
+        self.assertEqual(Profile.objects.get(pk=dev.pk).lore_score, 499)
+
+    def test_recompute_rebuilds_scores_from_the_ledger(self):
+        award_lore(self.user, 'comment', ref='c1')
+        Profile.objects.filter(pk=self.profile.pk).update(lore_score=999)
+        out = StringIO()
+        call_command('recompute_lore', '--dry-run', stdout=out)
+        self.assertIn('1 profile(s) differ', out.getvalue())
+        call_command('recompute_lore', stdout=StringIO())
+        self.assertEqual(self.score(), 12)
+
+    def test_ledger_records_what_the_cap_let_through(self):
+        Profile.objects.filter(pk=self.profile.pk).update(lore_score=499)
+        LoreTransaction.objects.filter(user=self.user).update(amount=499)
+        with mock.patch('accounts.lore.record_on_commit') as record:
+            self.assertEqual(award_lore(self.user, 'post', ref='p1'), 0)
+            self.assertEqual(revoke_lore(self.user, 'post', 'p1'), 0)
+            award_lore(self.user, 'post', ref='p2')
+        self.assertEqual(self.score(), 499)
+        record.assert_not_called()
+
+        self.assertEqual(adjust_lore(self.user, -10), -10)
+        self.assertEqual(self.score(), 489)
+        out = StringIO()
+        call_command('recompute_lore', stdout=out)
+        self.assertIn('All Lore scores match', out.getvalue())
+        self.assertEqual(self.score(), 489)
+
+
+class ConcurrentLoreTests(TransactionTestCase):
+    def test_concurrent_awards_respect_the_daily_cap(self):
+        profile = make_profile('racer', lore_score=0)
+
+        def vote(i):
+            try:
+                for _ in range(100):
+                    try:
+                        return award_lore(profile.user_id, 'vote', ref=f'event{i}')
+                    except OperationalError:
+                        # Shared-cache test DB: one writer at a time, fails fast
+                        time.sleep(0.005)
+                raise AssertionError("never got the write lock")
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            awarded = list(executor.map(vote, range(20)))
+
+        self.assertEqual(sorted(awarded, reverse=True)[:6], [3, 3, 3, 3, 3, 0])
+        self.assertEqual(Profile.objects.get(pk=profile.pk).lore_score, 15)
+        self.assertEqual(LoreTransaction.objects.filter(user=profile.user, kind='vote').count(), 5)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        get_leaderboard().reset()
+        self.ana = make_profile('ana', lore_score=40)
+        self.ben = make_profile('ben', lore_score=40, campus='North')
+        self.cal = make_profile('cal', lore_score=30)
+        make_profile('dev', lore_score=900, is_developer=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.cal.user)
+
+    def board(self, scope='global'):
+        return self.client.get('/api/leaderboard/', {'scope': scope}).json()
+
+    def test_board_ranks_with_ties_and_skips_developers(self):
+        data = self.board()
+        self.assertEqual([(row['rank'], row['score']) for row in data['results']], [(1, 40), (1, 40), (3, 30)])
+        self.assertEqual(data['me'], {'rank': 3, 'score': 30})
+        self.assertEqual(data['total'], 3)
+        self.assertEqual([row['nickname'] for row in self.board('campus')['results']], ['ana', 'cal'])
+
+    def test_awards_and_campus_moves_update_loaded_boards(self):
+        self.board(), self.board('campus'), self.board('weekly')
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                award_lore(self.cal.user, 'vote', ref=i)
+        self.assertEqual(self.board()['me'], {'rank': 1, 'score': 45})
+        self.assertEqual(self.board('weekly')['results'][0], {
+            'rank': 1, 'nickname': 'cal', 'avatar_emoji': self.cal.avatar_emoji,
+            'campus': 'Main Campus', 'score': 15, 'is_me': True,
+        })
+
+        profile = Profile.objects.get(pk=self.cal.pk)
+        profile.campus = 'North'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        self.assertEqual([row['nickname'] for row in self.board('campus')['results']], ['cal', 'ben'])
+        self.client.force_authenticate(self.ana.user)
+        self.assertEqual([row['nickname'] for row in self.board('campus')['results']], ['ana'])
+
+    def test_a_failing_board_does_not_fail_the_award(self):
+        with mock.patch.object(type(get_leaderboard()), 'record', side_effect=RuntimeError('redis down')):
+            with self.assertLogs('django', 'ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.assertEqual(award_lore(self.cal.user, 'daily_login'), 2)
+        self.assertEqual(Profile.objects.get(pk=self.cal.pk).lore_score, 32)
+
+    def test_unknown_scope_is_rejected(self):
+        self.assertEqual(self.client.get('/api/leaderboard/', {'scope': 'galaxy'}).status_code, 400)
+
+    def test_board_matches_a_full_sort(self):
+        rng = random.Random(7)
+        board = _Board({f'm{i}': rng.randint(0, 60) for i in range(300)}.items())
+        for _ in range(2000):
+            member = f'm{rng.randrange(320)}'
+            if rng.random() < 0.1:
+                board.remove(member)
+            else:
+                board.set(member, rng.randint(-50, 700))
+        ordered = sorted(board.scores.values(), reverse=True)
+        for member, score in list(board.scores.items())[:50]:
+            self.assertEqual(board.rank(member), (ordered.index(score) + 1, score))
+        self.assertEqual([score for _, score in board.top(40)], ordered[:40])
+
+
+def signing_key(kid):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public = jwt.algorithms.RSAAlgorithm.to_jwk(private.public_key(), as_dict=True)
+    return private, {**public, 'kid': kid, 'use': 'sig', 'alg': 'RS256'}
+
+
+def google_token(private, kid, aud, **claims):
+    now = int(time.time())
+    payload = {'iss': 'https://accounts.google.com', 'aud': aud, 'iat': now, 'exp': now + 3600,
+               'email': 'night@campus.test', **claims}
+    return jwt.encode(payload, private, algorithm='RS256', headers={'kid': kid})
+
+
+class StubJWKSSession:
+    """Stands in for requests.Session, serving a JWK set with a max-age."""
+
+    def __init__(self, jwks, max_age=3600):
+        self.jwks, self.max_age, self.fetches = jwks, max_age, 0
+
+    def get(self, url, timeout=None):
+        self.fetches += 1
+        return mock.Mock(headers={'Cache-Control': f'public, max-age={self.max_age}', 'Age': '100'},
+                         json=lambda: {'keys': list(self.jwks)}, raise_for_status=lambda: None)
+
+
+class GoogleTokenTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.private, cls.jwk = signing_key('k1')
+        cls.rotated, cls.rotated_jwk = signing_key('k2')
+
+    def setUp(self):
+        self.session = StubJWKSSession([self.jwk])
+        self.verifier = GoogleTokenVerifier(GoogleKeySet('https://keys.test', self.session), ['web', 'vercel'])
+
+    def test_keys_are_fetched_once_and_any_allowed_audience_passes(self):
+        for aud in ('web', 'vercel', 'vercel'):
+            self.assertEqual(self.verifier.verify(google_token(self.private, 'k1', aud))['aud'], aud)
+        self.assertEqual(self.session.fetches, 1)
+        with self.assertRaises(InvalidGoogleToken):
+            self.verifier.verify(google_token(self.private, 'k1', 'someone-else'))
+        with self.assertRaises(InvalidGoogleToken):
+            self.verifier.verify(google_token(self.private, 'k1', 'web', iss='https://evil.test'))
+
+    def test_keys_expire_with_max_age_and_rotate_on_unknown_kid(self):
+        self.verifier.verify(google_token(self.private, 'k1', 'web'))
+        start = time.monotonic()
+        with mock.patch('accounts.google_auth.time.monotonic', return_value=start + 3499):
+            self.verifier.verify(google_token(self.private, 'k1', 'web'))
+        self.assertEqual(self.session.fetches, 1)
+        with mock.patch('accounts.google_auth.time.monotonic', return_value=start + 3501):
+            self.verifier.verify(google_token(self.private, 'k1', 'web'))
+        self.assertEqual(self.session.fetches, 2)
+
+        self.session.jwks = [self.jwk, self.rotated_jwk]
+        with mock.patch('accounts.google_auth.time.monotonic', return_value=start + 3600):
+            self.verifier.verify(google_token(self.rotated, 'k2', 'web'))
+            with self.assertRaises(InvalidGoogleToken):
+                self.verifier.verify(google_token(self.rotated, 'k3', 'web'))
+        # The made-up kid came too soon after the last fetch to trigger another
+        self.assertEqual(self.session.fetches, 3)
+
+    def login(self, token):
+        with mock.patch('accounts.api.verify_google_id_token', self.verifier.verify):
+            return APIClient().post('/api/auth/google/', {'access_token': token})
+
+    def test_first_login_bootstraps_user_and_profile(self):
+        User.objects.create_user(username='night', email='taken@campus.test')
+        response = self.login(google_token(self.private, 'k1', 'vercel'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['is_new_user'])
+        user = User.objects.get(email='night@campus.test')
+        self.assertTrue(user.is_verified)
+        self.assertNotEqual(user.username, 'night')
+        self.assertEqual(data['user']['profile']['lore_score'], 3)
+        self.assertEqual(Profile.objects.get(user=user).lore_score, 3)
+        self.assertEqual(self.login('not-a-jwt').status_code, 400)
+
+    def test_first_login_retries_when_its_username_is_taken_meanwhile(self):
+        User.objects.create_user(username='raced', email='other@campus.test')
+        # The username looked free when it was picked, then a parallel signup took it
+        with mock.patch('accounts.bootstrap._free_username', side_effect=['raced', 'night042']):
+            response = self.login(google_token(self.private, 'k1', 'vercel'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(User.objects.get(email='night@campus.test').username, 'night042')
+
+    def test_repeat_login_is_two_reads(self):
+        token = google_token(self.private, 'k1', 'web')
+        self.login(token)
+        # user joined to profile, then the already-claimed daily reward
+        with self.assertNumQueries(2):
+            data = self.login(token).json()
+        self.assertEqual(set(data['user']['profile']), {
+            'id', 'nickname', 'avatar_emoji', 'avatar_config', 'lore_score', 'is_developer',
+        })
+
+
+@override_settings(PROFILE_ME_CACHE=True)
+class ProfileMeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.profile = make_profile('regular', lore_score=10)
+        self.client = APIClient()
+        self.client.force_authenticate(self.profile.user)
+
+    def test_first_get_of_the_day_checks_in_then_gets_are_pure_reads(self):
+        data = self.client.get('/api/profiles/me/').json()
+        self.assertTrue(data['streak_increased'])
+        self.assertEqual((data['current_streak_count'], data['lore_score']), (1, 12))
+
+        with self.assertNumQueries(0):
+            data = self.client.get('/api/profiles/me/').json()
+        self.assertFalse(data['streak_increased'])
+        self.assertEqual(data['lore_score'], 12)
+
+    def test_profile_writes_and_awards_invalidate_the_cache(self):
+        self.client.get('/api/profiles/me/')
+        self.client.patch('/api/profiles/me/', {'bio': 'nocturnal'}, format='json')
+        self.assertEqual(self.client.get('/api/profiles/me/').json()['bio'], 'nocturnal')
+
+        award_lore(self.profile.user, 'comment', ref='c1')
+        self.assertEqual(self.client.get('/api/profiles/me/').json()['lore_score'], 14)
+
+    @override_settings(PROFILE_ME_CACHE=False)
+    def test_without_a_shared_cache_gets_read_the_database(self):
+        self.client.get('/api/profiles/me/')
+        # Another worker's write: its invalidation can't reach a per-process cache
+        Profile.objects.filter(pk=self.profile.pk).update(bio='changed elsewhere')
+        self.assertEqual(self.client.get('/api/profiles/me/').json()['bio'], 'changed elsewhere')
+
+    def test_check_in_counts_once_for_racing_requests(self):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        Profile.objects.filter(pk=self.profile.pk).update(last_checkin_date=yesterday, current_streak_count=4,
+                                                          last_freeze_grant=yesterday)
+        first, second = Profile.objects.get(pk=self.profile.pk), Profile.objects.get(pk=self.profile.pk)
+        self.assertEqual((first.check_in(), second.check_in()), (True, False))
+        self.assertEqual(Profile.objects.get(pk=self.profile.pk).current_streak_count, 5)
+
+
+class NicknameAllocatorTests(TestCase):
+    def test_namespace_decoding_covers_every_name_once(self):
+        self.assertEqual(NAMESPACE, 34 * 19 * 9990)
+        self.assertEqual(nickname_at(0), 'PunuguluMama10')
+        self.assertEqual(nickname_at(NAMESPACE - 1), 'BadushaDada9999')
+        sample = range(0, NAMESPACE, 997)
+        self.assertEqual(len({nickname_at(i) for i in sample}), len(sample))
+
+    def test_allocations_are_unique_and_skip_only_taken_names(self):
+        allocate_nickname()
+        sequence = NicknameSequence.objects.get()
+        upcoming = [nickname_at((sequence.multiplier * p + sequence.offset) % NAMESPACE)
+                    for p in range(sequence.position, sequence.position + 3)]
+        # Someone already holds the next name in the sequence (e.g. a legacy draw)
+        make_profile(upcoming[0])
+        self.assertEqual(allocate_nickname(), upcoming[1])
+        # Free names are never skipped
+        self.assertEqual(allocate_nickname(), upcoming[2])
+
+        names = [allocate_nickname() for _ in range(200)]
+        self.assertEqual(len(set(names)), 200)
+        self.assertEqual(NicknameSequence.objects.get().position, sequence.position + 3 + 200)
+
+    def test_allocation_takes_constant_queries(self):
+        allocate_nickname()
+        # UPDATE ... RETURNING on the cursor, then the free-name check
+        with self.assertNumQueries(2):
+            allocate_nickname()
+
+    def test_endpoint_needs_a_login_and_reports_exhaustion(self):
+        cache.clear()
+        client = APIClient()
+        self.assertEqual(client.get('/api/auth/generate_nickname/').status_code, 401)
+
+        client.force_authenticate(make_profile('onboarding').user)
+        self.assertEqual(client.get('/api/auth/generate_nickname/').status_code, 200)
+        NicknameSequence.objects.update(position=NAMESPACE)
+        response = client.get('/api/auth/generate_nickname/')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('error', response.json())
+
+    def test_taken_nickname_is_a_400(self):
+        make_profile('owner')
+        newcomer = make_profile('newcomer')
+        Profile.objects.filter(pk=newcomer.pk).update(nickname=None)
+        client = APIClient()
+        client.force_authenticate(newcomer.user)
+        self.assertEqual(client.patch('/api/profiles/me/', {'nickname': 'owner'}, format='json').status_code, 400)
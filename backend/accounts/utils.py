@@ -3,22 +3,23 @@ import string
 from django.utils import timezone
 from datetime import timedelta
 
+SNACKS = [
+    "Punugulu", "Bobbatlu", "MirchiBajji", "Garelu", "Majjiga", "Sakinala", "Chekkalu", "Laddu", 
+    "Pulihora", "Bondalu", "Ariselu", "Sunnundalu", "KobbariLauzu", "Avakai", "MysoreBondam",
+    "Jilebi", "Murukku", "Boorelu", "KaramPusa", "Paalakova", "Pootharekulu", "Gongura",
+    "PappuChekka", "AtukulaUpma", "SamosaGadu", "ChaiBisket", "VadaPavGadu", "PeruguVada",
+    "Chikki", "MangoPachadi", "GoliSoda", "Panakam", "Payasam", "Badusha"
+]
+SUFFIXES = [
+    "Mama", "Anna", "Thammudu", "Dosthu", "Vibes", "Gadu", "Soul", "Rider", "Boss",
+    "Power", "Icon", "Magic", "King", "Ace", "Star", "Ninja", "Dude", "Fan", "Dada"
+]
+NUMBERS = range(10, 10000) # 2-4 digits
+
 def generate_thematic_nickname():
     """Generate a system-controlled Telugu snack username with a random number."""
-    snacks = [
-        "Punugulu", "Bobbatlu", "MirchiBajji", "Garelu", "Majjiga", "Sakinala", "Chekkalu", "Laddu", 
-        "Pulihora", "Bondalu", "Ariselu", "Sunnundalu", "KobbariLauzu", "Avakai", "MysoreBondam",
-        "Jilebi", "Murukku", "Boorelu", "KaramPusa", "Paalakova", "Pootharekulu", "Gongura",
-        "PappuChekka", "AtukulaUpma", "SamosaGadu", "ChaiBisket", "VadaPavGadu", "PeruguVada",
-        "Chikki", "MangoPachadi", "GoliSoda", "Panakam", "Payasam", "Badusha"
-    ]
-    suffixes = [
-        "Mama", "Anna", "Thammudu", "Dosthu", "Vibes", "Gadu", "Soul", "Rider", "Boss",
-        "Power", "Icon", "Magic", "King", "Ace", "Star", "Ninja", "Dude", "Fan", "Dada"
-    ]
-    
-    snack = random.choice(snacks)
-    suffix = random.choice(suffixes)
-    number = random.randint(10, 9999) # 2-4 digits
+    snack = random.choice(SNACKS)
+    suffix = random.choice(SUFFIXES)
+    number = random.choice(NUMBERS)
     
     return f"{snack}{suffix}{number}"
@@ -0,0 +1,45 @@
+"""
+JWT authentication for websocket connections.
+
+Browsers can't set an Authorization header on a WebSocket, so the access
+token travels as ?token=<jwt> on the socket URL (falling back to the
+dj-rest-auth "auth" cookie). Sockets without a valid token keep whatever
+the session middleware found, usually AnonymousUser.
+"""
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+
+
+@database_sync_to_async
+def user_for_token(raw_token):
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware:
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        token = query.get('token', [None])[0]
+        if not token:
+            cookie_name = getattr(settings, 'REST_AUTH', {}).get('JWT_AUTH_COOKIE')
+            token = scope.get('cookies', {}).get(cookie_name) if cookie_name else None
+        if token:
+            scope = {**scope, 'user': await user_for_token(token)}
+        return await self.inner(scope, receive, send)
+
+
+def JWTAuthMiddlewareStack(inner):
+    return AuthMiddlewareStack(JWTAuthMiddleware(inner))
@@ -0,0 +1,19 @@
+"""
+Standalone performance benchmarks. Run from backend/ as modules, e.g.
+
+    python -m benchmarks.wall_broadcast
+
+Each script calls `setup()` first, which configures Django and (by default)
+builds a throwaway test database so benchmarks never touch db.sqlite3.
+"""
+import os
+
+
+def setup(database=True):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+    if database:
+        from django.test.utils import setup_databases, setup_test_environment
+        setup_test_environment()
+        setup_databases(verbosity=0, interactive=False)
@@ -0,0 +1,77 @@
+"""
+Chat history latency as a match grows: the old full-history response vs one
+keyset page (latest, deep ?before=, and ?after= polling).
+
+    python -m benchmarks.chat_history [--sizes 100 1000 10000] [--limit 50]
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from benchmarks import setup
+
+setup()
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from accounts.models import User  # noqa: E402
+from matches.models import MatchChatMessage, MatchPool, MutualMatch  # noqa: E402
+from matches.serializers import ChatMessageSerializer  # noqa: E402
+
+
+def make_match(size):
+    a = User.objects.create(username=f'a{size}', email=f'a{size}@campus.test')
+    b = User.objects.create(username=f'b{size}', email=f'b{size}@campus.test')
+    match = MutualMatch.objects.create(user1=a, user2=b, pool=MatchPool.objects.create(campus='Main Campus'), status='active')
+    start = timezone.now() - timedelta(days=1)
+    MatchChatMessage.objects.bulk_create([
+        MatchChatMessage(match=match, sender=a if i % 2 else b, text=f'message {i}') for i in range(size)
+    ], batch_size=5000)
+    # auto_now_add stamps one instant; spread them out like a real chat
+    for i, pk in enumerate(match.messages.order_by('pk').values_list('pk', flat=True)):
+        MatchChatMessage.objects.filter(pk=pk).update(created_at=start + timedelta(seconds=i))
+    return match, a
+
+
+def timed(fn, repeat=20):
+    best = float('inf')
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - begin)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'messages':>9} {'full ms':>8} {'latest ms':>10} {'deep ms':>8} {'after ms':>9}")
+    for size in args.sizes:
+        match, user = make_match(size)
+        client = APIClient()
+        client.force_authenticate(user)
+        url = f'/api/mutual/{match.id}/messages/'
+        oldest = match.messages.order_by('id')[size // 10]
+        newest = match.messages.order_by('-id').first()
+
+        class Request:
+            user = None
+        Request.user = user
+
+        def full():
+            msgs = match.messages.all().order_by('created_at')
+            ChatMessageSerializer(msgs, many=True, context={'request': Request}).data
+
+        full_ms = timed(full, 3)
+        latest_ms = timed(lambda: client.get(url, {'limit': args.limit}))
+        deep_ms = timed(lambda: client.get(url, {'limit': args.limit, 'before': oldest.id}))
+        after_ms = timed(lambda: client.get(url, {'after': newest.id}))
+        print(f"{size:>9} {full_ms:>8.1f} {latest_ms:>10.2f} {deep_ms:>8.2f} {after_ms:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
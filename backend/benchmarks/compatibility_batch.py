@@ -0,0 +1,58 @@
+"""
+Per-pair vs batch compatibility scoring for one viewer against a pool.
+
+    python -m benchmarks.compatibility_batch [--sizes 9 100 10000]
+
+"per-pair" is the old path: calculate_all_meters for every member, keeping
+one meter. "batch/1" asks calculate_meters_batch for that one meter only;
+"batch/all" computes all 12 for comparison.
+"""
+import argparse
+import random
+import time
+
+from benchmarks import setup
+
+setup(database=False)
+
+from matches.compatibility import (  # noqa: E402
+    ALL_METERS, calculate_all_meters, calculate_meters_batch,
+)
+from matches.tests import random_profile  # noqa: E402
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[9, 100, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'pool':>7} {'per-pair ms':>12} {'batch/1 ms':>11} {'batch/all ms':>13} {'speedup':>8}")
+    for size in args.sizes:
+        viewer = random_profile(rng)
+        pool = [random_profile(rng) for _ in range(size)]
+        picks = [[rng.choice(ALL_METERS)] for _ in pool]
+
+        def per_pair():
+            for member, keys in zip(pool, picks):
+                meters = calculate_all_meters(viewer, member)
+                {key: meters[key] for key in keys}
+
+        pair_ms = timed(per_pair, args.repeat)
+        one_ms = timed(lambda: calculate_meters_batch(viewer, pool, picks), args.repeat)
+        all_ms = timed(lambda: calculate_meters_batch(viewer, pool), args.repeat)
+        print(f"{size:>7} {pair_ms:>12.2f} {one_ms:>11.2f} {all_ms:>13.2f} {pair_ms / one_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
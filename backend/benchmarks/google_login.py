@@ -0,0 +1,104 @@
+"""
+Google ID-token verification latency against a local stub JWKS server.
+
+    python -m benchmarks.google_login [--logins 200] [--latency 40]
+
+The stub serves a JWK set with `Cache-Control: max-age=3600` after sleeping
+`--latency` ms, standing in for the round trip to googleapis.com. Tokens are
+issued for the second allowed client ID (the Vercel one), the worst case for
+the old loop over ALLOWED_CLIENT_IDS. That loop fetched keys with a fresh
+transport and verified the signature once per client ID tried.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import setup
+
+setup(database=False)
+
+import jwt  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: E402
+from django.conf import settings  # noqa: E402
+from google.auth.transport import requests as google_requests  # noqa: E402
+from google.oauth2 import id_token  # noqa: E402
+
+from accounts.google_auth import GoogleKeySet, GoogleTokenVerifier  # noqa: E402
+
+
+def stub_server(jwks, latency):
+    body = json.dumps(jwks).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        fetches = 0
+
+        def do_GET(self):
+            Handler.fetches += 1
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Cache-Control', 'public, max-age=3600')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, Handler
+
+
+def legacy_verify(token, client_ids, certs_url):
+    errors = []
+    for client_id in client_ids:
+        try:
+            return id_token.verify_token(token, google_requests.Request(), client_id, certs_url=certs_url)
+        except (ValueError, jwt.PyJWTError) as e:
+            errors.append(str(e))
+    raise ValueError(errors)
+
+
+def timed(fn, tokens):
+    start = time.perf_counter()
+    for token in tokens:
+        fn(token)
+    return (time.perf_counter() - start) * 1000 / len(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=40, help="Simulated JWKS round trip in ms")
+    args = parser.parse_args()
+
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = {**jwt.algorithms.RSAAlgorithm.to_jwk(private.public_key(), as_dict=True),
+           'kid': 'bench', 'use': 'sig', 'alg': 'RS256'}
+    server, handler = stub_server({'keys': [jwk]}, args.latency / 1000)
+    url = f'http://127.0.0.1:{server.server_port}/certs'
+
+    client_ids = settings.GOOGLE_OAUTH_CLIENT_IDS
+    now = int(time.time())
+    tokens = [
+        jwt.encode({'iss': 'https://accounts.google.com', 'aud': client_ids[-1], 'iat': now, 'exp': now + 3600,
+                    'email': f'bench{i}@campus.test'}, private, algorithm='RS256', headers={'kid': 'bench'})
+        for i in range(args.logins)
+    ]
+
+    print(f"{args.logins} logins, {len(client_ids)} client IDs, stub JWKS latency {args.latency:.0f} ms")
+    legacy = timed(lambda token: legacy_verify(token, client_ids, url), tokens)
+    print(f"per-client-id loop  {legacy:8.2f} ms/login  ({handler.fetches} key fetches)")
+
+    handler.fetches = 0
+    verifier = GoogleTokenVerifier(GoogleKeySet(url), client_ids)
+    cached = timed(verifier.verify, tokens)
+    print(f"cached key set      {cached:8.2f} ms/login  ({handler.fetches} key fetches)")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Exam-night login storm: the old per-login get_or_create + full
+UserSerializer path vs accounts.bootstrap.
+
+    python -m benchmarks.login_storm [--users 2000] [--logins 10000]
+
+Locust-style: each "virtual user" logs in repeatedly in random order, so
+the mix is mostly returning users with a first-login burst at the start.
+Google token verification is stubbed out (see benchmarks.google_login);
+this measures only the database and serialization work per login.
+Requests run one at a time, as SQLite serializes writers anyway; the
+number of queries, and writes in particular, is what decides throughput on
+a real server.
+"""
+import argparse
+import random
+import statistics
+import time
+from unittest import mock
+
+from benchmarks import setup
+
+setup()
+
+from django.db import connection, reset_queries  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from accounts.api import GoogleLogin  # noqa: E402
+from accounts.lore import award_lore  # noqa: E402
+from accounts.models import Profile, User  # noqa: E402
+from accounts.serializers import UserSerializer  # noqa: E402
+
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def legacy_login(email):
+    """GoogleLogin.post's database work before the bootstrap path."""
+    user, created = User.objects.get_or_create(email=email, defaults={'username': email.split('@')[0], 'is_verified': True})
+    if not created and not user.is_verified:
+        user.is_verified = True
+        user.save()
+    profile, _ = Profile.objects.get_or_create(user=user)
+    award_lore(user, 'daily_login')
+    refresh = RefreshToken.for_user(user)
+    return {'access': str(refresh.access_token), 'refresh': str(refresh), 'user': UserSerializer(user).data,
+            'is_new_user': created or not profile.nickname}
+
+
+def run(label, login, schedule):
+    stats = {'first': ([], [0], [0]), 'returning': ([], [0], [0])}
+    seen = set()
+    for email in schedule:
+        latencies, queries, writes = stats['returning' if email in seen else 'first']
+        seen.add(email)
+        # The query log is a bounded deque; keep it from filling up
+        reset_queries()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            login(email)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries[0] += len(ctx.captured_queries)
+        writes[0] += sum(q['sql'].lstrip().upper().startswith(WRITES) for q in ctx.captured_queries)
+
+    total = sum(sum(latencies) for latencies, _, _ in stats.values()) / 1000
+    print(f"{label}: {len(schedule) / total:.0f} logins/s")
+    for kind, (latencies, queries, writes) in stats.items():
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95)]
+        print(f"  {kind:9s} p50 {statistics.median(latencies):6.2f} ms  p95 {p95:6.2f} ms  "
+              f"{queries[0] / len(latencies):5.2f} queries  {writes[0] / len(latencies):5.2f} writes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--logins', type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    factory = APIRequestFactory()
+    view = GoogleLogin.as_view()
+
+    def bootstrap_login(email):
+        response = view(factory.post('/api/auth/google/', {'access_token': email}, format='json'))
+        response.render()
+        assert response.status_code == 200, response.content
+
+    def legacy_view(email):
+        legacy_login(email)
+
+    for label, login, domain in (('legacy', legacy_view, 'old'), ('bootstrap', bootstrap_login, 'new')):
+        emails = [f'student{i}@{domain}.campus.test' for i in range(args.users)]
+        # Everyone logs in once, then the rest of the storm is returning users
+        schedule = emails + [rng.choice(emails) for _ in range(args.logins - args.users)]
+        with mock.patch('accounts.api.verify_google_id_token', side_effect=lambda token: {'email': token}):
+            run(label, login, schedule)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Lore leaderboard at campus scale: ORDER BY / COUNT over Profile.lore_score
+per request vs the incrementally maintained boards in accounts.leaderboard.
+
+    python -m benchmarks.lore_leaderboard [--profiles 100000] [--queries 200]
+
+Both answer "top 100" and "my rank" for random users; the board also
+absorbs a burst of score updates to show what each award costs.
+"""
+import argparse
+import random
+import time
+
+from benchmarks import setup
+
+setup()
+
+from accounts.leaderboard import get_leaderboard  # noqa: E402
+from accounts.models import Profile, User  # noqa: E402
+
+CAMPUSES = ['Main Campus', 'North', 'South', 'East']
+
+
+def populate(count, rng):
+    users = User.objects.bulk_create(
+        [User(username=f'bench{i}', email=f'bench{i}@campus.test') for i in range(count)], batch_size=5000,
+    )
+    Profile.objects.bulk_create(
+        [Profile(user=user, nickname=f'bench{i}', lore_score=int(rng.paretovariate(1.5) * 10) % 500,
+                 campus=rng.choice(CAMPUSES)) for i, user in enumerate(users)],
+        batch_size=5000,
+    )
+    return [str(user.pk) for user in users]
+
+
+def sql_query(user_id):
+    ranked = Profile.objects.filter(is_developer=False)
+    list(ranked.order_by('-lore_score').values_list('user_id', 'lore_score')[:100])
+    score = ranked.values_list('lore_score', flat=True).get(user_id=user_id)
+    return ranked.filter(lore_score__gt=score).count() + 1
+
+
+def board_query(user_id):
+    board = get_leaderboard()
+    board.standings('global', 100)
+    return board.rank_of('global', user_id)[0]
+
+
+def timed(fn, targets):
+    start = time.perf_counter()
+    for target in targets:
+        fn(target)
+    return (time.perf_counter() - start) * 1000 / len(targets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    start = time.perf_counter()
+    members = populate(args.profiles, rng)
+    print(f"populated {args.profiles} profiles in {time.perf_counter() - start:.1f}s")
+
+    board = get_leaderboard()
+    start = time.perf_counter()
+    board.ensure('global')
+    print(f"board load     {(time.perf_counter() - start) * 1000:8.1f} ms (once per process)")
+
+    targets = rng.sample(members, args.queries)
+    for target in targets[:20]:
+        assert sql_query(target) == board_query(target)
+    print(f"ORDER BY scan  {timed(sql_query, targets):8.3f} ms/query")
+    print(f"board          {timed(board_query, targets):8.3f} ms/query")
+
+    updates = [(rng.choice(members), rng.randint(0, 499)) for _ in range(args.queries * 50)]
+    start = time.perf_counter()
+    for member, score in updates:
+        board.backend.set_many('global', {member: score})
+    print(f"board update   {(time.perf_counter() - start) * 1000 / len(updates):8.4f} ms/update")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Pool formation time for a campus of N waiting profiles.
+
+    python -m benchmarks.match_scheduler [--sizes 1000 10000 30000] [--window 32]
+
+Times form_pools alone (no database) and reports the mean in-pool affinity
+against pools cut in arrival order, which is what current_pool used to do.
+"""
+import argparse
+import random
+import time
+
+from benchmarks import setup
+
+setup(database=False)
+
+from matches.compatibility import ProfileEncoder  # noqa: E402
+from matches.scheduler import Candidate, _affinity_fn, form_pools  # noqa: E402
+from matches.tests import random_profile  # noqa: E402
+
+
+def random_person(rng, index):
+    return {
+        'user_id': index, **random_profile(rng),
+        'gender': rng.choice(['man', 'woman', 'others', '']),
+        'match_preference': rng.choice(['women', 'men', 'everyone']),
+        'looking_for': rng.choice(['friends', 'dating', 'both']),
+    }
+
+
+def mean_affinity(people, pools):
+    enc = ProfileEncoder()
+    affinity = _affinity_fn(enc)
+    by_id = {
+        p['user_id']: Candidate(p['user_id'], enc.encode(p), p['gender'], p['match_preference'], p['looking_for'])
+        for p in people
+    }
+    total = pairs = 0
+    for pool in pools:
+        members = [by_id[user_id] for user_id in pool]
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                total += affinity(a, b)
+                pairs += 1
+    return total / pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 30000])
+    parser.add_argument('--window', type=int, default=32)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'people':>7} {'pools':>6} {'form ms':>9} {'affinity':>9} {'arrival':>8}")
+    for size in args.sizes:
+        people = [random_person(rng, i) for i in range(size)]
+        start = time.perf_counter()
+        pools = form_pools(people, window=args.window)
+        elapsed = (time.perf_counter() - start) * 1000
+        arrival = [[p['user_id'] for p in people[i:i + 9]] for i in range(0, size, 9)]
+        print(f"{size:>7} {len(pools):>6} {elapsed:>9.0f} "
+              f"{mean_affinity(people, pools):>9.1f} {mean_affinity(people, arrival):>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Nickname allocation with a million names already handed out: the old
+retry-and-check loop vs the shuffled sequence in accounts.nicknames.
+
+    python -m benchmarks.nickname_allocation [--taken 1000000] [--calls 5000]
+
+The setup writes `--taken` profiles. Most hold names the sequence already
+handed out (the cursor is advanced past them). 2% hold random legacy draws
+that can collide with what the sequence hands out next. The old loop tries up
+to 5 random names with an exists() query each and then returns an
+unchecked one.
+"""
+import argparse
+import random
+import time
+
+from benchmarks import setup
+
+setup()
+
+from django.db import connection, reset_queries  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from accounts.models import NicknameSequence, Profile, User  # noqa: E402
+from accounts.nicknames import NAMESPACE, allocate_nickname, nickname_at  # noqa: E402
+from accounts.utils import generate_thematic_nickname  # noqa: E402
+
+BATCH = 20000
+
+
+def populate(taken, rng):
+    sequence = NicknameSequence.objects.create(pk=1, multiplier=1_299_709, offset=rng.randrange(NAMESPACE))
+    names = set()
+    position = 0
+    while len(names) < taken:
+        if rng.random() < 0.02:
+            names.add(generate_thematic_nickname())
+        else:
+            names.add(nickname_at((sequence.multiplier * position + sequence.offset) % NAMESPACE))
+            position += 1
+    NicknameSequence.objects.filter(pk=1).update(position=position)
+
+    names = list(names)
+    for start in range(0, len(names), BATCH):
+        chunk = names[start:start + BATCH]
+        users = User.objects.bulk_create(
+            [User(username=f'n{start + i}', email=f'n{start + i}@campus.test') for i in range(len(chunk))],
+        )
+        # Nicknames only; bulk_create skips Profile.save's ledger and tag work
+        Profile.objects.bulk_create([Profile(user=user, nickname=name) for user, name in zip(users, chunk)])
+
+
+def legacy_nickname():
+    for _ in range(5):
+        nickname = generate_thematic_nickname()
+        if not Profile.objects.filter(nickname=nickname).exists():
+            return nickname, True
+    return generate_thematic_nickname(), False
+
+
+def measure(label, fn, calls):
+    queries = 0
+    start = time.perf_counter()
+    results = []
+    for _ in range(calls):
+        reset_queries()
+        with CaptureQueriesContext(connection) as ctx:
+            results.append(fn())
+        queries += len(ctx.captured_queries)
+    elapsed = (time.perf_counter() - start) * 1000 / calls
+    print(f"{label:10s} {elapsed:7.3f} ms/name  {queries / calls:5.2f} queries/name")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--taken', type=int, default=1_000_000)
+    parser.add_argument('--calls', type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    random.seed(42)
+    start = time.perf_counter()
+    populate(args.taken, rng)
+    print(f"populated {args.taken} nicknames ({args.taken / NAMESPACE:.1%} of the namespace) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    taken = set(Profile.objects.values_list('nickname', flat=True))
+    legacy = measure('legacy', legacy_nickname, args.calls)
+    unchecked = sum(not checked for _, checked in legacy)
+    clashes = sum(name in taken for name, _ in legacy)
+    print(f"           {unchecked} unchecked fallbacks, {clashes} names already taken")
+
+    allocated = measure('sequence', allocate_nickname, args.calls)
+    print(f"           {len(allocated) - len(set(allocated))} repeats, "
+          f"{sum(name in taken for name in allocated)} names already taken")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+"People like me" at campus scale: Python scan over the JSON fields vs the
+ProfileTag inverted index.
+
+    python -m benchmarks.profile_tags [--profiles 50000] [--queries 20]
+
+The scan loads every profile's attribute lists and computes Jaccard in
+Python, which is the only option without the tag table.
+"""
+import argparse
+import random
+import time
+
+from benchmarks import setup
+
+setup()
+
+from accounts.models import Profile, ProfileTag, User  # noqa: E402
+from matches.tests import random_profile  # noqa: E402
+
+
+def populate(count, rng):
+    users = User.objects.bulk_create(
+        [User(username=f'bench{i}', email=f'bench{i}@campus.test') for i in range(count)], batch_size=5000,
+    )
+    profiles = [Profile(user=user, **random_profile(rng)) for user in users]
+    for profile in profiles:
+        profile.tag_count = len(profile.tag_set())
+    Profile.objects.bulk_create(profiles, batch_size=5000)
+    ProfileTag.objects.bulk_create(
+        [ProfileTag(profile=profile, kind=kind, value=value) for profile in profiles for kind, value in profile.tag_set()],
+        batch_size=10000,
+    )
+    return profiles
+
+
+def scan(me, limit=20):
+    mine = me.tag_set()
+    scored = []
+    for profile in Profile.objects.filter(campus=me.campus).exclude(pk=me.pk).only('pk', *Profile.TAG_FIELDS.values()):
+        theirs = profile.tag_set()
+        shared = len(mine & theirs)
+        if shared:
+            scored.append((shared / len(mine | theirs), profile.pk))
+    scored.sort(reverse=True)
+    return scored[:limit]
+
+
+def timed(fn, targets):
+    start = time.perf_counter()
+    for profile in targets:
+        fn(profile)
+    return (time.perf_counter() - start) * 1000 / len(targets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    start = time.perf_counter()
+    profiles = populate(args.profiles, rng)
+    print(f"populated {args.profiles} profiles / {ProfileTag.objects.count()} tags in {time.perf_counter() - start:.1f}s")
+
+    targets = rng.sample(profiles, args.queries)
+    print(f"python scan    {timed(scan, targets):8.1f} ms/query")
+    print(f"tag index      {timed(lambda p: p.similar_profiles(), targets):8.1f} ms/query")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Load test: end-to-end broadcast latency to N connected WallConsumer sockets.
+
+    python -m benchmarks.wall_broadcast                 # 1k/5k/10k, in-memory layer
+    python -m benchmarks.wall_broadcast --sizes 1000 --shards 1
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.wall_broadcast
+
+Only a run with REDIS_URL set measures Redis: it goes through channels_redis
+and fails up front if the server can't be reached. Without it the numbers
+are for the in-memory layer, i.e. the fan-out alone (group bookkeeping,
+per-socket serialization) with no network round trips, and are labelled so.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks import setup
+
+setup(database=False)
+
+from channels.layers import get_channel_layer  # noqa: E402
+from channels.routing import URLRouter  # noqa: E402
+from channels.testing import WebsocketCommunicator  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from wall import broadcast  # noqa: E402
+from wall.routing import websocket_urlpatterns  # noqa: E402
+
+
+async def run(size, rounds):
+    application = URLRouter(websocket_urlpatterns)
+    sockets = [WebsocketCommunicator(application, '/ws/wall/') for _ in range(size)]
+    for socket in sockets:
+        connected, _ = await socket.connect(timeout=10)
+        assert connected
+
+    layer = get_channel_layer()
+    latencies = []
+    for i in range(rounds):
+        sent = time.perf_counter()
+        await broadcast.group_send_all(layer, {
+            'type': 'wall_update',
+            'message': {'type': 'reaction_updated', 'post': {'id': str(i), 'reaction_count': i}},
+        })
+        await asyncio.gather(*(socket.receive_from(timeout=30) for socket in sockets))
+        latencies.append((time.perf_counter() - sent) * 1000)
+
+    for socket in sockets:
+        await socket.disconnect()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 10000])
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--shards', type=int, default=None, help="Override WALL_FEED_SHARDS")
+    args = parser.parse_args()
+
+    if args.shards:
+        settings.WALL_FEED_SHARDS = args.shards
+
+    if settings.REDIS_URL:
+        import redis
+
+        redis.Redis.from_url(settings.REDIS_URL).ping()
+        layer = f"redis ({settings.REDIS_URL})"
+    else:
+        layer = "in-memory (no Redis: set REDIS_URL to measure it)"
+    print(f"layer={layer} shards={broadcast.shard_count()} rounds={args.rounds}")
+    print(f"{'sockets':>8} {'p50 ms':>10} {'max ms':>10}")
+    for size in args.sizes:
+        latencies = asyncio.run(run(size, args.rounds))
+        print(f"{size:>8} {statistics.median(latencies):>10.1f} {max(latencies):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Bytes on the wire per wall event: full serialized objects vs v2 deltas,
+under each socket framing (json / msgpack / deflate).
+
+    python -m benchmarks.wall_payload_size [--events 100]
+
+Deflate figures are per message after warm-up of a shared context, which is
+what a long-lived socket sees.
+"""
+import argparse
+import uuid
+
+from benchmarks import setup
+
+setup()
+
+from django.utils import timezone  # noqa: E402
+
+from accounts.models import User, Profile  # noqa: E402
+from events.models import Event  # noqa: E402
+from events.serializers import EventSerializer  # noqa: E402
+from wall.models import WallPost  # noqa: E402
+from wall.protocol import FrameEncoder, versioned  # noqa: E402
+from wall.serializers import WallPostSerializer  # noqa: E402
+
+
+def sample_user():
+    user = User.objects.create_user(username=f'MirchiBajjiMama{uuid.uuid4().hex[:6]}', email=f'{uuid.uuid4().hex}@campus.test')
+    Profile.objects.create(
+        user=user, nickname=user.username, bio='Night owl. Canteen critic.',
+        interests=['memes', 'music', 'coding', 'chai'], social_energy=['recharge_alone'],
+        connection_intent=['deep'], brain_type='overthinker', avatar_config={'face': 3, 'hair': 7, 'color': '#ff66aa'},
+    )
+    return user
+
+
+def payloads(i):
+    user = sample_user()
+    post = WallPost.objects.create(user=user, title='Library at 2am', content='Who else is here? ' * 8,
+                                   reaction_count=40 + i, fire_count=12 + i)
+    event = Event.objects.create(organizer=user, title='Terrace jam', description='Bring snacks. ' * 10,
+                                 location='Hostel B terrace', start_time=timezone.now(), end_time=timezone.now())
+
+    full_post = {'type': 'reaction_updated', 'post': WallPostSerializer(post).data}
+    delta_post = versioned({'type': 'reaction_updated', 'post': {
+        'id': str(post.id), 'reaction_count': post.reaction_count, 'reaction_counts': post.reaction_counts,
+    }})
+    full_event = {'type': 'event_reaction_updated', 'event': EventSerializer(event).data}
+    delta_event = versioned({'type': 'event_reaction_updated', 'event': {
+        'id': str(event.id), 'reaction_counts': event.reaction_counts(),
+    }})
+    return {
+        'post full (v1)': full_post, 'post delta (v2)': delta_post,
+        'event full (v1)': full_event, 'event delta (v2)': delta_event,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=100)
+    args = parser.parse_args()
+
+    totals = {}
+    encoders = {}
+    for i in range(args.events):
+        for name, message in payloads(i).items():
+            for fmt in ('json', 'msgpack', 'deflate'):
+                encoder = encoders.setdefault((name, fmt), FrameEncoder(fmt))
+                text, data = encoder.encode(message)
+                size = len(text.encode()) if text is not None else len(data)
+                totals[(name, fmt)] = totals.get((name, fmt), 0) + size
+
+    print(f"average bytes per event over {args.events} events")
+    print(f"{'payload':<18} {'json':>8} {'msgpack':>8} {'deflate':>8}")
+    for name in dict.fromkeys(name for name, _ in totals):
+        row = [totals[(name, fmt)] / args.events for fmt in ('json', 'msgpack', 'deflate')]
+        print(f"{name:<18} {row[0]:>8.0f} {row[1]:>8.0f} {row[2]:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
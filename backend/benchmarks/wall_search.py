@@ -0,0 +1,130 @@
+"""
+Wall search over a million posts: the admin's LIKE '%q%' scans vs the
+ranked full-text index in wall.search.
+
+    python -m benchmarks.wall_search [--posts 1000000] [--queries 50]
+
+Posts draw words Zipf-style from a 20k-word vocabulary with campus words
+spread across the frequency ranks, so queries mix common words that match
+a large share of posts with rare words and prefixes that match few. Both paths return the top 20
+non-deleted posts; LIKE has no rank, so it returns the newest matches,
+and FTS ranks the newest RANK_WINDOW matches (config.search).
+The index is built in one pass after the bulk insert, then the cost of
+keeping it current is shown for single saves.
+"""
+import argparse
+import itertools
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from benchmarks import setup
+
+setup()
+
+from django.db import transaction  # noqa: E402
+from django.db.models import Q  # noqa: E402
+
+from accounts.models import User  # noqa: E402
+from config.search import search_page  # noqa: E402
+from wall.feed import feed_queryset  # noqa: E402
+from wall.models import WallPost  # noqa: E402
+from wall.search import post_index  # noqa: E402
+
+WORDS = (
+    'exam canteen hostel library wifi samosa chai maggi proxy attendance professor lab assignment '
+    'deadline fest hackathon crush senior junior placement internship cgpa viva semester mess food '
+    'terrace cycle gate warden curfew night morning lecture bunk notes xerox printer quiz midsem '
+    'endsem club band dance cricket football basketball gym rain monsoon bus auto train weekend '
+    'roommate laundry generator power cut coffee maths physics chemistry coding python project'
+).split()
+QUERIES = ['exam', 'wifi printer', 'hackathon', 'samosa chai', 'placement internship', 'warden curfew',
+           'hack', 'gener', 'quiz midsem notes', 'monsoon rain bus']
+BATCH = 5000
+# search_page() only reads query_params
+REQUEST = SimpleNamespace(query_params={'limit': 20})
+VOCABULARY = 20000
+
+
+def vocabulary():
+    words = [f'w{i}' for i in range(VOCABULARY)]
+    for i, word in enumerate(WORDS):
+        # From rank 5 (in roughly 1 post in 5) down to rank ~6000 (rare)
+        words[int(5 * 1.12 ** i) + i] = word
+    return words
+
+
+def populate(count, rng):
+    authors = User.objects.bulk_create([User(username=f'bench{i}', email=f'bench{i}@campus.test') for i in range(500)])
+    words_by_rank = vocabulary()
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words_by_rank))))
+    for start in range(0, count, BATCH):
+        posts = []
+        for _ in range(min(BATCH, count - start)):
+            words = rng.choices(words_by_rank, cum_weights=cum_weights, k=rng.randint(6, 40))
+            posts.append(WallPost(
+                user=rng.choice(authors), title=' '.join(words[:3]).title() if rng.random() < 0.4 else '',
+                content=' '.join(words), is_anonymous=rng.random() < 0.3, is_deleted=rng.random() < 0.02,
+            ))
+        WallPost.objects.bulk_create(posts)
+
+
+def like_search(text):
+    posts = feed_queryset()
+    for word in text.split():
+        posts = posts.filter(Q(title__icontains=word) | Q(content__icontains=word))
+    return list(posts.order_by('-created_at')[:20])
+
+
+def fts_search(text):
+    ranked = post_index.search(WallPost.objects.filter(is_deleted=False), text)
+    return search_page(ranked, feed_queryset(), REQUEST)[0]
+
+
+def timed(fn, queries):
+    latencies = []
+    for text in queries:
+        start = time.perf_counter()
+        fn(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    start = time.perf_counter()
+    populate(args.posts, rng)
+    print(f"inserted {args.posts} posts in {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    with transaction.atomic():
+        post_index.rebuild()
+    print(f"built the index in {time.perf_counter() - start:.1f}s")
+
+    queries = [rng.choice(QUERIES) for _ in range(args.queries)]
+    for label, fn in (('LIKE', like_search), ('FTS5', fts_search)):
+        p50, p95 = timed(fn, queries)
+        print(f"{label:5s} p50 {p50:8.2f} ms  p95 {p95:8.2f} ms")
+
+    author = User.objects.first()
+    saves = []
+    for i in range(200):
+        start = time.perf_counter()
+        post = WallPost(user=author, content=f'benchmark post {i} about the {rng.choice(WORDS)}')
+        with transaction.atomic():
+            WallPost.objects.bulk_create([post])
+            indexed = time.perf_counter()
+            post_index.index(post)
+        saves.append(((indexed - start) * 1000, (time.perf_counter() - indexed) * 1000))
+    print(f"per post: insert {statistics.median(s for s, _ in saves):.3f} ms, "
+          f"index {statistics.median(i for _, i in saves):.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
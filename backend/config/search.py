@@ -0,0 +1,207 @@
+"""
+Full-text search shared by the wall and events.
+
+On SQLite each searchable table gets an FTS5 table `<table>_fts` holding a
+copy of its text columns plus the row's pk (UNINDEXED). The models' save()
+and delete() keep it in step through `SearchIndex.index()` and `remove()`,
+inside the same transaction as the row write. The FTS rowid is the row's
+created_at in milliseconds followed by 20 bits of its UUID pk (probing on
+to the next free rowid in the rare case two rows land on the same one), so
+re-indexing or removing a row is a short rowid range lookup and the newest
+matches sit at the top of every match list. A query ranks only its
+RANK_WINDOW newest matches that the caller's queryset lets through, so a
+word in every other post costs about what a rare one does. Searches join back to the base table, so rows deleted
+behind the model's back (bulk deletes, cascades) never show up;
+`python manage.py rebuild_search_index` clears them out and indexes rows
+written with bulk_create().
+
+On Postgres the table gets a generated tsvector column with a GIN index
+instead, which the database keeps current on its own. Other backends fall
+back to unranked icontains filters.
+"""
+import re
+import uuid
+from datetime import timezone
+
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+# Relative weight of each column class, highest first (Postgres A-D)
+WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 2.0, 'D': 1.0}
+MAX_TERMS = 8
+# How many of a query's newest matches get ranked (SQLite)
+RANK_WINDOW = 2000
+# How far past its own rowid a row may be pushed by rows that got there first
+PROBES = 16
+BATCH = 2000
+
+
+def search_terms(text):
+    """The words of a user query, lower-cased; punctuation and operators are dropped."""
+    return re.findall(r'\w+', (text or '').lower())[:MAX_TERMS]
+
+
+def search_page(ranked, rows, request, default_limit=20, max_limit=50):
+    """
+    Return (page, next_offset) for ?limit=&offset= over `ranked`, a
+    SearchIndex.search() queryset on the bare table. Ranking only carries
+    pks through the sort, which is most of the cost when a common word
+    matches a large share of the table; the page itself is then loaded from
+    `rows` (joins, annotations) by pk. Ranks aren't unique, so search pages
+    by offset rather than keyset.
+    """
+    try:
+        limit = int(request.query_params.get('limit', default_limit))
+        offset = int(request.query_params.get('offset', 0))
+    except (TypeError, ValueError):
+        raise ValidationError({'limit': 'limit and offset must be integers.'})
+    limit, offset = max(1, min(limit, max_limit)), max(0, offset)
+
+    # Fetch one extra pk to learn whether another page exists
+    ids = list(ranked.values_list('pk', flat=True)[offset:offset + limit + 1])
+    next_offset = offset + limit if len(ids) > limit else None
+    by_id = rows.in_bulk(ids[:limit])
+    return [by_id[pk] for pk in ids[:limit] if pk in by_id], next_offset
+
+
+def _rowid(pk, created_at):
+    # Milliseconds since the epoch, then the UUID's low 20 bits: ordered by
+    # age, stable across VACUUM, and below 2**63 for another two centuries.
+    # Raw SQLite reads (rebuild) come back naive, in UTC.
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return int(created_at.timestamp() * 1000) << 20 | pk.int & 0xFFFFF
+
+
+class SearchIndex:
+    """
+    Ranked full-text search over `fields` ({column: weight class}) of the
+    UUID-keyed `table`, which has a created_at column. Each app's migration
+    creates the schema; models call index()/remove(); views call search().
+    """
+
+    def __init__(self, table, fields):
+        self.table = table
+        self.fields = fields
+
+    @property
+    def fts_table(self):
+        return f'{self.table}_fts'
+
+    @property
+    def vector_column(self):
+        return 'search_vector'
+
+    # Maintenance -------------------------------------------------------
+
+    def _slot(self, cursor, pk, created_at):
+        """The rowid `pk` holds in the index, or else the first free one from its own."""
+        first = _rowid(pk, created_at)
+        cursor.execute(
+            f"SELECT rowid, pk FROM {connection.ops.quote_name(self.fts_table)} WHERE rowid BETWEEN %s AND %s",
+            [first, first + PROBES - 1],
+        )
+        taken = dict(cursor.fetchall())
+        held = [rowid for rowid, holder in taken.items() if holder == pk.hex]
+        return held[0] if held else next(rowid for rowid in range(first, first + PROBES) if rowid not in taken)
+
+    def index(self, obj):
+        """(Re-)index `obj`'s text. A no-op where the database maintains the index."""
+        if connection.vendor != 'sqlite':
+            return
+        columns = ', '.join(self.fields)
+        placeholders = ', '.join(['%s'] * (len(self.fields) + 2))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {connection.ops.quote_name(self.fts_table)} (rowid, pk, {columns}) "
+                f"VALUES ({placeholders})",
+                [self._slot(cursor, obj.pk, obj.created_at), obj.pk.hex, *[getattr(obj, field) for field in self.fields]],
+            )
+
+    def remove(self, obj):
+        if connection.vendor != 'sqlite':
+            return
+        first = _rowid(obj.pk, obj.created_at)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(self.fts_table)} WHERE rowid BETWEEN %s AND %s AND pk = %s",
+                [first, first + PROBES - 1, obj.pk.hex],
+            )
+
+    def rebuild(self):
+        """Re-index every row of the table from scratch (SQLite only); returns the row count."""
+        if connection.vendor != 'sqlite':
+            return 0
+        qn = connection.ops.quote_name
+        columns = ', '.join(self.fields)
+        placeholders = ', '.join(['%s'] * (len(self.fields) + 2))
+        count, taken, millisecond = 0, set(), None
+        with connection.cursor() as reader, connection.cursor() as writer:
+            writer.execute(f"DELETE FROM {qn(self.fts_table)}")
+            # Oldest first, so only rowids of the current millisecond (and any
+            # pushed past it) can still be in the way
+            reader.execute(f"SELECT id, created_at, {columns} FROM {qn(self.table)} ORDER BY created_at")
+            while rows := reader.fetchmany(BATCH):
+                batch = []
+                for pk, created_at, *values in rows:
+                    rowid = _rowid(uuid.UUID(pk), created_at)
+                    if rowid >> 20 != millisecond:
+                        millisecond = rowid >> 20
+                        taken = {other for other in taken if other >> 20 >= millisecond}
+                    while rowid in taken:
+                        rowid += 1
+                    taken.add(rowid)
+                    batch.append([rowid, pk, *values])
+                writer.executemany(
+                    f"INSERT INTO {qn(self.fts_table)} (rowid, pk, {columns}) VALUES ({placeholders})", batch,
+                )
+                count += len(rows)
+        return count
+
+    # Queries -----------------------------------------------------------
+
+    def search(self, queryset, text, window=RANK_WINDOW):
+        """
+        `queryset` narrowed to rows matching `text`, best match first, with
+        the score as `search_rank` where the backend ranks. Every word must
+        match; the last one also matches as a prefix, for search-as-you-type.
+        On SQLite only the `window` newest matches within `queryset` are
+        candidates (None for all of them, e.g. to filter rather than rank).
+        """
+        terms = search_terms(text)
+        if not terms:
+            return queryset.none()
+        table = connection.ops.quote_name(self.table)
+
+        if connection.vendor == 'sqlite':
+            fts = connection.ops.quote_name(self.fts_table)
+            match = ' '.join(f'"{term}"' for term in terms) + '*'
+            matches = queryset.extra(
+                tables=[self.fts_table], where=[f'{fts} MATCH %s', f'{fts}.pk = {table}.id'], params=[match],
+            )
+            if window:
+                # The window ends at the window-th newest match that `queryset`
+                # lets through, so hidden rows (soft-deleted posts, unapproved
+                # events) never push a visible one out. Walking the match list
+                # down from the newest rowid is cheap; bm25() on every match is not.
+                edge = matches.extra(select={'fts_rowid': f'{fts}.rowid'}).order_by('-fts_rowid')
+                sql, edge_params = edge.values('fts_rowid')[window - 1:window].query.sql_with_params()
+                matches = matches.extra(where=[f'{fts}.rowid >= coalesce(({sql}), 0)'], params=list(edge_params))
+            # bm25() is lower-is-better and weights columns in declaration order
+            weights = ', '.join(['0.0'] + [str(WEIGHTS[weight]) for weight in self.fields.values()])
+            return matches.extra(select={'search_rank': f'-bm25({fts}, {weights})'}).order_by('-search_rank', '-pk')
+
+        if connection.vendor == 'postgresql':
+            tsquery = ' & '.join(terms) + ':*'
+            vector = f'{table}.{connection.ops.quote_name(self.vector_column)}'
+            return queryset.extra(
+                select={'search_rank': f"ts_rank({vector}, to_tsquery('english', %s))"},
+                select_params=[tsquery],
+                where=[f"{vector} @@ to_tsquery('english', %s)"],
+                params=[tsquery],
+            ).order_by('-search_rank', '-pk')
+
+        for term in terms:
+            queryset = queryset.filter(Q(*[(f'{field}__icontains', term) for field in self.fields], _connector=Q.OR))
+        return queryset
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -101,6 +102,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock at BEGIN so concurrent writers queue on the
+            # busy timeout instead of failing with "database is locked"
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -164,6 +171,15 @@ SOCIALACCOUNT_PROVIDERS = {
     }
 }
 
+# Google Sign-In: ID tokens may be issued for any of these OAuth clients
+GOOGLE_OAUTH_CLIENT_IDS = [
+    client_id.strip() for client_id in os.environ.get('GOOGLE_OAUTH_CLIENT_IDS', ','.join([
+        '482173332213-f7jpvem0soc2dgobvajsev1t0okk1avl.apps.googleusercontent.com',  # localhost
+        '482173332213-69fdrbrg42vduu7j80k0q5cguldjg5uk.apps.googleusercontent.com',  # Vercel
+    ])).split(',') if client_id.strip()
+]
+GOOGLE_JWKS_URL = os.environ.get('GOOGLE_JWKS_URL', 'https://www.googleapis.com/oauth2/v3/certs')
+
 SOCIALACCOUNT_ADAPTER = 'allauth.socialaccount.adapter.DefaultSocialAccountAdapter'
 ACCOUNT_ADAPTER = 'allauth.account.adapter.DefaultAccountAdapter'
 ACCOUNT_AUTHENTICATION_METHOD = 'email'
@@ -173,10 +189,55 @@ ACCOUNT_EMAIL_VERIFICATION = 'none'
 
 ASGI_APPLICATION = 'config.asgi.application'
 
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
-    },
+# Set REDIS_URL (e.g. redis://localhost:6379/0) in production so broadcasts
+# reach sockets on every Daphne worker; without it we fall back to the
+# single-process in-memory layer for local development.
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [REDIS_URL],
+                "capacity": 1500,
+                "expiry": 10,
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        },
+    }
+
+# Shared Django cache. Per-user payloads like the GET /profiles/me/ cache
+# (see accounts/me_cache.py) are only coherent when every worker sees the
+# same cache, so without Redis they aren't cached at all.
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        },
+    }
+PROFILE_ME_CACHE = bool(REDIS_URL)
+
+# Number of hashed "wall_feed.<n>" groups wall sockets are spread across
+WALL_FEED_SHARDS = int(os.environ.get('WALL_FEED_SHARDS', 16))
+
+# Per-day pairwise compatibility meter cache (see matches/meter_cache.py)
+MATCH_METER_CACHE = {
+    'BACKEND': 'redis' if REDIS_URL else 'local',
+    'URL': REDIS_URL,
+    'MAX_ENTRIES': 50000,
+}
+
+# Lore leaderboards (see accounts/leaderboard.py)
+LORE_LEADERBOARD = {
+    'BACKEND': 'redis' if REDIS_URL else 'local',
+    'URL': REDIS_URL,
 }
 
 # REST Framework Settings
@@ -189,6 +250,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        # Each call uses up a name from the shuffled sequence
+        'generate_nickname': '30/hour',
+    },
 }
 
 REST_AUTH = {
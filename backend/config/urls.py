@@ -17,7 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
-from accounts.api import UserViewSet, ProfileViewSet, AuthViewSet, GoogleLogin
+from accounts.api import UserViewSet, ProfileViewSet, AuthViewSet, GoogleLogin, LeaderboardViewSet
 from wall.api import WallPostViewSet
 from events.api import EventViewSet
 from matches.api import MatchingViewSet, MutualMatchViewSet
@@ -26,6 +26,7 @@ router = routers.DefaultRouter()
 router.register(r'auth', AuthViewSet, basename='auth')
 router.register(r'users', UserViewSet)
 router.register(r'profiles', ProfileViewSet)
+router.register(r'leaderboard', LeaderboardViewSet, basename='leaderboard')
 router.register(r'posts', WallPostViewSet)
 router.register(r'events', EventViewSet)
 router.register(r'matching', MatchingViewSet, basename='matching')
@@ -33,6 +34,8 @@ router.register(r'mutual', MutualMatchViewSet, basename='mutual')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Calendar apps expect a bare .ics URL, without the router's trailing slash
+    path('api/events/calendar.ics', EventViewSet.as_view({'get': 'calendar'}), name='event-calendar-feed'),
     path('api/', include(router.urls)),
     path('api/auth/google/', GoogleLogin.as_view(), name='google_login'),
     path('api-auth/', include('rest_framework.urls')),
@@ -1,11 +1,20 @@
 from django.contrib import admin
+from django.db.models import Q
 from .models import Event, RSVP
+from .search import event_index
 
 class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'organizer', 'event_type', 'location', 'start_time', 'end_time')
     list_filter = ('event_type', 'start_time', 'location')
     search_fields = ('title', 'description', 'organizer__username', 'location')
 
+    def get_search_results(self, request, queryset, search_term):
+        # Text goes through the full-text index; usernames match exactly
+        if not search_term:
+            return queryset, False
+        matches = event_index.search(Event.objects.all(), search_term, window=None).values('pk')
+        return queryset.filter(Q(pk__in=matches) | Q(organizer__username=search_term.strip())), False
+
 class RSVPAdmin(admin.ModelAdmin):
     list_display = ('event', 'user', 'status', 'created_at')
     list_filter = ('status', 'created_at')
@@ -1,55 +1,109 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from .models import Event, RSVP, EventVote, EventReaction
 from .serializers import EventSerializer
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from .feed import event_queryset, viewer_context
+from .search import event_index
+from wall.broadcast import publish
+from accounts.lore import award_lore
+from config.pagination import KeysetPaginator
+from config.search import search_page
 
 class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all().order_by('start_time')
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    WINDOWS = ('upcoming', 'now', 'week', 'all')
+
     def get_queryset(self):
         qs = super().get_queryset()
         if self.action == 'list':
-            return qs.filter(status='approved')
+            # ?window=upcoming|now|week|all (default upcoming) &event_type=party
+            window = self.request.query_params.get('window', 'upcoming')
+            if window not in self.WINDOWS:
+                raise ValidationError({'window': f"Must be one of {', '.join(self.WINDOWS)}."})
+            events = event_queryset().filter(Event.window_filter(window), status='approved')
+            event_type = self.request.query_params.get('event_type')
+            if event_type:
+                events = events.filter(event_type=event_type)
+            return events.order_by('start_time')
+        if self.action == 'retrieve':
+            return event_queryset()
         return qs
 
+    def _render_events(self, request, events, paginator):
+        """
+        Serialize `events` in `paginator`'s order with viewer state batched.
+        Passing ?limit= or ?cursor= switches to keyset pages:
+        {"results": [...], "next_cursor": ...}; otherwise a plain array.
+        """
+        if 'limit' in request.query_params or 'cursor' in request.query_params:
+            rows, next_cursor = paginator.paginate(events, request)
+            serializer = self.get_serializer(rows, many=True, context=viewer_context(request, rows))
+            return Response({'results': serializer.data, 'next_cursor': next_cursor})
+        rows = list(paginator.order(events))
+        serializer = self.get_serializer(rows, many=True, context=viewer_context(request, rows))
+        return Response(serializer.data)
+
+    def list(self, request, *args, **kwargs):
+        return self._render_events(request, self.get_queryset(), KeysetPaginator('start_time', descending=False))
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Ranked full-text search over approved events: ?q=hackathon&limit=20&offset=0"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "A search query (?q=) is required."}, status=status.HTTP_400_BAD_REQUEST)
+        # Ranked on the bare table: bm25() can't run under event_queryset()'s GROUP BY
+        ranked = event_index.search(Event.objects.filter(status='approved'), query)
+        events, next_offset = search_page(ranked, event_queryset(), request)
+        serializer = self.get_serializer(events, many=True, context=viewer_context(request, events))
+        return Response({'results': serializer.data, 'next_offset': next_offset})
+
+    @action(detail=False, methods=['get'], url_path='calendar.ics', permission_classes=[permissions.AllowAny])
+    def calendar(self, request):
+        """Approved events as an iCalendar feed; poll with If-None-Match."""
+        from django.http import HttpResponse, HttpResponseNotModified
+        from .ical import feed_events, feed_etag, render_feed
+
+        events = feed_events()
+        etag = feed_etag(events)
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(render_feed(events, etag), content_type='text/calendar; charset=utf-8')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, max-age=300'
+        return response
+
     @action(detail=False, methods=['get'])
     def pending_approval(self, request):
         from django.utils import timezone
-        from datetime import timedelta
-        
-        # Expiration check
-        expiry_limit = timezone.now() - timedelta(hours=48)
-        expired_events = Event.objects.filter(status='pending_vote', created_at__lt=expiry_limit)
-        for event in expired_events:
-            event.status = 'rejected'
-            event.save()
-            # Broadcast rejection if needed
-            self._broadcast_update({
-                'id': event.id,
-                'status': 'rejected'
-            }, update_type='event_rejected')
-
-        events = Event.objects.filter(status='pending_vote', start_time__gte=timezone.now()).order_by('-created_at')
-        serializer = self.get_serializer(events, many=True)
-        return Response(serializer.data)
 
-    def _broadcast_update(self, event_data, update_type='event_created'):
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            'wall_feed',
-            {
-                'type': 'wall_update',
-                'message': {
-                    'type': update_type,
-                    'event': event_data
-                }
-            }
+        # Stale proposals are rejected by the sweep_expired command; hide any
+        # it hasn't reached yet rather than writing from a GET
+        now = timezone.now()
+        events = event_queryset().filter(
+            status='pending_vote', start_time__gte=now, created_at__gte=now - Event.VOTE_WINDOW,
         )
+        # Newest proposals first, paged or not
+        return self._render_events(request, events, KeysetPaginator('created_at'))
+
+    def _broadcast_update(self, event_data, update_type='event_created', coalesce_id=None):
+        """
+        Queue a wall update for after commit. `event_data` may be a callable so
+        serialization happens in the dispatcher, not in the request. Updates
+        sharing a `coalesce_id` within one dispatch window collapse into one.
+        """
+        if callable(event_data):
+            message = lambda: {'type': update_type, 'event': event_data()}
+        else:
+            message = {'type': update_type, 'event': event_data}
+        key = (update_type, str(coalesce_id)) if coalesce_id else None
+        publish(message, key=key)
 
     def create(self, request, *args, **kwargs):
         # Lore Score check (>= 150)
@@ -68,7 +122,7 @@ class EventViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         event = serializer.save(organizer=self.request.user, status='pending_vote')
-        self._broadcast_update(EventSerializer(event).data, update_type='event_proposed')
+        self._broadcast_update(lambda: EventSerializer(event).data, update_type='event_proposed')
 
     @action(detail=True, methods=['post'])
     def vote(self, request, pk=None):
@@ -79,33 +133,19 @@ class EventViewSet(viewsets.ModelViewSet):
         if event.organizer == request.user:
             return Response({"error": "You cannot vote on your own event"}, status=status.HTTP_400_BAD_REQUEST)
 
-        is_upvote = request.data.get('is_upvote', True)
-        vote, created = EventVote.objects.update_or_create(
-            event=event,
-            user=request.user,
-            defaults={'is_upvote': is_upvote}
-        )
+        is_upvote = request.data.get('is_upvote', True) not in (False, 'false', 'False', 0, '0')
+        vote, created = EventVote.cast(event, request.user, is_upvote)
         
         # Reward Lore for voting (+3, max 5/day)
         if created and is_upvote:
-            from accounts.models import Profile
-            from django.utils import timezone
-            profile = Profile.objects.get(user=request.user)
-            meta = profile.lore_meta or {}
-            votes_today = meta.get('votes_today', {"date": "", "count": 0})
-            today = timezone.now().date().isoformat()
-            
-            if votes_today['date'] != today:
-                votes_today = {"date": today, "count": 0}
-            
-            if votes_today['count'] < 5:
-                profile.lore_score += 3
-                votes_today['count'] += 1
-                meta['votes_today'] = votes_today
-                profile.lore_meta = meta
-                profile.save(update_fields=['lore_score', 'lore_meta'])
-
-        event.refresh_from_db()
+            award_lore(request.user, 'vote', ref=event.id)
+
+        event.refresh_from_db(fields=['vote_count', 'status', 'is_approved'])
+        event_id = event.id
+        self._broadcast_update(
+            lambda: {'id': str(event_id), **Event.objects.values('vote_count', 'status').get(pk=event_id)},
+            update_type='event_vote_updated', coalesce_id=event_id,
+        )
         return Response({
             'status': 'vote_recorded',
             'vote_count': event.vote_count,
@@ -128,22 +168,7 @@ class EventViewSet(viewsets.ModelViewSet):
         )
 
         # Reward Lore for commenting (+2, max 3/day)
-        from accounts.models import Profile
-        from django.utils import timezone
-        profile = Profile.objects.get(user=request.user)
-        meta = profile.lore_meta or {}
-        comments_today = meta.get('comments_today', {"date": "", "count": 0})
-        today = timezone.now().date().isoformat()
-
-        if comments_today['date'] != today:
-            comments_today = {"date": today, "count": 0}
-
-        if comments_today['count'] < 3:
-            profile.lore_score += 2
-            comments_today['count'] += 1
-            meta['comments_today'] = comments_today
-            profile.lore_meta = meta
-            profile.save(update_fields=['lore_score', 'lore_meta'])
+        award_lore(request.user, 'comment', ref=comment.id)
 
         return Response({
             'status': 'comment_added',
@@ -177,12 +202,13 @@ class EventViewSet(viewsets.ModelViewSet):
                 rsvp.status = status_val
                 rsvp.save()
         
+        rsvp_count = event.rsvps.count()
         self._broadcast_update({
-            'id': event.id,
-            'rsvp_count': event.rsvps.count()
-        }, update_type='event_rsvp_updated')
+            'id': str(event.id),
+            'rsvp_count': rsvp_count
+        }, update_type='event_rsvp_updated', coalesce_id=event.id)
         
-        return Response({'status': 'rsvp_updated', 'user_rsvp_status': status_val, 'rsvp_count': event.rsvps.count()})
+        return Response({'status': 'rsvp_updated', 'user_rsvp_status': status_val, 'rsvp_count': rsvp_count})
 
     @action(detail=True, methods=['post'])
     def react(self, request, pk=None):
@@ -197,11 +223,13 @@ class EventViewSet(viewsets.ModelViewSet):
             defaults={'reaction_type': reaction_type}
         )
 
-        # Broadcast update
-        serializer = self.get_serializer(event)
-        self._broadcast_update(serializer.data, update_type='event_reaction_updated')
+        # Broadcast only the changed counts; clients merge the delta by id
+        self._broadcast_update(lambda: {
+            'id': str(event.id),
+            'reaction_counts': event.reaction_counts(),
+        }, update_type='event_reaction_updated', coalesce_id=event.id)
 
-        return Response(serializer.data)
+        return Response(self.get_serializer(event).data)
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -217,6 +245,6 @@ class EventViewSet(viewsets.ModelViewSet):
         self.perform_destroy(instance)
         
         # Broadcast deletion
-        self._broadcast_update({'id': event_id}, update_type='event_deleted')
+        self._broadcast_update({'id': str(event_id)}, update_type='event_deleted')
         
         return Response(status=status.HTTP_204_NO_CONTENT)
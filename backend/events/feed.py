@@ -0,0 +1,54 @@
+"""
+Query helpers for rendering events in bulk.
+
+A page of events is built in a constant number of queries: one for the
+events (organizer + profile joined, RSVP and per-type reaction counts
+annotated) and one each for the viewer's RSVPs, votes and reactions on that
+page.
+"""
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Event, EventReaction, EventVote, RSVP
+
+
+def reaction_field(reaction_type):
+    return f'{reaction_type}_reactions'
+
+
+def event_queryset():
+    """Events with everything the serializer needs annotated or pre-joined."""
+    rsvp_count = Subquery(
+        RSVP.objects.filter(event=OuterRef('pk')).order_by().values('event').annotate(n=Count('pk')).values('n'),
+        output_field=IntegerField(),
+    )
+    return Event.objects.select_related('organizer__profile').annotate(
+        rsvp_total=Coalesce(rsvp_count, 0),
+        **{
+            reaction_field(rtype): Count('reactions', filter=Q(reactions__reaction_type=rtype))
+            for rtype, _ in EventReaction.REACTION_TYPES
+        },
+    )
+
+
+def viewer_context(request, events):
+    """
+    Serializer context carrying the viewer's RSVPs, votes and reactions for
+    `events`, fetched in one query each instead of one per event.
+    """
+    context = {'request': request}
+    user = getattr(request, 'user', None)
+    if not (user and user.is_authenticated):
+        return context
+
+    event_ids = [event.pk for event in events]
+    context['viewer_rsvps'] = dict(
+        RSVP.objects.filter(user=user, event_id__in=event_ids).values_list('event_id', 'status')
+    )
+    context['viewer_votes'] = set(
+        EventVote.objects.filter(user=user, event_id__in=event_ids).values_list('event_id', flat=True)
+    )
+    context['viewer_reactions'] = dict(
+        EventReaction.objects.filter(user=user, event_id__in=event_ids).values_list('event_id', 'reaction_type')
+    )
+    return context
@@ -0,0 +1,103 @@
+"""
+iCalendar feed of approved events.
+
+Calendar apps poll feeds every few minutes, so the feed is built to be
+cheap to re-request:
+
+  * The ETag is derived from one aggregate query (count and latest
+    updated_at of the events in the feed). A matching If-None-Match is
+    answered with 304 without loading any events.
+  * Each VEVENT block is cached under (event id, updated_at), so when one
+    event changes only that block is rendered again.
+  * The assembled body is cached under its ETag.
+"""
+import hashlib
+from datetime import timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Event
+
+# How far back the feed reaches, so recently finished events stay visible
+HISTORY = timedelta(days=30)
+PRODID = '-//Night Campus//Events//EN'
+FIELDS = ('id', 'title', 'description', 'location', 'event_type', 'start_time', 'end_time', 'updated_at')
+
+
+def feed_events(now=None):
+    now = now or timezone.now()
+    return Event.objects.filter(status='approved', start_time__gte=now - HISTORY)
+
+
+def feed_etag(events):
+    stats = events.order_by().aggregate(count=Count('pk'), latest=Max('updated_at'))
+    raw = f"{stats['count']}|{stats['latest'].isoformat() if stats['latest'] else ''}"
+    return '"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def _escape(text):
+    return (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def _stamp(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _fold(line):
+    """Split a content line into 75-octet chunks joined by CRLF + space (RFC 5545 3.1)."""
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        # Never cut through a UTF-8 sequence
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(raw[start:end].decode())
+        start, limit = end, 74
+    return '\r\n '.join(parts)
+
+
+def render_vevent(event):
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:{event['id']}@nightcampus",
+        f"DTSTAMP:{_stamp(event['updated_at'])}",
+        f"DTSTART:{_stamp(event['start_time'])}",
+        f"DTEND:{_stamp(event['end_time'])}",
+        f"SUMMARY:{_escape(event['title'])}",
+        f"DESCRIPTION:{_escape(event['description'])}",
+        f"LOCATION:{_escape(event['location'])}",
+        f"CATEGORIES:{_escape(event['event_type'])}",
+        'END:VEVENT',
+    ]
+    return '\r\n'.join(_fold(line) for line in lines)
+
+
+def _vevent_key(event):
+    return f"events:vevent:{event['id']}:{event['updated_at'].timestamp()}"
+
+
+def render_feed(events, etag):
+    """The feed body for `events`, reusing cached VEVENT blocks."""
+    body = cache.get(f'events:ics:{etag}')
+    if body is not None:
+        return body
+
+    rows = list(events.order_by('start_time', 'pk').values(*FIELDS))
+    keys = [_vevent_key(row) for row in rows]
+    blocks = cache.get_many(keys)
+    fresh = {key: render_vevent(row) for key, row in zip(keys, rows) if key not in blocks}
+    if fresh:
+        cache.set_many(fresh, timeout=7 * 24 * 60 * 60)
+        blocks.update(fresh)
+
+    body = '\r\n'.join([
+        'BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}', 'CALSCALE:GREGORIAN',
+        'X-WR-CALNAME:Night Campus', *(blocks[key] for key in keys), 'END:VCALENDAR',
+    ]) + '\r\n'
+    cache.set(f'events:ics:{etag}', body, timeout=24 * 60 * 60)
+    return body
@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# The search index as of this migration; config.search keeps it current
+COLUMNS = {'title': 'A', 'location': 'B', 'description': 'C'}
+
+
+def _rows(rows):
+    # rowid: created_at in milliseconds, then the pk's low 20 bits, moved on
+    # to the next free rowid if an earlier row of that millisecond has it
+    taken, millisecond = set(), None
+    for pk, created_at, *values in rows:
+        rowid = int(created_at.timestamp() * 1000) << 20 | pk.int & 0xFFFFF
+        if rowid >> 20 != millisecond:
+            millisecond = rowid >> 20
+            taken = {other for other in taken if other >> 20 >= millisecond}
+        while rowid in taken:
+            rowid += 1
+        taken.add(rowid)
+        yield [rowid, pk.hex, *values]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE "events_event_fts" USING fts5('
+            "pk UNINDEXED, title, location, description, tokenize='porter unicode61 remove_diacritics 2')"
+        )
+        Event = apps.get_model('events', 'Event')
+        rows = Event.objects.order_by('created_at').values_list('pk', 'created_at', *COLUMNS)
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO "events_event_fts" (rowid, pk, title, location, description) VALUES (%s, %s, %s, %s, %s)',
+                _rows(rows.iterator(chunk_size=2000)),
+            )
+    elif vendor == 'postgresql':
+        vector = ' || '.join(
+            f"setweight(to_tsvector('english', coalesce(\"{column}\", '')), '{weight}')"
+            for column, weight in COLUMNS.items()
+        )
+        schema_editor.execute(
+            f'ALTER TABLE "events_event" ADD COLUMN "search_vector" tsvector GENERATED ALWAYS AS ({vector}) STORED'
+        )
+        schema_editor.execute('CREATE INDEX "events_event_search" ON "events_event" USING GIN ("search_vector")')
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS "events_event_fts"')
+    elif vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE "events_event" DROP COLUMN IF EXISTS "search_vector"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_time_indexes'),
+    ]
+
+    operations = [
+        # FTS5 table on SQLite, generated tsvector column + GIN index on Postgres
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
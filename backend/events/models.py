@@ -1,7 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.conf import settings
+from django.utils import timezone
+from datetime import datetime, time, timedelta
 import uuid
 
+from .search import event_index
+
 class Event(models.Model):
     EVENT_TYPES = [
         ('party', '🎉 Party'),
@@ -29,25 +34,105 @@ class Event(models.Model):
     is_approved = models.BooleanField(default=False)
     vote_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by saves and by status changes; versions the calendar feed
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Proposals that don't reach the vote threshold in time are rejected
+    VOTE_WINDOW = timedelta(hours=48)
+
+    class Meta:
+        indexes = [
+            # Time-windowed listings: status='approved' AND start_time in [a, b)
+            models.Index(fields=['status', 'start_time'], name='event_status_start'),
+            # "Not over yet" windows: status='approved' AND end_time >= now
+            models.Index(fields=['status', 'end_time'], name='event_status_end'),
+            # Voting queue and the stale-proposal sweep
+            models.Index(fields=['status', 'created_at'], name='event_status_created'),
+        ]
 
     def __str__(self):
         return self.title
 
-    def check_approval(self):
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or {'title', 'description', 'location'} & set(update_fields):
+                event_index.index(self)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            event_index.remove(self)
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def reject_stale(cls, now, batch_size=500):
+        """
+        Reject every pending proposal older than VOTE_WINDOW; returns the ids
+        this call rejected. Run it inside a transaction so the rows stay
+        locked until the ids have been read back.
+        """
+        stale = cls.objects.filter(status='pending_vote', created_at__lt=now - cls.VOTE_WINDOW)
+        ids = list(stale.values_list('pk', flat=True))
+        rejected = []
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            # Re-checks status, so an event approved since the SELECT is left
+            # alone and not reported either
+            stale.filter(pk__in=batch).update(status='rejected', updated_at=now)
+            rejected += cls.objects.filter(pk__in=batch, status='rejected', updated_at=now).values_list('pk', flat=True)
+        return rejected
+
+    @classmethod
+    def window_filter(cls, window, now=None):
+        """
+        Q for events in `window`: 'upcoming' (not yet over), 'now' (under
+        way), 'week' (not over and starting before this week ends) or 'all'.
+        Every window but 'all' is a range on end_time, so together with
+        status it stays on the (status, end_time) index however many past
+        events pile up, and however long an event runs.
+        """
+        now = now or timezone.now()
+        if window == 'all':
+            return models.Q()
+        running = models.Q(end_time__gte=now)
+        if window == 'now':
+            return running & models.Q(start_time__lte=now)
+        if window == 'week':
+            today = timezone.localdate(now)
+            week_end = timezone.make_aware(datetime.combine(today + timedelta(days=7 - today.weekday()), time.min))
+            return running & models.Q(start_time__lt=week_end)
+        return running
+
+    def reaction_counts(self):
+        """{reaction_type: count} for every reaction type, in one GROUP BY query."""
+        counts = {rtype: 0 for rtype, _ in EventReaction.REACTION_TYPES}
+        rows = self.reactions.order_by().values('reaction_type').annotate(count=models.Count('pk'))
+        for row in rows:
+            counts[row['reaction_type']] = row['count']
+        return counts
+
+    def approval_threshold(self):
         # Threshold: 8 if Lore >= 300, else 10
         from accounts.models import Profile
-        profile = Profile.objects.get(user=self.organizer)
-        threshold = 8 if profile.lore_score >= 300 else 10
-
-        if self.status == 'pending_vote' and self.vote_count >= threshold:
-            self.status = 'approved'
-            self.is_approved = True
-            self.save()
-            # Reward creator
-            profile.lore_score += 5 # Master prompt says +5 for approval
-            profile.save()
-            return True
-        return False
+        lore = Profile.objects.filter(user_id=self.organizer_id).values_list('lore_score', flat=True).first() or 0
+        return 8 if lore >= 300 else 10
+
+    def check_approval(self):
+        """
+        Approve the event if its tally has reached the threshold. The status
+        flip is a conditional UPDATE, so however many voters race past the
+        threshold it succeeds (and rewards the organizer) exactly once.
+        """
+        from accounts.lore import award_lore
+        approved = Event.objects.filter(
+            pk=self.pk, status='pending_vote', vote_count__gte=self.approval_threshold(),
+        ).update(status='approved', is_approved=True, updated_at=timezone.now())
+        if approved:
+            self.status, self.is_approved = 'approved', True
+            # Reward creator (+5 for approval)
+            award_lore(self.organizer_id, 'event_approved', ref=self.pk)
+        return bool(approved)
 
 class EventComment(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='comments')
@@ -67,13 +152,28 @@ class EventVote(models.Model):
     class Meta:
         unique_together = ('event', 'user')
 
-    def save(self, *args, **kwargs):
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
-        if is_new and self.is_upvote:
-            self.event.vote_count = self.event.votes.filter(is_upvote=True).count()
-            self.event.save()
-            self.event.check_approval()
+    @classmethod
+    def cast(cls, event, user, is_upvote=True):
+        """
+        Record `user`'s vote on `event`, moving vote_count by +1 for a new
+        upvote and +/-1 when a vote flips, then check for approval, all in one
+        transaction. Returns (vote, created).
+        """
+        with transaction.atomic():
+            vote, created = cls.objects.get_or_create(event=event, user=user, defaults={'is_upvote': is_upvote})
+            delta = 0
+            if created:
+                delta = 1 if is_upvote else 0
+            elif vote.is_upvote != is_upvote:
+                # Conditional, so two racing flips to the same side count once
+                if cls.objects.filter(pk=vote.pk, is_upvote=not is_upvote).update(is_upvote=is_upvote):
+                    delta = 1 if is_upvote else -1
+                vote.is_upvote = is_upvote
+            if delta:
+                Event.objects.filter(pk=event.pk).update(vote_count=F('vote_count') + delta)
+            if delta > 0:
+                event.check_approval()
+        return vote, created
 
 class EventReaction(models.Model):
     REACTION_TYPES = [
@@ -0,0 +1,4 @@
+"""Full-text index over events (see config.search)."""
+from config.search import SearchIndex
+
+event_index = SearchIndex('events_event', {'title': 'A', 'location': 'B', 'description': 'C'})
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Event, RSVP
+from .models import Event, EventReaction, RSVP
 from accounts.serializers import UserSerializer
 
 class RSVPSerializer(serializers.ModelSerializer):
@@ -11,7 +11,7 @@ class RSVPSerializer(serializers.ModelSerializer):
 
 class EventSerializer(serializers.ModelSerializer):
     organizer = UserSerializer(read_only=True)
-    rsvp_count = serializers.IntegerField(source='rsvps.count', read_only=True)
+    rsvp_count = serializers.SerializerMethodField()
     user_rsvp_status = serializers.SerializerMethodField()
     user_has_voted = serializers.SerializerMethodField()
     is_organizer = serializers.SerializerMethodField()
@@ -30,9 +30,25 @@ class EventSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'organizer', 'status', 'vote_count']
 
+    def validate(self, attrs):
+        start = attrs.get('start_time', getattr(self.instance, 'start_time', None))
+        end = attrs.get('end_time', getattr(self.instance, 'end_time', None))
+        if start and end and end <= start:
+            raise serializers.ValidationError({'end_time': 'The chaos has to end after it starts.'})
+        return attrs
+
+    # Counts and viewer state come pre-fetched from events.feed when rendering
+    # a list; fall back to per-object queries for one-off serializations.
+    def get_rsvp_count(self, obj):
+        if hasattr(obj, 'rsvp_total'):
+            return obj.rsvp_total
+        return obj.rsvps.count()
+
     def get_user_rsvp_status(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if 'viewer_rsvps' in self.context:
+                return self.context['viewer_rsvps'].get(obj.pk)
             rsvp = obj.rsvps.filter(user=request.user).first()
             return rsvp.status if rsvp else None
         return None
@@ -40,35 +56,37 @@ class EventSerializer(serializers.ModelSerializer):
     def get_user_has_voted(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if 'viewer_votes' in self.context:
+                return obj.pk in self.context['viewer_votes']
             return obj.votes.filter(user=request.user).exists()
         return False
 
     def get_is_organizer(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.organizer == request.user
+            return obj.organizer_id == request.user.pk
         return False
 
     def get_can_delete(self, obj):
         from django.utils import timezone
         from datetime import timedelta
         request = self.context.get('request')
-        if request and request.user.is_authenticated and obj.organizer == request.user:
+        if request and request.user.is_authenticated and obj.organizer_id == request.user.pk:
             # Can delete if created less than 24 hours ago (for verification)
             return timezone.now() - obj.created_at < timedelta(hours=24)
         return False
 
     def get_reaction_counts(self, obj):
-        from django.db.models import Count
-        reactions = obj.reactions.values('reaction_type').annotate(count=Count('reaction_type'))
-        counts = {rtype: 0 for rtype, _ in obj.reactions.model.REACTION_TYPES}
-        for r in reactions:
-            counts[r['reaction_type']] = r['count']
-        return counts
+        from .feed import reaction_field
+        if hasattr(obj, reaction_field('love')):
+            return {rtype: getattr(obj, reaction_field(rtype)) for rtype, _ in EventReaction.REACTION_TYPES}
+        return obj.reaction_counts()
 
     def get_user_reaction(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if 'viewer_reactions' in self.context:
+                return self.context['viewer_reactions'].get(obj.pk)
             reaction = obj.reactions.filter(user=request.user).first()
             return reaction.reaction_type if reaction else None
         return None
@@ -1,3 +1,240 @@
-from django.test import TestCase
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User, Profile
+from .models import Event, EventReaction, EventVote, RSVP
+from .search import event_index
+from .serializers import EventSerializer
+
+
+def make_user(name, **profile):
+    user = User.objects.create_user(username=name, email=f'{name}@campus.test')
+    Profile.objects.create(user=user, nickname=name, **profile)
+    return user
+
+
+def make_event(organizer, title='Terrace jam', start=None, **fields):
+    start = start or timezone.now() + timedelta(days=2)
+    return Event.objects.create(organizer=organizer, title=title, description='', location='Hostel B terrace',
+                                start_time=start, end_time=start + timedelta(hours=2), **fields)
+
+
+class EventVoteTests(TestCase):
+    def setUp(self):
+        self.organizer = make_user('organizer', lore_score=100)
+        self.event = make_event(self.organizer)
+
+    def vote(self, user, is_upvote=True):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(f'/api/events/{self.event.id}/vote/', {'is_upvote': is_upvote}, format='json').json()
+
+    def test_flipping_a_vote_moves_the_tally(self):
+        voter = make_user('voter')
+        self.assertEqual(self.vote(voter)['vote_count'], 1)
+        self.assertEqual(self.vote(voter, False)['vote_count'], 0)
+        self.assertEqual(self.vote(voter, False)['vote_count'], 0)
+        self.assertEqual(self.vote(voter)['vote_count'], 1)
+
+    def test_approval_fires_once_at_the_threshold(self):
+        voters = [make_user(f'voter{i}') for i in range(10)]
+        for voter in voters[:9]:
+            self.assertFalse(self.vote(voter)['approved'])
+        self.assertTrue(self.vote(voters[9])['approved'])
+        self.assertEqual(Profile.objects.get(user=self.organizer).lore_score, 105)
+        self.assertFalse(self.event.check_approval())
+        self.assertEqual(Profile.objects.get(user=self.organizer).lore_score, 105)
+
+
+class ConcurrentVoteTests(TransactionTestCase):
+    def test_concurrent_voters_are_all_counted(self):
+        organizer = make_user('organizer', lore_score=100)
+        event = make_event(organizer)
+        voters = [make_user(f'voter{i}') for i in range(24)]
+
+        def cast(voter):
+            try:
+                for _ in range(100):
+                    try:
+                        return EventVote.cast(event, voter, True)
+                    except OperationalError:
+                        # The shared-cache test DB allows one writer at a time and
+                        # fails fast instead of waiting; the transaction rolled back
+                        time.sleep(0.005)
+                raise AssertionError(f"{voter} never got the write lock")
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(cast, voters))
+
+        event.refresh_from_db()
+        self.assertEqual(event.vote_count, 24)
+        self.assertEqual(event.vote_count, event.votes.filter(is_upvote=True).count())
+        self.assertEqual(event.status, 'approved')
+        self.assertEqual(Profile.objects.get(user=organizer).lore_score, 105)
+
+
+class EventListTests(TestCase):
+    def setUp(self):
+        self.viewer = make_user('viewer')
+        fans = [make_user(f'fan{i}') for i in range(3)]
+        organizers = [make_user(f'organizer{i}') for i in range(4)]
+        start = timezone.now() + timedelta(days=1)
+        for i in range(100):
+            event = make_event(organizers[i % 4], title=f'event {i}', start=start + timedelta(hours=i % 50),
+                               status='approved')
+            for fan in fans[:i % 4]:
+                RSVP.objects.create(event=event, user=fan)
+                EventReaction.objects.create(event=event, user=fan, reaction_type=['love', 'pass'][i % 2])
+            if i % 3 == 0:
+                RSVP.objects.create(event=event, user=self.viewer, status='maybe')
+                EventVote.objects.create(event=event, user=self.viewer)
+                EventReaction.objects.create(event=event, user=self.viewer, reaction_type='okay')
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def test_page_of_100_events_takes_constant_queries(self):
+        # events (counts annotated) + the viewer's RSVPs, votes and reactions
+        with self.assertNumQueries(4):
+            data = self.client.get('/api/events/', {'limit': 100}).json()
+        self.assertEqual(len(data['results']), 100)
+
+        request = self.client.get('/api/events/').wsgi_request
+        for row in data['results'][:12]:
+            expected = EventSerializer(Event.objects.get(pk=row['id']), context={'request': request}).data
+            self.assertEqual(row, expected)
+
+    def test_cursor_walks_events_by_start_time(self):
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 30}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get('/api/events/', params).json()
+            seen.extend(row['id'] for row in data['results'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        expected = Event.objects.filter(status='approved').order_by('start_time', 'pk').values_list('pk', flat=True)
+        self.assertEqual(seen, [str(pk) for pk in expected])
+
+    def test_pending_approval_pages_newest_first_like_the_plain_list(self):
+        organizer = make_user('proposer')
+        for i in range(5):
+            event = make_event(organizer, title=f'proposal {i}', start=timezone.now() + timedelta(days=i + 1))
+            Event.objects.filter(pk=event.pk).update(created_at=timezone.now() - timedelta(minutes=5 - i))
+        plain = [row['title'] for row in self.client.get('/api/events/pending_approval/').json()]
+        self.assertEqual(plain, [f'proposal {i}' for i in reversed(range(5))])
+
+        paged, params = [], {'limit': 2}
+        while True:
+            data = self.client.get('/api/events/pending_approval/', params).json()
+            paged += [row['title'] for row in data['results']]
+            if not data['next_cursor']:
+                break
+            params['cursor'] = data['next_cursor']
+        self.assertEqual(paged, plain)
+
+    def test_unpaginated_list_stays_a_plain_array(self):
+        data = self.client.get('/api/events/').json()
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), 100)
+
+
+class EventWindowTests(TestCase):
+    def setUp(self):
+        organizer = make_user('organizer')
+        now = timezone.now()
+        self.past = make_event(organizer, 'past', start=now - timedelta(days=2), status='approved')
+        self.live = make_event(organizer, 'live', start=now - timedelta(hours=1), status='approved')
+        self.soon = make_event(organizer, 'soon', start=now + timedelta(hours=3), status='approved',
+                               event_type='party')
+        self.later = make_event(organizer, 'later', start=now + timedelta(days=30), status='approved')
+        make_event(organizer, 'pending', start=now + timedelta(hours=2))
+        self.client = APIClient()
+        cache.clear()
+
+    def titles(self, **params):
+        return [event['title'] for event in self.client.get('/api/events/', params).json()]
+
+    def test_windows_and_type_filter(self):
+        self.assertEqual(self.titles(), ['live', 'soon', 'later'])
+        self.assertEqual(self.titles(window='now'), ['live'])
+        self.assertEqual(self.titles(window='all'), ['past', 'live', 'soon', 'later'])
+        self.assertEqual(self.titles(event_type='party'), ['soon'])
+        self.assertEqual(self.client.get('/api/events/', {'window': 'someday'}).status_code, 400)
+
+    def test_long_running_events_stay_in_the_open_windows(self):
+        festival = make_event(make_user('fest'), 'festival', start=timezone.now() - timedelta(days=10),
+                              status='approved')
+        festival.end_time = timezone.now() + timedelta(days=1)
+        festival.save(update_fields=['end_time'])
+        self.assertEqual(self.titles(window='now'), ['festival', 'live'])
+        self.assertEqual(self.titles(window='week')[:2], ['festival', 'live'])
+        self.assertEqual(self.titles()[:2], ['festival', 'live'])
+
+    def test_upcoming_uses_the_status_end_index(self):
+        plan = Event.objects.filter(Event.window_filter('upcoming'), status='approved').explain()
+        self.assertIn('event_status_end', plan)
+
+    def test_calendar_feed_revalidates_with_etag(self):
+        response = self.client.get('/api/events/calendar.ics')
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = response.content.decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 4)
+        self.assertIn('SUMMARY:soon', body)
+
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/events/calendar.ics', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.soon.title = 'soon, but louder'
+        self.soon.save()
+        with mock.patch('events.ical.render_vevent', wraps=__import__('events.ical').ical.render_vevent) as render:
+            response = self.client.get('/api/events/calendar.ics', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('SUMMARY:soon\\, but louder', response.content.decode())
+        self.assertEqual(render.call_count, 1)
+
+
+class EventSearchTests(TestCase):
+    def setUp(self):
+        self.organizer = make_user('organizer')
+        self.client = APIClient()
+
+    def titles(self, q):
+        response = self.client.get('/api/events/search/', {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [event['title'] for event in response.json()['results']]
+
+    def test_searches_approved_events_by_title_location_and_description(self):
+        hack = make_event(self.organizer, 'Night hackathon', status='approved')
+        jam = make_event(self.organizer, 'Terrace jam', status='approved')
+        jam.description = 'bring snacks, hackathon survivors welcome'
+        jam.save()
+        make_event(self.organizer, 'Hackathon prep')
+        self.assertEqual(self.titles('hackathon'), ['Night hackathon', 'Terrace jam'])
+        self.assertEqual(self.titles('terrace'), ['Terrace jam', 'Night hackathon'])
+
+        hack.delete()
+        self.assertEqual(self.titles('hackathon'), ['Terrace jam'])
+
+    def test_newer_unapproved_matches_do_not_crowd_out_approved_ones(self):
+        approved = make_event(self.organizer, 'Freshers party', status='approved')
+        pending = [make_event(self.organizer, f'Party {i}') for i in range(3)]
+        for age, event in enumerate(reversed([approved, *pending])):
+            Event.objects.filter(pk=event.pk).update(created_at=timezone.now() - timedelta(hours=age))
+        event_index.rebuild()
+        for window in (3, None):
+            found = event_index.search(Event.objects.filter(status='approved'), 'party', window=window)
+            self.assertEqual(list(found), [approved])
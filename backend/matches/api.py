@@ -2,12 +2,25 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import MatchPool, MatchRequest, MutualMatch, MatchChatMessage, MatchReport
-from .serializers import MatchPoolSerializer, MutualMatchSerializer, ChatMessageSerializer
-from accounts.models import Profile
+from .serializers import MatchPoolSerializer, MatchMemberSerializer, MutualMatchSerializer, ChatMessageSerializer
+from accounts.bootstrap import ensure_profile
+from accounts.models import User
+from django.db.models import Prefetch, Q, prefetch_related_objects
 from django.utils import timezone
-from datetime import timedelta, datetime
+from datetime import timedelta
 import random
-from .compatibility import calculate_all_meters, select_random_meters
+from .meter_cache import get_meter_cache
+from .pooling import assign_pool
+from .chat import messages_after, messages_before, push_message
+
+def profile_vibe(profile):
+    """The profile attributes the compatibility engine scores on."""
+    return {
+        'brain_type': profile.brain_type,
+        'interests': profile.interests,
+        'social_energy': profile.social_energy,
+        'connection_intent': profile.connection_intent,
+    }
 
 CAMPUS_SPOTS = [
     "Campus Café - Central Plaza",
@@ -36,55 +49,27 @@ class MatchingViewSet(viewsets.ViewSet):
                 "remaining_seconds": int(diff.total_seconds())
             }, status=200)
 
-        # 2. Find Active Pool
-        pool = MatchPool.objects.filter(members=user, is_full=False).first()
-        if not pool:
-            # 3. Find pool to join
-            pool = MatchPool.objects.filter(campus=profile.campus, is_full=False).exclude(members=user).first()
-            
-            if pool:
-                pool.members.add(user)
-                if pool.members.count() >= 9:
-                    pool.is_full = True
-                    pool.save()
-            else:
-                # 4. Create new pool
-                pool = MatchPool.objects.create(campus=profile.campus)
-                pool.members.add(user)
-        
-        serializer = MatchPoolSerializer(pool, context={'request': request})
-        data = serializer.data
+        # 2. Today's scheduled pool; anyone the scheduler hasn't placed yet
+        # takes a seat in an open one
+        pool = (
+            MatchPool.objects.filter(members=user, scheduled_for=timezone.localdate()).first()
+            or assign_pool(user, profile.campus)
+        )
+
+        # Load every member with their profile in one query; both the
+        # serializer and the compatibility engine read from this.
+        prefetch_related_objects([pool], Prefetch('members', queryset=User.objects.select_related('profile')))
+        others = [member for member in pool.members.all() if member.pk != user.pk]
+
+        data = MatchPoolSerializer(pool, context={'request': request}).data
         
         # Remove self from members list
-        members = [m for m in data['members'] if m['id'] != str(user.id)]
-        
-        # Calculate compatibility metrics for each member
-        user_profile_data = {
-            'brain_type': profile.brain_type,
-            'interests': profile.interests,
-            'social_energy': profile.social_energy,
-            'connection_intent': profile.connection_intent,
-        }
-        
-        today = datetime.now()
+        members = MatchMemberSerializer(others, many=True).data
         
-        for member in members:
-            member_profile = Profile.objects.get(user_id=member['id'])
-            member_profile_data = {
-                'brain_type': member_profile.brain_type,
-                'interests': member_profile.interests,
-                'social_energy': member_profile.social_energy,
-                'connection_intent': member_profile.connection_intent,
-            }
-            
-            # Calculate all meters
-            all_meters = calculate_all_meters(user_profile_data, member_profile_data)
-            
-            # Select 3-4 random meters for this user (seeded by date for consistency)
-            selected_meter_keys = select_random_meters(member['id'], today)
-            selected_meters = {key: all_meters[key] for key in selected_meter_keys}
-            
-            # Add to member data
+        # Compatibility meters for each member (cached per pair for the day)
+        pool_profiles = [(str(member.pk), profile_vibe(member.profile)) for member in others]
+        pool_meters = get_meter_cache().meters_for(str(user.id), profile_vibe(profile), pool_profiles)
+        for member, selected_meters in zip(members, pool_meters):
             member['compatibility_meters'] = selected_meters
         
         data['members'] = members
@@ -96,6 +81,26 @@ class MatchingViewSet(viewsets.ViewSet):
         
         return Response(data)
 
+    @action(detail=False, methods=['get'])
+    def people_like_me(self, request):
+        """Campus-mates ranked by how many vibe tags they share with you."""
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=400)
+
+        rows = ensure_profile(request.user).similar_profiles(limit=limit)
+        users = User.objects.select_related('profile').filter(profile__pk__in=[row[0] for row in rows])
+        by_profile = {user.profile.pk: user for user in users}
+
+        results = []
+        for profile_id, shared, score in rows:
+            member = MatchMemberSerializer(by_profile[profile_id]).data
+            member['shared_tags'] = shared
+            member['similarity'] = round(score, 3)
+            results.append(member)
+        return Response(results)
+
     @action(detail=False, methods=['post'])
     def request_meetup(self, request):
         user = request.user
@@ -115,12 +120,19 @@ class MatchingViewSet(viewsets.ViewSet):
             
         target_user = pool.members.get(id=target_user_id)
         
-        # Create request
+        # Create request, snapshotting the meters the sender was shown
         match_req, created = MatchRequest.objects.get_or_create(
             from_user=user,
             to_user=target_user,
             pool=pool
         )
+        if created:
+            [metrics] = get_meter_cache().meters_for(
+                str(user.id), profile_vibe(user.profile),
+                [(str(target_user.id), profile_vibe(target_user.profile))],
+            )
+            match_req.compatibility_metrics = metrics
+            match_req.save(update_fields=['compatibility_metrics'])
         
         # Check mutual match
         reciprocal = MatchRequest.objects.filter(from_user=target_user, to_user=user, pool=pool).exists()
@@ -144,13 +156,17 @@ class MatchingViewSet(viewsets.ViewSet):
             
         return Response({"status": "requested", "requests_sent_count": MatchRequest.objects.filter(from_user=user, pool=pool).count()})
 
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def meter_cache_stats(self, request):
+        return Response(get_meter_cache().stats())
+
 class MutualMatchViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = MutualMatchSerializer
 
     def get_queryset(self):
         user = self.request.user
-        return MutualMatch.objects.filter(models.Q(user1=user) | models.Q(user2=user)).order_by('-created_at')
+        return MutualMatch.objects.filter(Q(user1=user) | Q(user2=user)).order_by('-created_at')
 
     @action(detail=True, methods=['post'])
     def agree(self, request, pk=None):
@@ -194,6 +210,7 @@ class MutualMatchViewSet(viewsets.ModelViewSet):
             sender=request.user,
             text=text
         )
+        push_message(msg)
         return Response(ChatMessageSerializer(msg, context={'request': request}).data)
 
     @action(detail=True, methods=['post'])
@@ -227,5 +244,27 @@ class MutualMatchViewSet(viewsets.ModelViewSet):
         if match.status != 'active':
             return Response({"error": "Chat is locked"}, status=403)
             
-        msgs = match.messages.all().order_by('created_at')
-        return Response(ChatMessageSerializer(msgs, many=True, context={'request': request}).data)
+        # Pages keyed on the message id, the same cursor the chat socket's
+        # after_id uses; oldest first within a page:
+        #   (none)       the latest ?limit= messages
+        #   ?before=<id> the page just older than message <id>
+        #   ?after=<id>  messages newer than message <id>
+        params = request.query_params
+        try:
+            limit = max(1, min(int(params.get('limit', 20)), 100))
+            before = int(params['before']) if params.get('before') else None
+            after = int(params['after']) if params.get('after') else None
+        except (TypeError, ValueError):
+            return Response({"error": "limit, before and after must be integers"}, status=400)
+
+        if after is not None:
+            msgs, _ = messages_after(match, after, limit)
+            has_older = bool(msgs) and match.messages.filter(id__lt=msgs[0].id).exists()
+        else:
+            msgs, has_older = messages_before(match, before, limit)
+
+        return Response({
+            'results': ChatMessageSerializer(msgs, many=True, context={'request': request}).data,
+            'before_cursor': msgs[0].id if has_older else None,
+            'after_cursor': msgs[-1].id if msgs else after,
+        })
@@ -0,0 +1,63 @@
+"""
+Live fan-out for match chats.
+
+Each MutualMatch has its own channel group; a saved message is pushed there
+once the transaction commits, from either the socket or the REST fallback.
+Payloads carry sender_id and every socket fills in is_me for its own user.
+"""
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+HISTORY_LIMIT = 200
+
+
+def chat_group(match_id):
+    return f"match_chat.{match_id}"
+
+
+def message_payload(message):
+    return {
+        'id': message.id,
+        'text': message.text,
+        'created_at': message.created_at.isoformat(),
+        'sender_id': str(message.sender_id),
+    }
+
+
+def messages_after(match, after_id=None, limit=HISTORY_LIMIT):
+    """
+    Return (messages, next_after_id), oldest first. With no `after_id` that
+    is the latest `limit` messages; otherwise up to `limit` messages newer
+    than `after_id`, and `next_after_id` is where to resume when more
+    remain (None once caught up).
+    """
+    if after_id is None:
+        return messages_before(match, limit=limit)[0], None
+    messages = list(match.messages.filter(id__gt=after_id).order_by('id')[:limit + 1])
+    if len(messages) > limit:
+        messages = messages[:limit]
+        return messages, messages[-1].id
+    return messages, None
+
+
+def messages_before(match, before_id=None, limit=HISTORY_LIMIT):
+    """
+    Return (messages, has_older), oldest first: the `limit` messages just
+    older than `before_id`, or the latest `limit` with no `before_id`.
+    """
+    messages = match.messages.order_by('-id')
+    if before_id is not None:
+        messages = messages.filter(id__lt=before_id)
+    messages = list(messages[:limit + 1])
+    return messages[:limit][::-1], len(messages) > limit
+
+
+def push_message(message):
+    """Send `message` to everyone connected to its match once it commits."""
+    event = {'type': 'chat.message', 'message': message_payload(message)}
+
+    def send():
+        async_to_sync(get_channel_layer().group_send)(chat_group(message.match_id), event)
+
+    transaction.on_commit(send)
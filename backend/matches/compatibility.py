@@ -2,35 +2,162 @@
 Compatibility calculation engine for match meters.
 Each meter returns a dict with: {value: 0-100, label: str, tooltip: str}
 """
+import hashlib
 import random
 from datetime import datetime
-from typing import Dict, List, Any
-
+from typing import Any, Dict, Iterable, List, Optional
+
+# Sarcastic labels and tooltip copy for each meter
+METER_TEXT = {
+    'vibe_collision': {
+        'labels': {
+            'low': 'Polite strangers',
+            'medium': 'Noticeable tension',
+            'high': 'Immediate lore',
+        },
+        'tooltip': 'Brain type + social energy overlap + cosmic alignment',
+    },
+    'shared_brain_cell': {
+        'labels': {
+            'low': 'Separate operating systems',
+            'medium': 'Occasional overlap',
+            'high': 'One brain, two bodies',
+        },
+        'tooltip': 'Shared interests + questionable life choices',
+    },
+    'awkward_silence': {
+        'labels': {
+            'low': 'Painfully long',
+            'medium': 'Manageable discomfort',
+            'high': 'Comfortably quiet',
+        },
+        'tooltip': 'Social energy + comfort with awkwardness',
+    },
+    'chaos_escalation': {
+        'labels': {
+            'low': 'Risk-averse',
+            'medium': 'Minor crimes (emotional)',
+            'high': 'Stories with consequences',
+        },
+        'tooltip': 'Brain types + questionable decision-making history',
+    },
+    'texting_energy': {
+        'labels': {
+            'low': 'Seen at 3 AM',
+            'medium': 'Overthinking replies',
+            'high': 'Typing simultaneously',
+        },
+        'tooltip': 'Communication styles + anxiety levels',
+    },
+    'social_battery': {
+        'labels': {
+            'low': 'One vanishes',
+            'medium': 'Negotiated exit',
+            'high': 'Irish goodbye together',
+        },
+        'tooltip': 'Energy levels + social stamina',
+    },
+    'inside_joke_speed': {
+        'labels': {
+            'low': 'Still using names',
+            'medium': 'Running bits forming',
+            'high': 'No context required',
+        },
+        'tooltip': 'Shared humor + chaos compatibility',
+    },
+    'emotional_damage': {
+        'labels': {
+            'low': 'Emotionally insured',
+            'medium': 'Suspicious closeness',
+            'high': 'Already invested',
+        },
+        'tooltip': 'Connection intent + emotional availability',
+    },
+    'personality_sync': {
+        'labels': {
+            'low': 'Two personalities',
+            'medium': 'Mostly consistent',
+            'high': 'No filter ever',
+        },
+        'tooltip': 'Authenticity + social masks',
+    },
+    'argument_survival': {
+        'labels': {
+            'low': 'Passive aggression',
+            'medium': 'Heated but alive',
+            'high': 'Fights turn into jokes',
+        },
+        'tooltip': 'Conflict resolution + ego management',
+    },
+    'event_attendance': {
+        'labels': {
+            'low': 'Plans dissolve',
+            'medium': 'One cancels late',
+            'high': 'Arrive together, leave together',
+        },
+        'tooltip': 'Reliability + commitment issues',
+    },
+    'unhinged_combo': {
+        'labels': {
+            'low': 'Emotionally stable',
+            'medium': 'Mild chaos',
+            'high': 'Do not encourage',
+        },
+        'tooltip': 'Combined chaos potential + adult supervision required',
+    },
+}
+
+
+def calculate_all_meters(user1_profile: Dict, user2_profile: Dict, seed: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Calculate all 12 compatibility meters between two users.
 
-def calculate_all_meters(user1_profile: Dict, user2_profile: Dict) -> Dict[str, Dict]:
-    """Calculate all 12 compatibility meters between two users."""
+    With a `seed` (see pair_seed) the jitter is reproducible across processes
+    and restarts; without one it is drawn from the global RNG.
+    """
     
     meters = {
-        'vibe_collision': calculate_vibe_collision(user1_profile, user2_profile),
-        'shared_brain_cell': calculate_shared_brain_cell(user1_profile, user2_profile),
-        'awkward_silence': calculate_awkward_silence(user1_profile, user2_profile),
-        'chaos_escalation': calculate_chaos_escalation(user1_profile, user2_profile),
-        'texting_energy': calculate_texting_energy(user1_profile, user2_profile),
-        'social_battery': calculate_social_battery(user1_profile, user2_profile),
-        'inside_joke_speed': calculate_inside_joke_speed(user1_profile, user2_profile),
-        'emotional_damage': calculate_emotional_damage(user1_profile, user2_profile),
-        'personality_sync': calculate_personality_sync(user1_profile, user2_profile),
-        'argument_survival': calculate_argument_survival(user1_profile, user2_profile),
-        'event_attendance': calculate_event_attendance(user1_profile, user2_profile),
-        'unhinged_combo': calculate_unhinged_combo(user1_profile, user2_profile),
+        'vibe_collision': calculate_vibe_collision,
+        'shared_brain_cell': calculate_shared_brain_cell,
+        'awkward_silence': calculate_awkward_silence,
+        'chaos_escalation': calculate_chaos_escalation,
+        'texting_energy': calculate_texting_energy,
+        'social_battery': calculate_social_battery,
+        'inside_joke_speed': calculate_inside_joke_speed,
+        'emotional_damage': calculate_emotional_damage,
+        'personality_sync': calculate_personality_sync,
+        'argument_survival': calculate_argument_survival,
+        'event_attendance': calculate_event_attendance,
+        'unhinged_combo': calculate_unhinged_combo,
     }
     
-    return meters
+    return {
+        key: calculate(user1_profile, user2_profile, meter_rng(seed, key))
+        for key, calculate in meters.items()
+    }
+
 
+def seeded_rng(*parts: Any) -> random.Random:
+    """
+    A private RNG seeded from blake2b of `parts`. Unlike hash(), which is
+    salted per process, this gives the same stream in every worker.
+    """
+    digest = hashlib.blake2b(':'.join(str(part) for part in parts).encode(), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, 'big'))
 
-def add_randomness(value: float) -> float:
+
+def pair_seed(viewer_id: Any, member_id: Any, date: datetime) -> str:
+    """Seed for one viewer/member pair, stable for the day."""
+    return f"{viewer_id}:{member_id}:{date.strftime('%Y-%m-%d')}"
+
+
+def meter_rng(seed: Optional[str], key: str) -> Optional[random.Random]:
+    return seeded_rng('jitter', seed, key) if seed is not None else None
+
+
+def add_randomness(value: float, rng: Optional[random.Random] = None) -> float:
     """Add ±10% randomness for deniability."""
-    return max(0, min(100, value + random.uniform(-10, 10)))
+    return max(0, min(100, value + (rng or random).uniform(-10, 10)))
 
 
 def get_label(value: float, labels: Dict[str, str]) -> str:
@@ -43,7 +170,17 @@ def get_label(value: float, labels: Dict[str, str]) -> str:
         return labels['high']
 
 
-def calculate_vibe_collision(u1: Dict, u2: Dict) -> Dict:
+def meter_result(key: str, value: float) -> Dict:
+    """Package a raw meter value as {value, label, tooltip}."""
+    text = METER_TEXT[key]
+    return {
+        'value': round(value),
+        'label': get_label(value, text['labels']),
+        'tooltip': text['tooltip'],
+    }
+
+
+def calculate_vibe_collision(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """When your personalities meet, do they bounce or explode?"""
     
     # Brain type compatibility matrix
@@ -61,22 +198,12 @@ def calculate_vibe_collision(u1: Dict, u2: Dict) -> Dict:
     social2 = set(u2.get('social_energy', []))
     social_overlap = len(social1 & social2) / max(len(social1 | social2), 1) * 30
     
-    value = add_randomness(brain_score * 0.6 + social_overlap)
+    value = add_randomness(brain_score * 0.6 + social_overlap, rng)
     
-    labels = {
-        'low': 'Polite strangers',
-        'medium': 'Noticeable tension',
-        'high': 'Immediate lore'
-    }
-    
-    return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Brain type + social energy overlap + cosmic alignment'
-    }
+    return meter_result('vibe_collision', value)
 
 
-def calculate_shared_brain_cell(u1: Dict, u2: Dict) -> Dict:
+def calculate_shared_brain_cell(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """How often you think the same thought."""
     
     interests1 = set(u1.get('interests', []))
@@ -87,22 +214,12 @@ def calculate_shared_brain_cell(u1: Dict, u2: Dict) -> Dict:
     else:
         shared_score = len(interests1 & interests2) / len(interests1 | interests2) * 100
     
-    value = add_randomness(shared_score)
-    
-    labels = {
-        'low': 'Separate operating systems',
-        'medium': 'Occasional overlap',
-        'high': 'One brain, two bodies'
-    }
+    value = add_randomness(shared_score, rng)
     
-    return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Shared interests + questionable life choices'
-    }
+    return meter_result('shared_brain_cell', value)
 
 
-def calculate_awkward_silence(u1: Dict, u2: Dict) -> Dict:
+def calculate_awkward_silence(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """Minutes before someone checks their phone."""
     
     # Introverts handle silence better
@@ -122,22 +239,12 @@ def calculate_awkward_silence(u1: Dict, u2: Dict) -> Dict:
     intent2 = u2.get('connection_intent', [])
     intent_overlap = len(set(intent1) & set(intent2)) / max(len(set(intent1) | set(intent2)), 1) * 30
     
-    value = add_randomness(introvert_score * 0.7 + intent_overlap)
+    value = add_randomness(introvert_score * 0.7 + intent_overlap, rng)
     
-    labels = {
-        'low': 'Painfully long',
-        'medium': 'Manageable discomfort',
-        'high': 'Comfortably quiet'
-    }
-    
-    return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Social energy + comfort with awkwardness'
-    }
+    return meter_result('awkward_silence', value)
 
 
-def calculate_chaos_escalation(u1: Dict, u2: Dict) -> Dict:
+def calculate_chaos_escalation(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """How fast this turns into a bad idea."""
     
     chaos_brains = ['chaos', 'delulu', 'wifi']
@@ -154,22 +261,12 @@ def calculate_chaos_escalation(u1: Dict, u2: Dict) -> Dict:
     if 'random' in u2.get('connection_intent', []):
         chaos_score += 10
     
-    value = add_randomness(chaos_score)
+    value = add_randomness(chaos_score, rng)
     
-    labels = {
-        'low': 'Risk-averse',
-        'medium': 'Minor crimes (emotional)',
-        'high': 'Stories with consequences'
-    }
-    
-    return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Brain types + questionable decision-making history'
-    }
+    return meter_result('chaos_escalation', value)
 
 
-def calculate_texting_energy(u1: Dict, u2: Dict) -> Dict:
+def calculate_texting_energy(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """Reply speed vs emotional effort."""
     
     # Overthinkers take longer to reply
@@ -183,22 +280,12 @@ def calculate_texting_energy(u1: Dict, u2: Dict) -> Dict:
     else:
         sync_score = 50
     
-    value = add_randomness(sync_score)
-    
-    labels = {
-        'low': 'Seen at 3 AM',
-        'medium': 'Overthinking replies',
-        'high': 'Typing simultaneously'
-    }
+    value = add_randomness(sync_score, rng)
     
-    return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Communication styles + anxiety levels'
-    }
+    return meter_result('texting_energy', value)
 
 
-def calculate_social_battery(u1: Dict, u2: Dict) -> Dict:
+def calculate_social_battery(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """Who leaves first."""
     
     social1 = set(u1.get('social_energy', []))
@@ -206,22 +293,12 @@ def calculate_social_battery(u1: Dict, u2: Dict) -> Dict:
     
     overlap = len(social1 & social2) / max(len(social1 | social2), 1) * 100
     
-    value = add_randomness(overlap)
+    value = add_randomness(overlap, rng)
     
-    labels = {
-        'low': 'One vanishes',
-        'medium': 'Negotiated exit',
-        'high': 'Irish goodbye together'
-    }
-    
-    return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Energy levels + social stamina'
-    }
+    return meter_result('social_battery', value)
 
 
-def calculate_inside_joke_speed(u1: Dict, u2: Dict) -> Dict:
+def calculate_inside_joke_speed(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """How fast nonsense becomes tradition."""
     
     # Shared humor indicators
@@ -235,22 +312,12 @@ def calculate_inside_joke_speed(u1: Dict, u2: Dict) -> Dict:
     if u1.get('brain_type') in ['chaos', 'delulu'] and u2.get('brain_type') in ['chaos', 'delulu']:
         humor_score += 40
     
-    value = add_randomness(humor_score)
-    
-    labels = {
-        'low': 'Still using names',
-        'medium': 'Running bits forming',
-        'high': 'No context required'
-    }
+    value = add_randomness(humor_score, rng)
     
-    return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Shared humor + chaos compatibility'
-    }
+    return meter_result('inside_joke_speed', value)
 
 
-def calculate_emotional_damage(u1: Dict, u2: Dict) -> Dict:
+def calculate_emotional_damage(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """Likelihood of accidental attachment."""
     
     # Deep connection seekers = higher risk
@@ -265,22 +332,12 @@ def calculate_emotional_damage(u1: Dict, u2: Dict) -> Dict:
     else:
         deep_score = 40
     
-    value = add_randomness(deep_score)
+    value = add_randomness(deep_score, rng)
     
-    labels = {
-        'low': 'Emotionally insured',
-        'medium': 'Suspicious closeness',
-        'high': 'Already invested'
-    }
-    
-    return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Connection intent + emotional availability'
-    }
+    return meter_result('emotional_damage', value)
 
 
-def calculate_personality_sync(u1: Dict, u2: Dict) -> Dict:
+def calculate_personality_sync(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """Same person in both rooms?"""
     
     # NPC and chaos brains are consistent
@@ -292,22 +349,12 @@ def calculate_personality_sync(u1: Dict, u2: Dict) -> Dict:
     if u2.get('brain_type') in consistent_brains:
         sync_score += 20
     
-    value = add_randomness(sync_score)
-    
-    labels = {
-        'low': 'Two personalities',
-        'medium': 'Mostly consistent',
-        'high': 'No filter ever'
-    }
+    value = add_randomness(sync_score, rng)
     
-    return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Authenticity + social masks'
-    }
+    return meter_result('personality_sync', value)
 
 
-def calculate_argument_survival(u1: Dict, u2: Dict) -> Dict:
+def calculate_argument_survival(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """Can disagreements end without blocking."""
     
     # Spreadsheet humans and overthinkers argue logically
@@ -319,22 +366,12 @@ def calculate_argument_survival(u1: Dict, u2: Dict) -> Dict:
     elif u1.get('brain_type') == 'chaos' or u2.get('brain_type') == 'chaos':
         survival_score = 40  # Chaos = unpredictable
     
-    value = add_randomness(survival_score)
-    
-    labels = {
-        'low': 'Passive aggression',
-        'medium': 'Heated but alive',
-        'high': 'Fights turn into jokes'
-    }
+    value = add_randomness(survival_score, rng)
     
-    return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Conflict resolution + ego management'
-    }
+    return meter_result('argument_survival', value)
 
 
-def calculate_event_attendance(u1: Dict, u2: Dict) -> Dict:
+def calculate_event_attendance(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """Will you actually show up together?"""
     
     # Spreadsheet humans are reliable
@@ -346,22 +383,12 @@ def calculate_event_attendance(u1: Dict, u2: Dict) -> Dict:
     if u2.get('brain_type') in reliable_brains:
         reliability += 25
     
-    value = add_randomness(reliability)
+    value = add_randomness(reliability, rng)
     
-    labels = {
-        'low': 'Plans dissolve',
-        'medium': 'One cancels late',
-        'high': 'Arrive together, leave together'
-    }
-    
-    return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Reliability + commitment issues'
-    }
+    return meter_result('event_attendance', value)
 
 
-def calculate_unhinged_combo(u1: Dict, u2: Dict) -> Dict:
+def calculate_unhinged_combo(u1: Dict, u2: Dict, rng: Optional[random.Random] = None) -> Dict:
     """Should this pairing be supervised?"""
     
     # Chaos + Delulu = maximum unhinged
@@ -373,25 +400,185 @@ def calculate_unhinged_combo(u1: Dict, u2: Dict) -> Dict:
     if u2.get('brain_type') in unhinged_brains:
         unhinged_score += 30
     
-    value = add_randomness(unhinged_score)
-    
-    labels = {
-        'low': 'Emotionally stable',
-        'medium': 'Mild chaos',
-        'high': 'Do not encourage'
-    }
+    value = add_randomness(unhinged_score, rng)
     
+    return meter_result('unhinged_combo', value)
+
+
+# ---------------------------------------------------------------------------
+# Batch engine
+#
+# Scores one viewer against a whole pool. Each profile is encoded once: list
+# attributes become integer bitsets over a vocabulary shared by the batch, so
+# overlaps are `&`/`|` plus popcount instead of rebuilding sets per pair.
+# Only the requested meters are evaluated. Results match calculate_all_meters.
+# ---------------------------------------------------------------------------
+
+ALL_METERS = list(METER_TEXT)
+
+CHAOS_BRAINS = frozenset({'chaos', 'delulu', 'wifi'})
+JOKE_BRAINS = frozenset({'chaos', 'delulu'})
+CONSISTENT_BRAINS = frozenset({'npc', 'chaos', 'flow'})
+LOGICAL_BRAINS = frozenset({'spreadsheet', 'overthinker'})
+RELIABLE_BRAINS = frozenset({'spreadsheet', 'flow'})
+SAME_BRAIN_COMPAT = {'overthinker': 80, 'flow': 75, 'chaos': 90, 'delulu': 85}
+
+
+class EncodedProfile:
+    __slots__ = ('brain', 'interests', 'social', 'intent')
+
+    def __init__(self, brain, interests, social, intent):
+        self.brain = brain
+        self.interests = interests
+        self.social = social
+        self.intent = intent
+
+
+class ProfileEncoder:
+    """Maps attribute values to bit positions; one instance per batch."""
+
+    def __init__(self):
+        self.bits = {}
+
+    def bit(self, value) -> int:
+        if value not in self.bits:
+            self.bits[value] = 1 << len(self.bits)
+        return self.bits[value]
+
+    def mask(self, values) -> int:
+        result = 0
+        for value in values or ():
+            result |= self.bit(value)
+        return result
+
+    def encode(self, profile: Dict) -> EncodedProfile:
+        return EncodedProfile(
+            brain=profile.get('brain_type'),
+            interests=self.mask(profile.get('interests')),
+            social=self.mask(profile.get('social_energy')),
+            intent=self.mask(profile.get('connection_intent')),
+        )
+
+
+def _jaccard(a: int, b: int) -> float:
+    return (a & b).bit_count() / max((a | b).bit_count(), 1)
+
+
+def _batch_scorers(enc: ProfileEncoder) -> Dict[str, Any]:
+    """Raw (pre-jitter) score for each meter given two encoded profiles."""
+    recharge = enc.bit('recharge_alone')
+    random_intent = enc.bit('random')
+    humor = enc.mask(['memes', 'chaos', 'random'])
+
+    def vibe_collision(a, b):
+        brain = SAME_BRAIN_COMPAT.get(a.brain, 50) if a.brain == b.brain else 50
+        return brain * 0.6 + _jaccard(a.social, b.social) * 30
+
+    def shared_brain_cell(a, b):
+        if not a.interests or not b.interests:
+            return 30
+        return _jaccard(a.interests, b.interests) * 100
+
+    def awkward_silence(a, b):
+        alone = bool(a.social & recharge) + bool(b.social & recharge)
+        introvert = (20, 40, 70)[alone]
+        return introvert * 0.7 + _jaccard(a.intent, b.intent) * 30
+
+    def chaos_escalation(a, b):
+        return (
+            40 * (a.brain in CHAOS_BRAINS) + 40 * (b.brain in CHAOS_BRAINS)
+            + 10 * bool(a.intent & random_intent) + 10 * bool(b.intent & random_intent)
+        )
+
+    def texting_energy(a, b):
+        if a.brain == b.brain:
+            return 70
+        if {a.brain, b.brain} == {'overthinker', 'flow'}:
+            return 30
+        return 50
+
+    def social_battery(a, b):
+        return _jaccard(a.social, b.social) * 100
+
+    def inside_joke_speed(a, b):
+        score = ((a.interests | b.interests) & humor).bit_count() * 20
+        if a.brain in JOKE_BRAINS and b.brain in JOKE_BRAINS:
+            score += 40
+        return score
+
+    def emotional_damage(a, b):
+        # Mirrors the per-pair rule, whose "deep" branch is always overridden
+        return 20 if (a.intent & random_intent) and (b.intent & random_intent) else 40
+
+    def personality_sync(a, b):
+        return 50 + 20 * (a.brain in CONSISTENT_BRAINS) + 20 * (b.brain in CONSISTENT_BRAINS)
+
+    def argument_survival(a, b):
+        if a.brain in LOGICAL_BRAINS and b.brain in LOGICAL_BRAINS:
+            return 70
+        if a.brain == 'chaos' or b.brain == 'chaos':
+            return 40
+        return 50
+
+    def event_attendance(a, b):
+        return 40 + 25 * (a.brain in RELIABLE_BRAINS) + 25 * (b.brain in RELIABLE_BRAINS)
+
+    def unhinged_combo(a, b):
+        return 30 + 30 * (a.brain in CHAOS_BRAINS) + 30 * (b.brain in CHAOS_BRAINS)
+
     return {
-        'value': round(value),
-        'label': get_label(value, labels),
-        'tooltip': 'Combined chaos potential + adult supervision required'
+        'vibe_collision': vibe_collision,
+        'shared_brain_cell': shared_brain_cell,
+        'awkward_silence': awkward_silence,
+        'chaos_escalation': chaos_escalation,
+        'texting_energy': texting_energy,
+        'social_battery': social_battery,
+        'inside_joke_speed': inside_joke_speed,
+        'emotional_damage': emotional_damage,
+        'personality_sync': personality_sync,
+        'argument_survival': argument_survival,
+        'event_attendance': event_attendance,
+        'unhinged_combo': unhinged_combo,
     }
 
 
+def calculate_meters_batch(
+    viewer: Dict,
+    candidates: List[Dict],
+    meters: Optional[List[Optional[Iterable[str]]]] = None,
+    seeds: Optional[List[Optional[str]]] = None,
+) -> List[Dict[str, Dict]]:
+    """
+    Score `viewer` against every profile in `candidates` in one pass.
+
+    `meters`, if given, runs parallel to `candidates` and names the meter keys
+    wanted for each one (None means all 12). `seeds` likewise gives each
+    pair's jitter seed, as in calculate_all_meters. Returns one {key: {value,
+    label, tooltip}} dict per candidate, in order.
+    """
+    enc = ProfileEncoder()
+    scorers = _batch_scorers(enc)
+    me = enc.encode(viewer)
+
+    results = []
+    for index, candidate in enumerate(candidates):
+        other = enc.encode(candidate)
+        wanted = meters[index] if meters is not None else None
+        seed = seeds[index] if seeds is not None else None
+        results.append({
+            key: meter_result(key, add_randomness(scorers[key](me, other), meter_rng(seed, key)))
+            for key in (wanted if wanted is not None else ALL_METERS)
+        })
+    return results
+
+
 def select_random_meters(user_id: str, date: datetime) -> List[str]:
     """
     Select 1 random meter for a user, seeded by date for daily consistency.
     
+    Uses a private RNG, so it never touches (or races on) the global one and
+    picks the same meter in every process.
+    
     Args:
         user_id: User ID to seed randomization
         date: Current date for daily reshuffle
@@ -399,20 +586,7 @@ def select_random_meters(user_id: str, date: datetime) -> List[str]:
     Returns:
         List with 1 meter key
     """
-    # Seed random with user_id + date for consistency
-    seed = hash(f"{user_id}_{date.strftime('%Y-%m-%d')}")
-    random.seed(seed)
-    
-    all_meters = [
-        'vibe_collision', 'shared_brain_cell', 'awkward_silence', 'chaos_escalation',
-        'texting_energy', 'social_battery', 'inside_joke_speed', 'emotional_damage',
-        'personality_sync', 'argument_survival', 'event_attendance', 'unhinged_combo'
-    ]
+    rng = seeded_rng('meters', user_id, date.strftime('%Y-%m-%d'))
     
     # Select only 1 meter
-    selected = random.sample(all_meters, 1)
-    
-    # Reset random seed
-    random.seed()
-    
-    return selected
+    return rng.sample(ALL_METERS, 1)
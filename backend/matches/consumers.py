@@ -0,0 +1,119 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from .chat import chat_group, message_payload, messages_after
+from .models import MatchChatMessage, MutualMatch
+
+
+class MatchChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Live chat for one active MutualMatch.
+
+    Client -> server:
+        {"type": "message", "text": "..."}
+        {"type": "typing", "is_typing": true}
+        {"type": "history", "after_id": 42}
+    Server -> client:
+        {"type": "message", "message": {id, text, created_at, is_me}}
+        {"type": "history", "messages": [...], "next_after_id": 242 | null}
+        {"type": "typing", "is_typing": true}       (the other person only)
+        {"type": "error", "error": "..."}
+        {"type": "expired"}                          (then closes with 4410)
+
+    On connect the socket sends the latest HISTORY_LIMIT messages, or with
+    ?after_id=<last id seen> only what was missed. A replay longer than
+    HISTORY_LIMIT comes in pages: while `next_after_id` is set, ask for
+    {"type": "history", "after_id": next_after_id}.
+    """
+
+    async def connect(self):
+        self.user = self.scope.get('user')
+        self.match = None
+        if self.user and self.user.is_authenticated:
+            self.match = await self.get_match(self.scope['url_route']['kwargs']['match_id'])
+        if self.match is None:
+            await self.close(code=4403)
+            return
+
+        self.group_name = chat_group(self.match.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        after_id = parse_qs(self.scope.get('query_string', b'').decode()).get('after_id', [None])[0]
+        await self.send_history(after_id)
+
+    async def disconnect(self, close_code):
+        if self.match is not None:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content):
+        kind = content.get('type')
+        if kind == 'message':
+            text = str(content.get('text') or '').strip()
+            if not text:
+                await self.send_json({'type': 'error', 'error': 'Message text is required'})
+                return
+            if not await self.chat_open():
+                await self.send_json({'type': 'error', 'error': 'Chat is locked'})
+                await self.close(code=4403)
+                return
+            message = await self.save_message(text)
+            await self.channel_layer.group_send(self.group_name, {
+                'type': 'chat.message', 'message': message_payload(message),
+            })
+        elif kind == 'typing':
+            await self.channel_layer.group_send(self.group_name, {
+                'type': 'chat.typing', 'sender': self.channel_name, 'is_typing': bool(content.get('is_typing')),
+            })
+        elif kind == 'history':
+            await self.send_history(content.get('after_id'))
+
+    async def send_history(self, after_id):
+        try:
+            after_id = int(after_id) if after_id not in (None, '') else None
+        except (TypeError, ValueError):
+            await self.send_json({'type': 'error', 'error': 'after_id must be an integer'})
+            return
+        messages, next_after_id = await database_sync_to_async(messages_after)(self.match, after_id)
+        await self.send_json({
+            'type': 'history',
+            'messages': [self.for_me(message_payload(message)) for message in messages],
+            'next_after_id': next_after_id,
+        })
+
+    def for_me(self, payload):
+        sender_id = payload.pop('sender_id')
+        return {**payload, 'is_me': sender_id == str(self.user.id)}
+
+    async def chat_message(self, event):
+        await self.send_json({'type': 'message', 'message': self.for_me(dict(event['message']))})
+
+    async def chat_typing(self, event):
+        if event['sender'] != self.channel_name:
+            await self.send_json({'type': 'typing', 'is_typing': event['is_typing']})
+
+    async def chat_expired(self, event):
+        await self.send_json({'type': 'expired'})
+        await self.close(code=4410)
+
+    @database_sync_to_async
+    def get_match(self, match_id):
+        try:
+            return MutualMatch.objects.filter(
+                Q(user1=self.user) | Q(user2=self.user), id=match_id, status='active',
+            ).first()
+        except ValidationError:
+            # The route lets through any hex-and-dashes id, UUID or not
+            return None
+
+    @database_sync_to_async
+    def chat_open(self):
+        return MutualMatch.objects.filter(id=self.match.id, status='active').exists()
+
+    @database_sync_to_async
+    def save_message(self, text):
+        return MatchChatMessage.objects.create(match=self.match, sender=self.user, text=text)
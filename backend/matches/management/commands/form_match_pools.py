@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from matches.scheduler import schedule_round
+
+
+class Command(BaseCommand):
+    help = "Form the day's match pools for every waiting profile, grouped by compatibility."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help="Day to form pools for (YYYY-MM-DD). Defaults to today.")
+        parser.add_argument('--campus', action='append', dest='campuses', help="Only this campus; repeat for several.")
+        parser.add_argument('--active-days', type=int, default=7, help="Skip profiles inactive for longer than this.")
+        parser.add_argument('--dry-run', action='store_true', help="Report the pools that would be formed without saving them.")
+
+    def handle(self, *args, **options):
+        summary = schedule_round(
+            day=options['date'], campuses=options['campuses'],
+            active_days=options['active_days'], dry_run=options['dry_run'],
+        )
+        for campus, (people, pools) in sorted(summary.items()):
+            self.stdout.write(f"{campus}: {people} waiting -> {pools} pool(s)")
+        verb = "Would form" if options['dry_run'] else "Formed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {sum(p for _, p in summary.values())} pool(s)."))
@@ -0,0 +1,58 @@
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import Event
+from matches.chat import chat_group
+from matches.models import MutualMatch
+from wall.broadcast import broadcast
+
+
+class Command(BaseCommand):
+    help = "Expire matches past their expires_at and reject stale event proposals, in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help="Keep sweeping every this many seconds (default: sweep once and exit).",
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        # The in-memory channel layer only reaches sockets in its own process,
+        # so a separate sweeper needs Redis to tell clients anything
+        self.notify = bool(settings.REDIS_URL)
+        if not self.notify:
+            self.stderr.write(self.style.WARNING(
+                "REDIS_URL is not set: sweeping without notifying open sockets."
+            ))
+        while True:
+            match_ids, event_ids = self.sweep()
+            if match_ids or event_ids or options['verbosity'] > 1:
+                self.stdout.write(f"Expired {len(match_ids)} match(es), rejected {len(event_ids)} event(s).")
+            if interval <= 0:
+                return
+            time.sleep(interval)
+
+    def sweep(self):
+        now = timezone.now()
+        with transaction.atomic():
+            match_ids = MutualMatch.expire_due(now)
+            event_ids = Event.reject_stale(now)
+
+        if not self.notify:
+            return match_ids, event_ids
+        # One wall message for the whole batch of rejections
+        if event_ids:
+            broadcast({'type': 'events_rejected', 'events': [{'id': str(pk), 'status': 'rejected'} for pk in event_ids]})
+        # Close any chat sockets still open on the expired matches
+        if match_ids:
+            layer = get_channel_layer()
+            for match_id in match_ids:
+                async_to_sync(layer.group_send)(chat_group(match_id), {'type': 'chat.expired'})
+        return match_ids, event_ids
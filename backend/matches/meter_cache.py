@@ -0,0 +1,159 @@
+"""
+Per-day cache of pairwise compatibility meters.
+
+Meter selection and jitter are seeded by (viewer, member, date), so a pair's
+result is fixed until the daily reshuffle. Entries are keyed on exactly that
+and expire at the next local midnight.
+
+Backends are picked with settings.MATCH_METER_CACHE:
+    {'BACKEND': 'local', 'MAX_ENTRIES': 50000}        # in-process LRU (default)
+    {'BACKEND': 'redis', 'URL': 'redis://...'}         # shared across workers
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .compatibility import calculate_meters_batch, pair_seed, select_random_meters
+
+
+def next_reshuffle(now: datetime) -> datetime:
+    """The next local midnight after `now`, when meter picks reshuffle."""
+    tomorrow = timezone.localtime(now).date() + timedelta(days=1)
+    return timezone.make_aware(datetime.combine(tomorrow, datetime.min.time()))
+
+
+class LocalTTLCache:
+    """Thread-safe LRU with an absolute expiry per entry."""
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        found = {}
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, items, expires_at):
+        with self._lock:
+            for key, value in items.items():
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisTTLCache:
+    """Same interface backed by Redis, so every worker shares one cache."""
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+        values = self.client.mget(keys)
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, items, expires_at):
+        pipe = self.client.pipeline()
+        for key, value in items.items():
+            pipe.set(key, json.dumps(value), exat=int(expires_at))
+        pipe.execute()
+
+    def clear(self):
+        for key in self.client.scan_iter('meters:*'):
+            self.client.delete(key)
+
+
+class MeterCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(viewer_id, member_id, day):
+        return f"meters:{viewer_id}:{member_id}:{day.strftime('%Y-%m-%d')}"
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else None,
+        }
+
+    def reset(self):
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def meters_for(self, viewer_id, viewer_profile, members, now=None):
+        """
+        Selected meters for `viewer` against each (member_id, profile_dict) in
+        `members`, in order. Only cache misses are scored, in a single batch.
+        """
+        now = now or timezone.now()
+        day = timezone.localtime(now)
+        keys = [self.key(viewer_id, member_id, day) for member_id, _ in members]
+        found = self.backend.get_many(keys)
+
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        with self._lock:
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            computed = calculate_meters_batch(
+                viewer_profile,
+                [members[i][1] for i in missing],
+                [select_random_meters(members[i][0], day) for i in missing],
+                [pair_seed(viewer_id, members[i][0], day) for i in missing],
+            )
+            fresh = {keys[i]: meters for i, meters in zip(missing, computed)}
+            self.backend.set_many(fresh, next_reshuffle(now).timestamp())
+            found.update(fresh)
+
+        return [found[key] for key in keys]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_meter_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            config = getattr(settings, 'MATCH_METER_CACHE', {})
+            if config.get('BACKEND') == 'redis':
+                backend = RedisTTLCache(config.get('URL') or settings.REDIS_URL)
+            else:
+                backend = LocalTTLCache(config.get('MAX_ENTRIES', 50000))
+            _cache = MeterCache(backend)
+        return _cache
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:01
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_member_count(apps, schema_editor):
+    MatchPool = apps.get_model('matches', 'MatchPool')
+    for pool in MatchPool.objects.annotate(n=Count('members')).iterator():
+        MatchPool.objects.filter(pk=pool.pk).update(member_count=pool.n, is_full=pool.n >= 9)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0003_matchrequest_compatibility_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchpool',
+            name='member_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_member_count, migrations.RunPython.noop),
+    ]
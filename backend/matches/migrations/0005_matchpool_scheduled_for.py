@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0004_matchpool_member_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchpool',
+            name='scheduled_for',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+    ]
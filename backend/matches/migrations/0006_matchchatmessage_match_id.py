@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0005_matchpool_scheduled_for'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='matchchatmessage',
+            index=models.Index(fields=['match', 'id'], name='matches_mat_match_i_f72bfe_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0006_matchchatmessage_match_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mutualmatch',
+            name='expired_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
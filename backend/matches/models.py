@@ -7,10 +7,12 @@ class MatchPool(models.Model):
     campus = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
     is_full = models.BooleanField(default=False)
+    member_count = models.PositiveSmallIntegerField(default=0)  # seats taken, see matches.pooling
+    scheduled_for = models.DateField(null=True, blank=True, db_index=True)  # set on pools formed by matches.scheduler
     members = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='match_pools')
 
     def __str__(self):
-        return f"Pool {self.id} - {self.campus} ({self.members.count()}/9)"
+        return f"Pool {self.id} - {self.campus} ({self.member_count}/9)"
 
 class MatchRequest(models.Model):
     from_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sent_match_requests')
@@ -45,17 +47,39 @@ class MutualMatch(models.Model):
     
     chat_unlocked_at = models.DateTimeField(null=True, blank=True)
     expires_at = models.DateTimeField(null=True, blank=True)
+    # Set by the sweep that expired the match; marks which rows it changed
+    expired_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"Match: {self.user1.username} & {self.user2.username}"
 
+    @classmethod
+    def expire_due(cls, now, batch_size=500):
+        """
+        Flip every match past its expires_at to 'expired'; returns the ids
+        this call expired. Run it inside a transaction, like Event.reject_stale().
+        """
+        due = cls.objects.filter(status__in=['pending', 'active'], expires_at__lte=now)
+        ids = list(due.values_list('pk', flat=True))
+        expired = []
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            # A match ended or expired since the SELECT is skipped by the
+            # re-checked status and not reported either
+            due.filter(pk__in=batch).update(status='expired', expired_at=now)
+            expired += cls.objects.filter(pk__in=batch, status='expired', expired_at=now).values_list('pk', flat=True)
+        return expired
+
 class MatchChatMessage(models.Model):
     match = models.ForeignKey(MutualMatch, on_delete=models.CASCADE, related_name='messages')
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['match', 'id'])]
+
 class MatchReport(models.Model):
     match = models.ForeignKey(MutualMatch, on_delete=models.CASCADE)
     reporter = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='reports_sent')
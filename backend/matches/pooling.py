@@ -0,0 +1,98 @@
+"""
+Seat assignment for match pools.
+
+A seat is claimed with a single conditional UPDATE on the stored
+`member_count` (`... SET member_count = member_count + 1 WHERE member_count < 9`),
+so concurrent joiners can never overfill a pool whatever the interleaving.
+Candidates are read without row locks: a joiner racing for the same pool
+waits on that UPDATE's row lock and then re-checks the count, rather than
+skipping a pool that still has seats. (Locking the candidates with SKIP
+LOCKED made a burst skip every open pool and open new ones.) On Postgres,
+opening a new pool is serialized per campus with an advisory lock, so a
+burst that finds every pool full doesn't create duplicates.
+
+SQLite has neither row locks nor concurrent writers, so there assignments
+in this process are funnelled through one lock instead of failing with
+"database table is locked" halfway through.
+"""
+import threading
+from contextlib import nullcontext
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, F, When
+
+from .models import MatchPool
+
+POOL_SIZE = 9
+CANDIDATE_POOLS = 5
+
+_single_writer = threading.Lock()
+
+
+def _claim_seat(pool_id):
+    """Atomically take one seat in `pool_id`; False if it filled up first."""
+    return MatchPool.objects.filter(pk=pool_id, member_count__lt=POOL_SIZE).update(
+        member_count=F('member_count') + 1,
+        # SET expressions see the pre-update row, so this marks the last seat
+        is_full=Case(When(member_count__gte=POOL_SIZE - 1, then=True), default=False),
+    ) == 1
+
+
+def _open_pools(user, campus):
+    # Unlocked read; _claim_seat's conditional UPDATE is what decides
+    pools = (
+        MatchPool.objects.filter(campus=campus, member_count__lt=POOL_SIZE)
+        .exclude(members=user)
+        .order_by('created_at')
+    )
+    return list(pools.values_list('pk', flat=True)[:CANDIDATE_POOLS])
+
+
+def _lock_campus(campus):
+    """Serialize pool creation for `campus` until the transaction ends."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [f'match-pool:{campus}'])
+
+
+def _take_open_seat(user, campus):
+    for pool_id in _open_pools(user, campus):
+        if not _claim_seat(pool_id):
+            continue
+        try:
+            with transaction.atomic():
+                MatchPool.members.through.objects.create(matchpool_id=pool_id, user_id=user.pk)
+        except IntegrityError:
+            # A parallel request from the same user got here first
+            MatchPool.objects.filter(pk=pool_id).update(member_count=F('member_count') - 1, is_full=False)
+            continue
+        return MatchPool.objects.get(pk=pool_id)
+    return None
+
+
+def assign_pool(user, campus):
+    """
+    Return the open pool `user` is in, seating them in one for `campus` (or a
+    fresh pool) if they are not in any.
+    """
+    guard = nullcontext() if connection.features.has_select_for_update else _single_writer
+    with guard:
+        pool = MatchPool.objects.filter(members=user, is_full=False).first()
+        if pool:
+            return pool
+
+        with transaction.atomic():
+            pool = _take_open_seat(user, campus)
+            if pool:
+                return pool
+
+            # Every candidate was full (or there were none). Whoever held the
+            # campus lock before us may have just opened a pool, so look again.
+            _lock_campus(campus)
+            pool = _take_open_seat(user, campus)
+            if pool:
+                return pool
+
+            pool = MatchPool.objects.create(campus=campus, member_count=1)
+            pool.members.add(user)
+            return pool
@@ -0,0 +1,164 @@
+"""
+Periodic pool formation.
+
+Instead of seating people in arrival order, `schedule_round` collects everyone
+waiting on each campus and groups them by compatibility:
+
+  1. Split by what people are looking for. "friends" and "dating" are formed
+     separately; their leftovers join the flexible "both" crowd.
+  2. Sort each bucket by a locality key (brain type, interests, social energy)
+     so similar profiles sit near each other.
+  3. Greedily take the first remaining person as a seed and pick the 8 best
+     partners from the next `window` people by affinity, which is the raw
+     vibe_collision, shared_brain_cell and social_battery meters plus a bonus
+     when both sides fit each other's match_preference.
+
+Each pool costs O(window) affinity calls, so a campus of N people is
+O(N * window). Run it from the form_match_pools command (e.g. nightly, before
+the meter reshuffle); current_pool then just looks up today's pool.
+"""
+from collections import defaultdict
+from datetime import timedelta
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Profile
+from .compatibility import ProfileEncoder, _batch_scorers
+from .models import MatchPool
+from .pooling import POOL_SIZE
+
+WINDOW = 32
+AFFINITY_METERS = ('vibe_collision', 'shared_brain_cell', 'social_battery')
+PREFERENCE_GENDER = {'women': 'woman', 'men': 'man'}
+
+
+class Candidate:
+    __slots__ = ('user_id', 'vibe', 'gender', 'match_preference', 'looking_for')
+
+    def __init__(self, user_id, vibe, gender='', match_preference='everyone', looking_for='both'):
+        self.user_id = user_id
+        self.vibe = vibe
+        self.gender = gender
+        self.match_preference = match_preference
+        self.looking_for = looking_for
+
+
+def _fits(wanted, gender):
+    target = PREFERENCE_GENDER.get(wanted)
+    return target is None or target == gender
+
+
+def _affinity_fn(enc):
+    scorers = [_batch_scorers(enc)[key] for key in AFFINITY_METERS]
+
+    def affinity(a, b):
+        score = sum(scorer(a.vibe, b.vibe) for scorer in scorers)
+        if a.looking_for != 'friends' and b.looking_for != 'friends':
+            if _fits(a.match_preference, b.gender) and _fits(b.match_preference, a.gender):
+                score += 50
+        return score
+
+    return affinity
+
+
+def _locality(candidate):
+    vibe = candidate.vibe
+    return (vibe.brain or '', vibe.interests, vibe.social)
+
+
+def _group(bucket, affinity, size, window):
+    """Greedy seed-and-fill over a locality-sorted bucket; returns (pools, leftovers)."""
+    remaining = sorted(bucket, key=_locality)
+    pools = []
+    while len(remaining) >= size:
+        seed = remaining[0]
+        nearby = remaining[1:window + 1]
+        ranked = sorted(range(len(nearby)), key=lambda i: affinity(seed, nearby[i]), reverse=True)
+        chosen = sorted([0] + [i + 1 for i in ranked[:size - 1]], reverse=True)
+        pools.append([remaining[i] for i in reversed(chosen)])
+        for index in chosen:
+            del remaining[index]
+    return pools, remaining
+
+
+def form_pools(people, size=POOL_SIZE, window=WINDOW):
+    """
+    Group `people` (dicts with user_id, the profile_vibe fields, gender,
+    match_preference and looking_for) into pools of `size`. Returns a list of
+    user_id lists; at most one, the last, is short.
+    """
+    enc = ProfileEncoder()
+    affinity = _affinity_fn(enc)
+    buckets = defaultdict(list)
+    for person in people:
+        buckets[person.get('looking_for') or 'both'].append(Candidate(
+            person['user_id'], enc.encode(person), person.get('gender') or '',
+            person.get('match_preference') or 'everyone', person.get('looking_for') or 'both',
+        ))
+
+    pools = []
+    flexible = buckets.pop('both', [])
+    for bucket in buckets.values():
+        formed, leftovers = _group(bucket, affinity, size, window)
+        pools.extend(formed)
+        flexible.extend(leftovers)
+    formed, leftovers = _group(flexible, affinity, size, window)
+    pools.extend(formed)
+    if leftovers:
+        pools.append(leftovers)
+    return [[candidate.user_id for candidate in pool] for pool in pools]
+
+
+def waiting_people(campus, day, active_days=7):
+    """Profiles on `campus` not in cooldown, recently active and not yet pooled for `day`."""
+    now = timezone.now()
+    already_pooled = MatchPool.members.through.objects.filter(matchpool__scheduled_for=day).values('user_id')
+    rows = (
+        Profile.objects.filter(campus=campus, user__is_active=True, last_active__gte=now - timedelta(days=active_days))
+        .exclude(matching_cooldown_until__gt=now)
+        .exclude(user_id__in=already_pooled)
+        .values_list('user_id', 'brain_type', 'interests', 'social_energy', 'connection_intent',
+                     'gender', 'match_preference', 'looking_for')
+    )
+    return [
+        {
+            'user_id': user_id, 'brain_type': brain, 'interests': interests, 'social_energy': social,
+            'connection_intent': intent, 'gender': gender, 'match_preference': preference, 'looking_for': looking_for,
+        }
+        for user_id, brain, interests, social, intent, gender, preference, looking_for in rows
+    ]
+
+
+def schedule_round(day=None, campuses=None, active_days=7, dry_run=False):
+    """
+    Form `day`'s pools (default today) for each campus. Returns
+    {campus: (people, pools)}. A short final pool is left open so
+    assign_pool can top it up with latecomers.
+    """
+    day = day or timezone.localdate()
+    if campuses is None:
+        campuses = Profile.objects.order_by().values_list('campus', flat=True).distinct()
+
+    summary = {}
+    for campus in campuses:
+        people = waiting_people(campus, day, active_days)
+        groups = form_pools(people)
+        summary[campus] = (len(people), len(groups))
+        if dry_run or not groups:
+            continue
+
+        pools = [
+            MatchPool(id=uuid.uuid4(), campus=campus, scheduled_for=day,
+                      member_count=len(group), is_full=len(group) >= POOL_SIZE)
+            for group in groups
+        ]
+        Membership = MatchPool.members.through
+        with transaction.atomic():
+            MatchPool.objects.bulk_create(pools)
+            Membership.objects.bulk_create(
+                [Membership(matchpool_id=pool.id, user_id=user_id) for pool, group in zip(pools, groups) for user_id in group],
+                batch_size=2000,
+            )
+    return summary
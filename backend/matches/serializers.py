@@ -47,4 +47,4 @@ class ChatMessageSerializer(serializers.ModelSerializer):
         fields = ['id', 'text', 'created_at', 'is_me']
 
     def get_is_me(self, obj):
-        return obj.sender == self.context['request'].user
+        return obj.sender_id == self.context['request'].user.id
@@ -1,3 +1,503 @@
-from django.test import TestCase
+import random
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from channels.testing import WebsocketCommunicator
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User, Profile
+from events.models import Event
+
+from .chat import HISTORY_LIMIT
+from .compatibility import (
+    ALL_METERS, calculate_all_meters, calculate_meters_batch, pair_seed, select_random_meters,
+)
+from .meter_cache import LocalTTLCache, get_meter_cache
+from .models import MatchChatMessage, MatchPool, MatchRequest, MutualMatch
+from .pooling import POOL_SIZE, assign_pool
+from .scheduler import form_pools, schedule_round
+
+BRAINS = ['overthinker', 'flow', 'spreadsheet', 'see_what_happens', 'delulu', 'chaos', 'wifi', 'npc', '']
+INTERESTS = ['memes', 'chaos', 'random', 'music', 'coding', 'chai', 'art']
+SOCIAL = ['recharge_alone', 'party', 'small_groups']
+INTENTS = ['deep', 'random', 'friends', 'dating']
+
+
+def random_profile(rng):
+    return {
+        'brain_type': rng.choice(BRAINS),
+        'interests': rng.sample(INTERESTS, rng.randint(0, 4)),
+        'social_energy': rng.sample(SOCIAL, rng.randint(0, 3)),
+        'connection_intent': rng.sample(INTENTS, rng.randint(0, 3)),
+    }
+
+
+class BatchCompatibilityTests(SimpleTestCase):
+    @mock.patch('matches.compatibility.random.uniform', return_value=0)
+    def test_batch_matches_per_pair_meters(self, _uniform):
+        rng = random.Random(7)
+        for _ in range(200):
+            viewer = random_profile(rng)
+            candidates = [random_profile(rng) for _ in range(9)]
+            batch = calculate_meters_batch(viewer, candidates)
+            self.assertEqual(batch, [calculate_all_meters(viewer, c) for c in candidates])
+
+    def test_seeded_batch_matches_seeded_per_pair(self):
+        rng = random.Random(11)
+        viewer = random_profile(rng)
+        candidates = [random_profile(rng) for _ in range(20)]
+        seeds = [pair_seed('viewer', i, datetime(2026, 1, 1)) for i in range(20)]
+        batch = calculate_meters_batch(viewer, candidates, seeds=seeds)
+        self.assertEqual(batch, [calculate_all_meters(viewer, c, seed) for c, seed in zip(candidates, seeds)])
+
+    def test_batch_computes_only_requested_meters(self):
+        rng = random.Random(3)
+        candidates = [random_profile(rng) for _ in range(3)]
+        wanted = [['shared_brain_cell'], None, ['unhinged_combo', 'vibe_collision']]
+        results = calculate_meters_batch(random_profile(rng), candidates, wanted)
+        self.assertEqual(list(results[0]), ['shared_brain_cell'])
+        self.assertEqual(list(results[1]), ALL_METERS)
+        self.assertEqual(set(results[2]), {'unhinged_combo', 'vibe_collision'})
+        for meter in results[1].values():
+            self.assertEqual(set(meter), {'value', 'label', 'tooltip'})
+
+
+class DeterministicMeterTests(SimpleTestCase):
+    day = datetime(2026, 3, 14)
+    snippet = (
+        "from datetime import datetime;"
+        "from matches.compatibility import calculate_all_meters, select_random_meters;"
+        "p = {'brain_type': 'chaos', 'interests': ['memes'], 'social_energy': [], 'connection_intent': ['random']};"
+        "print(select_random_meters('u-42', datetime(2026, 3, 14)),"
+        " calculate_all_meters(p, p, 'u-1:u-42:2026-03-14')['vibe_collision'])"
+    )
+
+    def run_snippet(self):
+        return subprocess.run(
+            [sys.executable, '-c', self.snippet], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout
+
+    def test_identical_across_processes(self):
+        # Each interpreter gets a different str hash() salt
+        self.assertEqual(self.run_snippet(), self.run_snippet())
+
+    def test_selection_does_not_touch_global_rng(self):
+        random.seed(1234)
+        expected = random.random()
+        random.seed(1234)
+        select_random_meters('u-1', self.day)
+        self.assertEqual(random.random(), expected)
+
+    def test_stable_under_thread_pool(self):
+        profile = {'brain_type': 'flow', 'interests': ['music'], 'social_energy': ['party'], 'connection_intent': []}
+        users = [f'user-{i}' for i in range(50)]
+
+        def score(user_id):
+            seed = pair_seed('viewer', user_id, self.day)
+            return select_random_meters(user_id, self.day), calculate_all_meters(profile, profile, seed)
+
+        expected = [score(user_id) for user_id in users]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            for _ in range(5):
+                self.assertEqual(list(pool.map(score, users)), expected)
+
+
+def make_member(name, campus='Main Campus', **vibe):
+    user = User.objects.create_user(username=name, email=f'{name}@campus.test')
+    Profile.objects.create(user=user, nickname=name, campus=campus, **vibe)
+    return user
+
+
+class MeterCacheTests(TestCase):
+    def setUp(self):
+        get_meter_cache().reset()
+        self.viewer = make_member('viewer', brain_type='chaos', interests=['memes'])
+        self.pool = MatchPool.objects.create(campus='Main Campus')
+        self.pool.members.add(self.viewer)
+        for i in range(4):
+            self.pool.members.add(make_member(f'member{i}', brain_type='flow', interests=['music']))
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def test_local_cache_expires_entries(self):
+        cache = LocalTTLCache()
+        cache.set_many({'a': 1}, expires_at=0)
+        cache.set_many({'b': 2}, expires_at=float('inf'))
+        self.assertEqual(cache.get_many(['a', 'b']), {'b': 2})
+
+    def test_local_cache_evicts_least_recently_used(self):
+        cache = LocalTTLCache(max_entries=2)
+        cache.set_many({'a': 1, 'b': 2}, expires_at=float('inf'))
+        cache.get_many(['a'])
+        cache.set_many({'c': 3}, expires_at=float('inf'))
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 1, 'c': 3})
+
+    def test_reopening_the_pool_scores_nothing(self):
+        first = self.client.get('/api/matching/current_pool/').json()
+        with mock.patch('matches.meter_cache.calculate_meters_batch') as batch:
+            second = self.client.get('/api/matching/current_pool/').json()
+        batch.assert_not_called()
+        self.assertEqual(first['members'], second['members'])
+        self.assertEqual(get_meter_cache().stats()['hits'], 4)
+
+    def test_match_request_persists_metrics(self):
+        pool = self.client.get('/api/matching/current_pool/').json()
+        target = pool['members'][0]
+        self.client.post('/api/matching/request_meetup/', {'target_user_id': target['id'], 'pool_id': pool['id']})
+        stored = MatchRequest.objects.get(from_user=self.viewer).compatibility_metrics
+        self.assertEqual(stored, target['compatibility_meters'])
+
+
+class CurrentPoolQueryTests(TestCase):
+    def setUp(self):
+        get_meter_cache().reset()
+        self.viewer = make_member('viewer')
+        self.pool = MatchPool.objects.create(campus='Main Campus')
+        self.pool.members.add(self.viewer)
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def pool_queries(self, size):
+        while self.pool.members.count() < size:
+            self.pool.members.add(make_member(f'member{self.pool.members.count()}'))
+        get_meter_cache().reset()
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get('/api/matching/current_pool/').json()
+        self.assertEqual(len(data['members']), size - 1)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_pool_size(self):
+        self.assertEqual(self.pool_queries(2), self.pool_queries(8))
+
+
+class PoolAssignmentTests(TransactionTestCase):
+    def test_concurrent_joiners_fill_pools_exactly(self):
+        users = [User.objects.create(username=f'joiner{i}', email=f'joiner{i}@campus.test') for i in range(POOL_SIZE * 6)]
+
+        def join(user):
+            try:
+                return assign_pool(user, 'Main Campus').pk
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            assigned = list(executor.map(join, users))
+
+        self.assertEqual(len(assigned), len(users))
+        for pool in MatchPool.objects.all():
+            self.assertEqual(pool.member_count, pool.members.count())
+            self.assertLessEqual(pool.member_count, POOL_SIZE)
+        sizes = sorted(MatchPool.objects.values_list('member_count', flat=True))
+        self.assertEqual(sum(sizes), len(users))
+        self.assertEqual(sizes, [POOL_SIZE] * 6)
+        self.assertFalse(MatchPool.objects.filter(is_full=False).exists())
+
+    def test_candidate_pools_are_read_without_row_locks(self):
+        # A burst must queue on the open pool's seat UPDATE, not skip it
+        # because another joiner holds a row lock on it
+        MatchPool.objects.create(campus='Main Campus', member_count=3)
+        user = User.objects.create(username='locker', email='locker@campus.test')
+        # Behave like Postgres, which has row locks with SKIP LOCKED
+        with mock.patch.multiple(connection.features, has_select_for_update=True,
+                                 has_select_for_update_skip_locked=True):
+            with CaptureQueriesContext(connection) as ctx:
+                assign_pool(user, 'Main Campus')
+        self.assertFalse([q for q in ctx.captured_queries if 'FOR UPDATE' in q['sql']])
+        self.assertEqual(MatchPool.objects.count(), 1)
+
+    def test_rejoining_returns_the_same_pool(self):
+        user = User.objects.create(username='repeat', email='repeat@campus.test')
+        pool = assign_pool(user, 'Main Campus')
+        self.assertEqual(assign_pool(user, 'Main Campus'), pool)
+        pool.refresh_from_db()
+        self.assertEqual(pool.member_count, 1)
+
+
+class SchedulerTests(TestCase):
+    def people(self, count, rng, **fields):
+        return [{'user_id': f'{fields.get("looking_for", "both")}{i}', **random_profile(rng), **fields} for i in range(count)]
+
+    def test_everyone_is_placed_once_in_pools_of_nine(self):
+        people = self.people(40, random.Random(5))
+        pools = form_pools(people)
+        self.assertEqual([len(pool) for pool in pools], [9, 9, 9, 9, 4])
+        self.assertCountEqual([user_id for pool in pools for user_id in pool], [p['user_id'] for p in people])
+
+    def test_friends_and_dating_are_pooled_separately(self):
+        rng = random.Random(8)
+        people = self.people(18, rng, looking_for='friends') + self.people(18, rng, looking_for='dating')
+        for pool in form_pools(people):
+            self.assertEqual(len({user_id.rstrip('0123456789') for user_id in pool}), 1)
+
+    def test_current_pool_returns_the_scheduled_pool(self):
+        users = [make_member(f'sched{i}') for i in range(10)]
+        schedule_round()
+        self.assertEqual(MatchPool.objects.filter(scheduled_for__isnull=False).count(), 2)
+        schedule_round()
+        self.assertEqual(MatchPool.objects.filter(scheduled_for__isnull=False).count(), 2)
+
+        pool = MatchPool.objects.get(members=users[0])
+        client = APIClient()
+        client.force_authenticate(users[0])
+        data = client.get('/api/matching/current_pool/').json()
+        self.assertEqual(data['id'], str(pool.id))
+        self.assertEqual(len(data['members']), pool.member_count - 1)
+
+
+class MatchChatTests(TransactionTestCase):
+    def setUp(self):
+        self.alice = make_member('alice')
+        self.bob = make_member('bob')
+        pool = MatchPool.objects.create(campus='Main Campus')
+        self.match = MutualMatch.objects.create(user1=self.alice, user2=self.bob, pool=pool, status='active')
+
+    def socket(self, user=None, query=''):
+        from config.asgi import application
+        token = f'token={AccessToken.for_user(user)}' if user else ''
+        return WebsocketCommunicator(application, f'/ws/matches/{self.match.id}/chat/?{token}{query}')
+
+    async def connect(self, socket):
+        """Connect and return the history frame every socket opens with."""
+        self.assertTrue((await socket.connect())[0])
+        history = await socket.receive_json_from()
+        self.assertEqual(history['type'], 'history')
+        return history
+
+    async def test_messages_and_typing_fan_out(self):
+        alice, bob = self.socket(self.alice), self.socket(self.bob)
+        await self.connect(alice)
+        await self.connect(bob)
+
+        await alice.send_json_to({'type': 'typing', 'is_typing': True})
+        self.assertEqual(await bob.receive_json_from(), {'type': 'typing', 'is_typing': True})
+        self.assertTrue(await alice.receive_nothing())
+
+        await alice.send_json_to({'type': 'message', 'text': 'library at 9?'})
+        mine, theirs = await alice.receive_json_from(), await bob.receive_json_from()
+        self.assertTrue(mine['message']['is_me'])
+        self.assertFalse(theirs['message']['is_me'])
+        self.assertEqual(theirs['message']['text'], 'library at 9?')
+        await alice.disconnect()
+        await bob.disconnect()
+
+    async def test_reconnect_replays_only_missed_messages(self):
+        first = await MatchChatMessage.objects.acreate(match=self.match, sender=self.alice, text='one')
+        await MatchChatMessage.objects.acreate(match=self.match, sender=self.alice, text='two')
+        socket = self.socket(self.bob, f'&after_id={first.id}')
+        history = await self.connect(socket)
+        self.assertEqual([m['text'] for m in history['messages']], ['two'])
+        self.assertIsNone(history['next_after_id'])
+        await socket.disconnect()
+
+    async def test_long_chats_open_on_the_latest_and_replay_in_pages(self):
+        await MatchChatMessage.objects.abulk_create([
+            MatchChatMessage(match=self.match, sender=self.alice, text=f'msg {i}') for i in range(HISTORY_LIMIT + 50)
+        ])
+        socket = self.socket(self.bob)
+        history = await self.connect(socket)
+        self.assertEqual([m['text'] for m in history['messages']],
+                         [f'msg {i}' for i in range(50, HISTORY_LIMIT + 50)])
+        await socket.disconnect()
+
+        first = await MatchChatMessage.objects.order_by('id').afirst()
+        socket = self.socket(self.bob, f'&after_id={first.id}')
+        history = await self.connect(socket)
+        replayed = [m['text'] for m in history['messages']]
+        self.assertEqual(len(replayed), HISTORY_LIMIT)
+        while history['next_after_id'] is not None:
+            await socket.send_json_to({'type': 'history', 'after_id': history['next_after_id']})
+            history = await socket.receive_json_from()
+            replayed += [m['text'] for m in history['messages']]
+        self.assertEqual(replayed, [f'msg {i}' for i in range(1, HISTORY_LIMIT + 50)])
+        await socket.disconnect()
+
+    async def test_outsiders_and_anonymous_are_refused(self):
+        outsider = await database_sync_to_async(make_member)('mallory')
+        for socket in (self.socket(outsider), self.socket()):
+            connected, code = await socket.connect()
+            self.assertFalse(connected)
+
+    async def test_malformed_match_ids_are_refused(self):
+        from config.asgi import application
+        for match_id in ('aaa', 'abc-def'):
+            socket = WebsocketCommunicator(
+                application, f'/ws/matches/{match_id}/chat/?token={AccessToken.for_user(self.alice)}',
+            )
+            self.assertEqual(await socket.connect(), (False, 4403))
+
+    def test_rest_send_pushes_to_socket(self):
+        async def listen():
+            socket = self.socket(self.alice)
+            await self.connect(socket)
+            await database_sync_to_async(self.rest_send)('hey from rest')
+            received = await socket.receive_json_from()
+            await socket.disconnect()
+            return received
+
+        received = async_to_sync(listen)()
+        self.assertEqual(received['message']['text'], 'hey from rest')
+        self.assertFalse(received['message']['is_me'])
+
+    def rest_send(self, text):
+        client = APIClient()
+        client.force_authenticate(self.bob)
+        return client.post(f'/api/mutual/{self.match.id}/send_message/', {'text': text})
+
+
+class ChatHistoryTests(TestCase):
+    def setUp(self):
+        self.alice = make_member('alice')
+        self.bob = make_member('bob')
+        pool = MatchPool.objects.create(campus='Main Campus')
+        self.match = MutualMatch.objects.create(user1=self.alice, user2=self.bob, pool=pool, status='active')
+        MatchChatMessage.objects.bulk_create([
+            MatchChatMessage(match=self.match, sender=self.alice if i % 2 else self.bob, text=f'msg {i}')
+            for i in range(25)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+        self.url = f'/api/mutual/{self.match.id}/messages/'
+
+    def test_walk_back_through_history_with_before(self):
+        page = self.client.get(self.url, {'limit': 10}).json()
+        texts = [m['text'] for m in page['results']]
+        self.assertEqual(texts, [f'msg {i}' for i in range(15, 25)])
+
+        seen = texts
+        while page['before_cursor']:
+            page = self.client.get(self.url, {'limit': 10, 'before': page['before_cursor']}).json()
+            seen = [m['text'] for m in page['results']] + seen
+        self.assertEqual(seen, [f'msg {i}' for i in range(25)])
+
+    def test_after_returns_only_newer_messages(self):
+        cursor = self.client.get(self.url).json()['after_cursor']
+        self.assertEqual(self.client.get(self.url, {'after': cursor}).json()['results'], [])
+
+        new = MatchChatMessage.objects.create(match=self.match, sender=self.bob, text='new one')
+        page = self.client.get(self.url, {'after': cursor}).json()
+        self.assertEqual([(m['text'], m['is_me']) for m in page['results']], [('new one', False)])
+        # The same message id the chat socket resumes from with after_id
+        self.assertEqual(page['after_cursor'], new.id)
+
+    def test_before_cursor_is_null_without_older_messages(self):
+        first = self.match.messages.order_by('id').first()
+        page = self.client.get(self.url, {'after': first.id - 1, 'limit': 5}).json()
+        self.assertEqual(page['results'][0]['text'], 'msg 0')
+        self.assertIsNone(page['before_cursor'])
+
+        page = self.client.get(self.url, {'after': first.id, 'limit': 5}).json()
+        self.assertEqual(page['before_cursor'], first.id + 1)
+
+        self.assertIsNone(self.client.get(self.url, {'limit': 30}).json()['before_cursor'])
+
+    def test_non_integer_cursors_are_rejected(self):
+        for params in ({'before': 'abc'}, {'after': '2020-01-01'}, {'limit': 'ten'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+    def test_page_queries_do_not_load_senders(self):
+        with self.assertNumQueries(2):  # the match, then one page; senders are never loaded
+            self.client.get(self.url, {'limit': 20})
+
+
+@override_settings(REDIS_URL='redis://localhost:6379/0')
+class SweepExpiredTests(TestCase):
+    def setUp(self):
+        self.user = make_member('organizer')
+        other = make_member('other')
+        now = timezone.now()
+        self.stale, self.fresh = (
+            Event.objects.create(organizer=self.user, title=title, description='', location='Quad',
+                                 start_time=now + timedelta(days=3), end_time=now + timedelta(days=3, hours=2))
+            for title in ('stale', 'fresh')
+        )
+        Event.objects.filter(pk=self.stale.pk).update(created_at=now - timedelta(hours=49))
+        pool = MatchPool.objects.create(campus='Main Campus')
+        self.due = MutualMatch.objects.create(user1=self.user, user2=other, pool=pool, status='active',
+                                              expires_at=now - timedelta(minutes=1))
+        self.live = MutualMatch.objects.create(user1=other, user2=self.user, pool=pool, status='active',
+                                               expires_at=now + timedelta(hours=1))
+
+    def test_pending_approval_hides_stale_events_without_writing(self):
+        client = APIClient()
+        with CaptureQueriesContext(connection) as ctx:
+            data = client.get('/api/events/pending_approval/').json()
+        self.assertEqual([event['id'] for event in data], [str(self.fresh.id)])
+        self.assertFalse([q for q in ctx.captured_queries if not q['sql'].startswith('SELECT')])
+        self.stale.refresh_from_db()
+        self.assertEqual(self.stale.status, 'pending_vote')
+
+    @mock.patch('matches.management.commands.sweep_expired.broadcast')
+    def test_sweep_updates_in_bulk_and_broadcasts_once(self, broadcast):
+        call_command('sweep_expired', stdout=StringIO())
+
+        self.assertEqual(Event.objects.get(pk=self.stale.pk).status, 'rejected')
+        self.assertEqual(Event.objects.get(pk=self.fresh.pk).status, 'pending_vote')
+        self.assertEqual(MutualMatch.objects.get(pk=self.due.pk).status, 'expired')
+        self.assertEqual(MutualMatch.objects.get(pk=self.live.pk).status, 'active')
+        broadcast.assert_called_once_with({
+            'type': 'events_rejected', 'events': [{'id': str(self.stale.id), 'status': 'rejected'}],
+        })
+
+        broadcast.reset_mock()
+        call_command('sweep_expired', stdout=StringIO())
+        broadcast.assert_not_called()
+
+    @mock.patch('matches.management.commands.sweep_expired.broadcast')
+    def test_events_approved_mid_sweep_are_not_reported(self, broadcast):
+        values_list = QuerySet.values_list
+        approved = []
+
+        def approve_after_select(queryset, *args, **kwargs):
+            ids = list(values_list(queryset, *args, **kwargs))
+            # Another request approves the proposal between the SELECT and the UPDATE
+            if queryset.model is Event and not approved:
+                approved.append(Event.objects.filter(pk=self.stale.pk).update(status='approved'))
+            return ids
+
+        with mock.patch.object(QuerySet, 'values_list', autospec=True, side_effect=approve_after_select):
+            call_command('sweep_expired', stdout=StringIO())
+
+        self.assertEqual(Event.objects.get(pk=self.stale.pk).status, 'approved')
+        broadcast.assert_not_called()
+
+    def test_matches_expired_mid_sweep_are_not_reported(self):
+        values_list = QuerySet.values_list
+        swept = []
+
+        def expire_after_select(queryset, *args, **kwargs):
+            ids = list(values_list(queryset, *args, **kwargs))
+            # Another sweeper expires the match between the SELECT and the UPDATE
+            if queryset.model is MutualMatch and not swept:
+                swept.append(None)
+                swept[0] = MutualMatch.expire_due(timezone.now() - timedelta(seconds=1))
+            return ids
+
+        with mock.patch.object(QuerySet, 'values_list', autospec=True, side_effect=expire_after_select):
+            self.assertEqual(MutualMatch.expire_due(timezone.now()), [])
+        self.assertEqual(swept, [[self.due.pk]])
+
+    @override_settings(REDIS_URL=None)
+    @mock.patch('matches.management.commands.sweep_expired.broadcast')
+    def test_without_redis_sweeps_but_skips_notifications(self, broadcast):
+        stderr = StringIO()
+        call_command('sweep_expired', stdout=StringIO(), stderr=stderr)
+
+        self.assertEqual(Event.objects.get(pk=self.stale.pk).status, 'rejected')
+        self.assertEqual(MutualMatch.objects.get(pk=self.due.pk).status, 'expired')
+        broadcast.assert_not_called()
+        self.assertIn('REDIS_URL', stderr.getvalue())
@@ -1,10 +1,20 @@
 from django.contrib import admin
+from django.db.models import Q
 from .models import WallPost, PostReaction
+from .search import post_index
 
 class WallPostAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'mood', 'content_snippet', 'created_at', 'is_deleted')
     list_filter = ('mood', 'is_deleted', 'created_at')
-    search_fields = ('content', 'user__username')
+    search_fields = ('title', 'content', 'user__username')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Text goes through the full-text index instead of LIKE '%q%' scans;
+        # usernames match exactly
+        if not search_term:
+            return queryset, False
+        matches = post_index.search(WallPost.objects.all(), search_term, window=None).values('pk')
+        return queryset.filter(Q(pk__in=matches) | Q(user__username=search_term.strip())), False
     
     def content_snippet(self, obj):
         return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
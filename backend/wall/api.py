@@ -1,57 +1,87 @@
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import WallPost, PostReaction, SavedPost, ReportedPost
 from .serializers import WallPostSerializer
+from .feed import feed_queryset, viewer_context
+from .broadcast import publish
+from .search import post_index
+from config.pagination import KeysetPaginator
+from config.search import search_page
 
 class WallPostViewSet(viewsets.ModelViewSet):
     queryset = WallPost.objects.filter(is_deleted=False).order_by('-created_at')
     serializer_class = WallPostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-    def _broadcast_update(self, post_data, update_type='post_created'):
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            'wall_feed',
-            {
-                'type': 'wall_update',
-                'message': {
-                    'type': update_type,
-                    'post': post_data
-                }
-            }
-        )
+    def _broadcast_update(self, post_data, update_type='post_created', coalesce_id=None):
+        """
+        Queue a wall update for after commit. `post_data` may be a callable so
+        serialization happens in the dispatcher, not in the request. Updates
+        sharing a `coalesce_id` within one dispatch window collapse into one.
+        """
+        if callable(post_data):
+            message = lambda: {'type': update_type, 'post': post_data()}
+        else:
+            message = {'type': update_type, 'post': post_data}
+        key = (update_type, str(coalesce_id)) if coalesce_id else None
+        publish(message, key=key)
+
+    def list(self, request, *args, **kwargs):
+        posts = list(feed_queryset().order_by('-created_at'))
+        serializer = self.get_serializer(posts, many=True, context=viewer_context(request, posts))
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def feed(self, request):
+        """Cursor-paginated wall, newest first: ?cursor=<next_cursor>&limit=20"""
+        paginator = KeysetPaginator('created_at', descending=True)
+        posts, next_cursor = paginator.paginate(feed_queryset(), request)
+        serializer = self.get_serializer(posts, many=True, context=viewer_context(request, posts))
+        return Response({
+            'results': serializer.data,
+            'next_cursor': next_cursor,
+        })
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Ranked full-text search over titles and content: ?q=exam+tips&limit=20&offset=0"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "A search query (?q=) is required."}, status=status.HTTP_400_BAD_REQUEST)
+        ranked = post_index.search(WallPost.objects.filter(is_deleted=False), query)
+        posts, next_offset = search_page(ranked, feed_queryset(), request)
+        serializer = self.get_serializer(posts, many=True, context=viewer_context(request, posts))
+        return Response({
+            'results': serializer.data,
+            'next_offset': next_offset,
+        })
 
     def perform_create(self, serializer):
         post = serializer.save(user=self.request.user)
-        self._broadcast_update(WallPostSerializer(post).data)
+        self._broadcast_update(lambda: WallPostSerializer(post).data)
 
     @action(detail=True, methods=['post'])
     def react(self, request, pk=None):
         post = self.get_object()
         reaction_type = request.data.get('reaction_type', 'heart')
-        
-        reaction, created = PostReaction.objects.update_or_create(
-            post=post,
-            user=request.user,
-            defaults={'reaction_type': reaction_type}
-        )
-        
-        if not created and reaction.reaction_type == reaction_type:
-            # If same reaction, toggle off
-            reaction.delete()
-            status_msg = "reaction_removed"
-        else:
-            status_msg = "reaction_added"
+        if reaction_type not in dict(PostReaction.REACTION_TYPES):
+            return Response({"error": "Invalid reaction type"}, status=status.HTTP_400_BAD_REQUEST)
+
+        status_msg = PostReaction.toggle(post, request.user, reaction_type)
+        post.refresh_from_db()
             
-        # Broadcast reaction update
-        self._broadcast_update(WallPostSerializer(post, context={'request': request}).data, update_type='reaction_updated')
+        # Broadcast a counters-only delta (bursts on the same post collapse into one)
+        self._broadcast_update({
+            'id': str(post.id),
+            'reaction_count': post.reaction_count,
+            'reaction_counts': post.reaction_counts,
+        }, update_type='reaction_updated', coalesce_id=post.id)
             
         return Response({
             'status': status_msg, 
-            'reaction_count': post.reactions.count(),
+            'reaction_count': post.reaction_count,
+            'reaction_counts': post.reaction_counts,
             'my_reaction': reaction_type if status_msg == "reaction_added" else None
         })
 
@@ -73,18 +103,13 @@ class WallPostViewSet(viewsets.ModelViewSet):
         )
         
         serializer = WallPostSerializer(new_post, context={'request': request})
-        self._broadcast_update(serializer.data, update_type='post_created')
+        self._broadcast_update(lambda: WallPostSerializer(new_post).data, update_type='post_created')
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'])
     def save_post(self, request, pk=None):
         post = self.get_object()
-        saved, created = SavedPost.objects.get_or_create(user=request.user, post=post)
-        
-        if not created:
-            saved.delete()
-            return Response({'status': 'unsaved'})
-        return Response({'status': 'saved'})
+        return Response({'status': SavedPost.toggle(request.user, post)})
 
     @action(detail=True, methods=['post'])
     def report(self, request, pk=None):
@@ -105,5 +130,5 @@ class WallPostViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         post_id = instance.id
         self.perform_destroy(instance)
-        self._broadcast_update({'id': post_id}, update_type='post_deleted')
+        self._broadcast_update({'id': str(post_id)}, update_type='post_deleted')
         return Response(status=status.HTTP_204_NO_CONTENT)
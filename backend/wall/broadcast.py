@@ -0,0 +1,141 @@
+"""
+Fan-out of live wall/event updates to connected WallConsumer sockets.
+
+Sockets are spread over WALL_FEED_SHARDS hashed groups ("wall_feed.<n>")
+instead of one giant "wall_feed" group, so a broadcast becomes several small
+group_sends issued concurrently rather than one loop over every socket.
+
+REST writes never talk to the channel layer themselves: `publish()` queues
+the update on commit and the outbox dispatcher sends it ~100ms later,
+collapsing repeated updates for the same key (e.g. a post's reaction count)
+into one message.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+
+from .protocol import versioned
+
+logger = logging.getLogger(__name__)
+
+WALL_FEED_GROUP = 'wall_feed'
+
+
+def shard_count():
+    return max(1, getattr(settings, 'WALL_FEED_SHARDS', 1))
+
+
+def shard_group(channel_name):
+    """Stable shard group for a socket (crc32, so every worker agrees)."""
+    shard = zlib.crc32(channel_name.encode()) % shard_count()
+    return f"{WALL_FEED_GROUP}.{shard}"
+
+
+def shard_groups():
+    return [f"{WALL_FEED_GROUP}.{shard}" for shard in range(shard_count())]
+
+
+async def group_send_all(channel_layer, event):
+    await asyncio.gather(*(
+        channel_layer.group_send(group, event) for group in shard_groups()
+    ))
+
+
+def broadcast(message):
+    """Push `message` ({'type': ..., ...}) to every connected wall socket now."""
+    async_to_sync(group_send_all)(get_channel_layer(), {
+        'type': 'wall_update',
+        'message': versioned(message),
+    })
+
+
+class BroadcastOutbox:
+    """
+    Coalescing, batching dispatcher for wall updates.
+
+    Messages are keyed; enqueueing a key that is already pending replaces the
+    earlier message, so only the latest state goes out. A message may also be
+    a zero-argument callable, which is only evaluated (in a worker thread) when
+    the batch is sent, keeping serialization off the request path.
+
+    Flushes run on the ASGI event loop once a WallConsumer has bound it (so the
+    in-memory layer is only touched from its own loop), otherwise on a private
+    background loop.
+    """
+
+    def __init__(self, window=None):
+        self.window = window if window is not None else getattr(settings, 'BROADCAST_WINDOW', 0.1)
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._loop = None
+        self._private_loop = False
+        self._seq = itertools.count()
+
+    def bind_loop(self, loop):
+        with self._lock:
+            if self._loop is None or self._loop.is_closed() or self._private_loop:
+                self._loop = loop
+                self._private_loop = False
+
+    def enqueue(self, message, key=None):
+        if key is None:
+            key = ('unkeyed', next(self._seq))
+        with self._lock:
+            self._pending.pop(key, None)
+            self._pending[key] = message
+            if self._scheduled:
+                return
+            self._scheduled = True
+            loop = self._get_loop()
+        loop.call_soon_threadsafe(loop.call_later, self.window, self._start_flush, loop)
+
+    def _get_loop(self):
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            self._private_loop = True
+            threading.Thread(target=self._loop.run_forever, name='broadcast-outbox', daemon=True).start()
+        return self._loop
+
+    def _start_flush(self, loop):
+        loop.create_task(self.flush())
+
+    def _take_batch(self):
+        with self._lock:
+            batch = list(self._pending.values())
+            self._pending.clear()
+            self._scheduled = False
+        return batch
+
+    async def flush(self):
+        """Send everything pending right now."""
+        batch = self._take_batch()
+        if not batch:
+            return
+        layer = get_channel_layer()
+        for message in batch:
+            try:
+                if callable(message):
+                    message = await sync_to_async(message)()
+                await group_send_all(layer, {'type': 'wall_update', 'message': versioned(message)})
+            except Exception:
+                logger.exception("Dropped wall broadcast")
+
+
+outbox = BroadcastOutbox()
+
+
+def publish(message, key=None):
+    """
+    Broadcast `message` to wall sockets once the current transaction commits.
+    Pass `key` to coalesce bursts, e.g. ('reaction_updated', post.id).
+    """
+    transaction.on_commit(lambda: outbox.enqueue(message, key))
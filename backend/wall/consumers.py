@@ -1,9 +1,15 @@
-import json
+import asyncio
+from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
+from .broadcast import outbox, shard_group
+from .protocol import FrameEncoder
 
 class WallConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        self.room_group_name = 'wall_feed'
+        self.room_group_name = shard_group(self.channel_name)
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        self.encoder = FrameEncoder(query.get('format', ['json'])[0])
+        outbox.bind_loop(asyncio.get_running_loop())
 
         await self.channel_layer.group_add(
             self.room_group_name,
@@ -22,4 +28,5 @@ class WallConsumer(AsyncWebsocketConsumer):
         pass
 
     async def wall_update(self, event):
-        await self.send(text_data=json.dumps(event['message']))
+        text_data, bytes_data = self.encoder.encode(event['message'])
+        await self.send(text_data=text_data, bytes_data=bytes_data)
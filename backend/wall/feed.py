@@ -0,0 +1,35 @@
+"""
+Query helpers for rendering wall posts in bulk.
+
+A page of posts is built in a constant number of queries: one for the posts
+(with author + profile joined; counts are stored on the row) and one each for
+the viewer's reactions and saves on that page.
+"""
+from .models import WallPost, PostReaction, SavedPost
+
+
+def feed_queryset():
+    """Non-deleted posts with everything the serializer needs pre-joined."""
+    return WallPost.objects.filter(is_deleted=False).select_related('user__profile')
+
+
+def viewer_context(request, posts):
+    """
+    Serializer context carrying the viewer's reactions and saves for `posts`,
+    fetched in one query each instead of one per post.
+    """
+    context = {'request': request}
+    user = getattr(request, 'user', None)
+    if not (user and user.is_authenticated):
+        return context
+
+    post_ids = [post.pk for post in posts]
+    context['viewer_reactions'] = dict(
+        PostReaction.objects.filter(user=user, post_id__in=post_ids)
+        .values_list('post_id', 'reaction_type')
+    )
+    context['viewer_saved'] = set(
+        SavedPost.objects.filter(user=user, post_id__in=post_ids)
+        .values_list('post_id', flat=True)
+    )
+    return context
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from events.search import event_index
+from wall.search import post_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text indexes over wall posts and events (SQLite; Postgres maintains its own)."
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write("This database maintains its search indexes itself; nothing to do.")
+            return
+        for label, index in (('posts', post_index), ('events', event_index)):
+            with transaction.atomic():
+                count = index.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Indexed {count} {label}."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from wall.models import WallPost
+
+
+class Command(BaseCommand):
+    help = "Recount WallPost reaction/reblast/save counters and repair any drift."
+    batch_size = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drifted posts without fixing them.")
+
+    def handle(self, *args, **options):
+        live = WallPost.live_counts()
+        annotated = WallPost.objects.annotate(**{f'live_{field}': expr for field, expr in live.items()})
+
+        drifted = Q()
+        for field in live:
+            drifted |= ~Q(**{field: F(f'live_{field}')})
+        drifted_ids = list(annotated.filter(drifted).values_list('pk', flat=True))
+
+        if not drifted_ids:
+            self.stdout.write(self.style.SUCCESS("All wall counters are in sync."))
+            return
+
+        if options['dry_run']:
+            self.stdout.write(f"{len(drifted_ids)} post(s) have drifted counters.")
+            return
+
+        for start in range(0, len(drifted_ids), self.batch_size):
+            batch = drifted_ids[start:start + self.batch_size]
+            WallPost.objects.filter(pk__in=batch).update(**WallPost.live_counts())
+        self.stdout.write(self.style.SUCCESS(f"Reconciled counters on {len(drifted_ids)} post(s)."))
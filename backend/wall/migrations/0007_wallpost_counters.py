@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:52
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    WallPost = apps.get_model('wall', 'WallPost')
+    PostReaction = apps.get_model('wall', 'PostReaction')
+    SavedPost = apps.get_model('wall', 'SavedPost')
+
+    def count_of(model, fk, **filters):
+        rows = (
+            model.objects.filter(**{fk: OuterRef('pk')}, **filters)
+            .order_by().values(fk).annotate(n=Count('pk')).values('n')
+        )
+        return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+    counts = {
+        'reaction_count': count_of(PostReaction, 'post'),
+        'reblast_count': count_of(WallPost, 'reblast_of'),
+        'save_count': count_of(SavedPost, 'post'),
+    }
+    for rtype in ('heart', 'joy', 'fire', 'mind_blown', 'hundred', 'cry'):
+        counts[f'{rtype}_count'] = count_of(PostReaction, 'post', reaction_type=rtype)
+    WallPost.objects.update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wall', '0006_alter_postreaction_id_alter_reportedpost_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wallpost',
+            name='cry_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='wallpost',
+            name='fire_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='wallpost',
+            name='heart_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='wallpost',
+            name='hundred_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='wallpost',
+            name='joy_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='wallpost',
+            name='mind_blown_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='wallpost',
+            name='reaction_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='wallpost',
+            name='reblast_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='wallpost',
+            name='save_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
 import uuid
 
+from .search import post_index
+
 class WallPost(models.Model):
     MOOD_CHOICES = [
         ('rant', 'Rant'),
@@ -26,8 +30,61 @@ class WallPost(models.Model):
     anon_name = models.CharField(max_length=50, blank=True, default="")
     anon_emoji = models.CharField(max_length=10, blank=True, default="")
 
+    # Denormalized counters, kept in sync with F() updates in the same
+    # transaction as the PostReaction / SavedPost / reblast writes.
+    # `python manage.py reconcile_wall_counters` repairs any drift.
+    reaction_count = models.IntegerField(default=0)
+    heart_count = models.IntegerField(default=0)
+    joy_count = models.IntegerField(default=0)
+    fire_count = models.IntegerField(default=0)
+    mind_blown_count = models.IntegerField(default=0)
+    hundred_count = models.IntegerField(default=0)
+    cry_count = models.IntegerField(default=0)
+    reblast_count = models.IntegerField(default=0)
+    save_count = models.IntegerField(default=0)
+
+    @staticmethod
+    def reaction_field(reaction_type):
+        return f"{reaction_type}_count"
+
+    @property
+    def reaction_counts(self):
+        return {
+            rtype: getattr(self, self.reaction_field(rtype))
+            for rtype, _ in PostReaction.REACTION_TYPES
+        }
+
+    def bump_counters(self, **deltas):
+        """Atomically add `deltas` ({field: +n/-n}) to this post's counters."""
+        WallPost.objects.filter(pk=self.pk).update(
+            **{field: F(field) + delta for field, delta in deltas.items() if delta}
+        )
+
+    @classmethod
+    def live_counts(cls):
+        """
+        Subquery expressions recounting every counter from the source tables,
+        for use in annotate()/update() when reconciling drift.
+        """
+        def count_of(model, fk, **filters):
+            rows = (
+                model.objects.filter(**{fk: OuterRef('pk')}, **filters)
+                .order_by().values(fk).annotate(n=Count('pk')).values('n')
+            )
+            return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+        counts = {
+            'reaction_count': count_of(PostReaction, 'post'),
+            'reblast_count': count_of(cls, 'reblast_of'),
+            'save_count': count_of(SavedPost, 'post'),
+        }
+        for rtype, _ in PostReaction.REACTION_TYPES:
+            counts[cls.reaction_field(rtype)] = count_of(PostReaction, 'post', reaction_type=rtype)
+        return counts
+
     def save(self, *args, **kwargs):
-        is_new = self.pk is None
+        # UUID pks are assigned on instantiation, so pk is never None here
+        is_new = self._state.adding
         if is_new:
             # Anti-abuse: check for duplicate content in last 24h by same user
             from django.utils import timezone
@@ -54,37 +111,32 @@ class WallPost(models.Model):
                 self.anon_name = random.choice(ANON_NAMES)
                 self.anon_emoji = random.choice(ANON_EMOJIS)
 
-            super().save(*args, **kwargs)
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                post_index.index(self)
+                if self.reblast_of_id:
+                    WallPost(pk=self.reblast_of_id).bump_counters(reblast_count=1)
             
-            # Lore Reward Logic
-            from accounts.models import Profile
-            profile, created = Profile.objects.get_or_create(user=self.user)
-            meta = profile.lore_meta or {}
-            posts_today = meta.get('posts_today', {"date": "", "count": 0})
-            today = timezone.now().date().isoformat()
-            
-            if posts_today['date'] != today:
-                posts_today = {"date": today, "count": 0}
-            
-            if posts_today['count'] < 2 and not duplicates:
-                profile.lore_score += 4
-                posts_today['count'] += 1
-                meta['posts_today'] = posts_today
-                profile.lore_meta = meta
-                profile.save(update_fields=['lore_score', 'lore_meta'])
+            # Lore Reward Logic (+4, max 2/day)
+            if not duplicates:
+                from accounts.lore import award_lore
+                award_lore(self.user, 'post', ref=self.pk)
         else:
-            super().save(*args, **kwargs)
+            update_fields = kwargs.get('update_fields')
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                if update_fields is None or {'title', 'content'} & set(update_fields):
+                    post_index.index(self)
 
     def delete(self, *args, **kwargs):
-        # Subtract Lore if deleted shortly after (simplified: always subtract if it was rewarded)
-        # Note: This is a basic implementation. In a real app, you'd track WHICH posts earned Lore.
-        from accounts.models import Profile
-        profile = Profile.objects.filter(user=self.user).first()
-        # We don't have perfect tracking here, but we can subtract if they still have score
-        if profile and profile.lore_score >= 4:
-            profile.lore_score -= 4
-            profile.save(update_fields=['lore_score'])
-        super().delete(*args, **kwargs)
+        # Take back the Lore this post earned, if it earned any
+        from accounts.lore import revoke_lore
+        revoke_lore(self.user, 'post', ref=self.pk)
+        with transaction.atomic():
+            if self.reblast_of_id:
+                WallPost(pk=self.reblast_of_id).bump_counters(reblast_count=-1)
+            post_index.remove(self)
+            return super().delete(*args, **kwargs)
 
     def __str__(self):
         return f"{self.mood}: {self.content[:20]}..."
@@ -105,6 +157,41 @@ class PostReaction(models.Model):
     class Meta:
         unique_together = ('post', 'user') # One reaction per user per post
 
+    @classmethod
+    def toggle(cls, post, user, reaction_type):
+        """
+        Add, switch or (if the same type is sent twice) remove `user`'s reaction,
+        updating the post's counters in the same transaction.
+        Returns "reaction_added" or "reaction_removed".
+        """
+        with transaction.atomic():
+            reaction = cls.objects.select_for_update().filter(post=post, user=user).first()
+            new_field = WallPost.reaction_field(reaction_type)
+
+            if reaction is None:
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(post=post, user=user, reaction_type=reaction_type)
+                except IntegrityError:
+                    # A parallel first reaction inserted the row after our
+                    # SELECT (there was nothing to lock); apply this one on top
+                    reaction = cls.objects.select_for_update().get(post=post, user=user)
+                else:
+                    post.bump_counters(reaction_count=1, **{new_field: 1})
+                    return "reaction_added"
+
+            old_field = WallPost.reaction_field(reaction.reaction_type)
+            if reaction.reaction_type == reaction_type:
+                # If same reaction, toggle off
+                reaction.delete()
+                post.bump_counters(reaction_count=-1, **{old_field: -1})
+                return "reaction_removed"
+
+            reaction.reaction_type = reaction_type
+            reaction.save(update_fields=['reaction_type'])
+            post.bump_counters(**{old_field: -1, new_field: 1})
+            return "reaction_added"
+
 class SavedPost(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='saved_posts')
     post = models.ForeignKey(WallPost, on_delete=models.CASCADE, related_name='saved_by')
@@ -113,6 +200,18 @@ class SavedPost(models.Model):
     class Meta:
         unique_together = ('user', 'post')
 
+    @classmethod
+    def toggle(cls, user, post):
+        """Save or unsave `post` for `user`. Returns "saved" or "unsaved"."""
+        with transaction.atomic():
+            saved, created = cls.objects.get_or_create(user=user, post=post)
+            if created:
+                post.bump_counters(save_count=1)
+                return "saved"
+            saved.delete()
+            post.bump_counters(save_count=-1)
+            return "unsaved"
+
 class ReportedPost(models.Model):
     REPORT_REASONS = [
         ('harassment', 'Harassment'),
@@ -0,0 +1,9 @@
+"""
+Full-text index over wall posts (see config.search).
+
+Only a post's own text is indexed: never its author, so searching can't
+reveal who wrote an anonymous post.
+"""
+from config.search import SearchIndex
+
+post_index = SearchIndex('wall_wallpost', {'title': 'A', 'content': 'B'})
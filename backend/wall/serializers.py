@@ -4,10 +4,9 @@ from accounts.serializers import UserSerializer
 
 class WallPostSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
-    reaction_count = serializers.IntegerField(source='reactions.count', read_only=True)
+    reaction_counts = serializers.DictField(child=serializers.IntegerField(), read_only=True)
     can_delete = serializers.SerializerMethodField()
 
-    reblast_count = serializers.IntegerField(source='reblasts.count', read_only=True)
     is_saved = serializers.SerializerMethodField()
     my_reaction = serializers.SerializerMethodField()
 
@@ -15,11 +14,14 @@ class WallPostSerializer(serializers.ModelSerializer):
         model = WallPost
         fields = [
             'id', 'user', 'title', 'content', 'mood', 'created_at', 
-            'reaction_count', 'reblast_count', 'can_delete', 
+            'reaction_count', 'reaction_counts', 'reblast_count', 'save_count', 'can_delete', 
             'is_saved', 'my_reaction', 'reblast_of',
             'is_anonymous', 'anon_name', 'anon_emoji'
         ]
-        read_only_fields = ['id', 'user', 'created_at', 'anon_name', 'anon_emoji']
+        read_only_fields = [
+            'id', 'user', 'created_at', 'anon_name', 'anon_emoji',
+            'reaction_count', 'reblast_count', 'save_count',
+        ]
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -35,15 +37,21 @@ class WallPostSerializer(serializers.ModelSerializer):
             # (get_can_delete already handles this via obj.user == request.user)
         return data
 
+    # Viewer state comes pre-fetched from wall.feed when rendering a page;
+    # fall back to per-object queries for one-off serializations.
     def get_is_saved(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if 'viewer_saved' in self.context:
+                return obj.pk in self.context['viewer_saved']
             return obj.saved_by.filter(user=request.user).exists()
         return False
 
     def get_my_reaction(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if 'viewer_reactions' in self.context:
+                return self.context['viewer_reactions'].get(obj.pk)
             reaction = obj.reactions.filter(user=request.user).first()
             return reaction.reaction_type if reaction else None
         return None
@@ -51,5 +59,5 @@ class WallPostSerializer(serializers.ModelSerializer):
     def get_can_delete(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.user == request.user
+            return obj.user_id == request.user.pk
         return False
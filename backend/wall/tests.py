@@ -1,3 +1,341 @@
+import asyncio
+import base64
+from datetime import timedelta
+import json
+import uuid
+import zlib
+from io import StringIO
+from unittest import mock
+
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User, Profile
+from config.pagination import decode_cursor
+from .broadcast import BroadcastOutbox, group_send_all, shard_group
+from .consumers import WallConsumer
+from .models import WallPost, PostReaction, SavedPost
+from .protocol import PROTOCOL_VERSION, msgpack
+from .search import post_index
+
+
+def make_user(name):
+    user = User.objects.create_user(username=name, email=f'{name}@campus.test')
+    Profile.objects.create(user=user, nickname=name)
+    return user
+
+
+class WallFeedTests(TestCase):
+    def setUp(self):
+        self.viewer = make_user('viewer')
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def _populate(self, n):
+        for i in range(n):
+            author = make_user(f'author{WallPost.objects.count()}')
+            post = WallPost.objects.create(user=author, content=f'post {i}', is_anonymous=i % 2 == 0)
+            PostReaction.toggle(post, self.viewer, 'fire')
+            SavedPost.toggle(self.viewer, post)
+            WallPost.objects.create(user=self.viewer, content=f'reblast {i}', reblast_of=post)
+
+    def _feed_queries(self, limit):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/posts/feed/', {'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_feed_query_count_is_constant(self):
+        self._populate(2)
+        small, _ = self._feed_queries(limit=4)
+        self._populate(10)
+        large, data = self._feed_queries(limit=24)
+        self.assertEqual(len(data['results']), 24)
+        self.assertEqual(small, large)
+
+    def test_feed_reports_counts_and_viewer_state(self):
+        self._populate(1)
+        original = WallPost.objects.get(reblast_of__isnull=True)
+        _, data = self._feed_queries(limit=10)
+        row = next(p for p in data['results'] if p['id'] == str(original.id))
+        self.assertEqual(row['reaction_count'], 1)
+        self.assertEqual(row['reblast_count'], 1)
+        self.assertEqual(row['my_reaction'], 'fire')
+        self.assertTrue(row['is_saved'])
+
+    def test_feed_cursor_walks_every_post_once(self):
+        self._populate(5)
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get('/api/posts/feed/', params).json()
+            seen.extend(p['id'] for p in data['results'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        expected = [str(pk) for pk in WallPost.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)]
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/posts/feed/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_well_formed_cursor_with_a_bad_pk_is_rejected(self):
+        cursor = base64.urlsafe_b64encode(b'2020-01-01T00:00:00|nope').decode()
+        response = self.client.get('/api/posts/feed/', {'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_without_an_offset_is_read_as_utc(self):
+        post = WallPost.objects.create(user=self.viewer, content='hello')
+        raw = f"{post.created_at.replace(tzinfo=None).isoformat()}|{post.pk}"
+        self.assertEqual(decode_cursor(base64.urlsafe_b64encode(raw.encode()).decode()), (post.created_at, post.pk))
+
+
+class WallCounterTests(TestCase):
+    def setUp(self):
+        self.author = make_user('author')
+        self.fan = make_user('fan')
+        self.post = WallPost.objects.create(user=self.author, content='hello')
+
+    def test_reaction_toggle_keeps_counters_in_sync(self):
+        PostReaction.toggle(self.post, self.fan, 'fire')
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.reaction_count, self.post.fire_count), (1, 1))
+
+        PostReaction.toggle(self.post, self.fan, 'joy')
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.reaction_count, self.post.fire_count, self.post.joy_count), (1, 0, 1))
+
+        PostReaction.toggle(self.post, self.fan, 'joy')
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.reaction_count, self.post.joy_count), (0, 0))
+
+    def test_racing_first_reactions_do_not_fail(self):
+        PostReaction.toggle(self.post, self.fan, 'fire')
+        # The SELECT ran before the parallel reaction's INSERT committed
+        with mock.patch.object(QuerySet, 'first', autospec=True, return_value=None):
+            self.assertEqual(PostReaction.toggle(self.post, self.fan, 'joy'), 'reaction_added')
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.reaction_count, self.post.fire_count, self.post.joy_count), (1, 0, 1))
+
+    def test_react_endpoint_returns_stored_counts(self):
+        client = APIClient()
+        client.force_authenticate(self.fan)
+        data = client.post(f'/api/posts/{self.post.id}/react/', {'reaction_type': 'heart'}).json()
+        self.assertEqual(data['reaction_count'], 1)
+        self.assertEqual(data['reaction_counts']['heart'], 1)
+
+    def test_save_and_reblast_counters(self):
+        SavedPost.toggle(self.fan, self.post)
+        reblast = WallPost.objects.create(user=self.fan, content='again', reblast_of=self.post)
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.save_count, self.post.reblast_count), (1, 1))
+
+        reblast.delete()
+        SavedPost.toggle(self.fan, self.post)
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.save_count, self.post.reblast_count), (0, 0))
+
+    def test_reconcile_command_repairs_drift(self):
+        PostReaction.objects.create(post=self.post, user=self.fan, reaction_type='cry')
+        WallPost.objects.filter(pk=self.post.pk).update(save_count=7)
+
+        call_command('reconcile_wall_counters', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.reaction_count, self.post.cry_count, self.post.save_count), (1, 1, 0))
+
+
+class WallBroadcastTests(TestCase):
+    def test_shard_assignment_is_stable(self):
+        self.assertEqual(shard_group('specific.abc!123'), shard_group('specific.abc!123'))
+
+    async def test_broadcast_reaches_every_shard(self):
+        sockets = [WebsocketCommunicator(WallConsumer.as_asgi(), '/ws/wall/') for _ in range(20)]
+        for socket in sockets:
+            connected, _ = await socket.connect()
+            self.assertTrue(connected)
+
+        await group_send_all(get_channel_layer(), {
+            'type': 'wall_update',
+            'message': {'type': 'post_deleted', 'post': {'id': 'x'}},
+        })
+        for socket in sockets:
+            self.assertEqual(await socket.receive_json_from(), {'type': 'post_deleted', 'post': {'id': 'x'}})
+            await socket.disconnect()
+
+
+class BroadcastOutboxTests(TestCase):
+    async def test_bursts_for_one_key_collapse_into_one_message(self):
+        outbox = BroadcastOutbox(window=0.01)
+        outbox.bind_loop(asyncio.get_running_loop())
+        socket = WebsocketCommunicator(WallConsumer.as_asgi(), '/ws/wall/')
+        await socket.connect()
+
+        for count in range(10):
+            outbox.enqueue({'type': 'reaction_updated', 'post': {'id': 'p', 'reaction_count': count}},
+                           key=('reaction_updated', 'p'))
+        outbox.enqueue(lambda: {'type': 'post_deleted', 'post': {'id': 'q'}})
+
+        first = await socket.receive_json_from()
+        second = await socket.receive_json_from()
+        self.assertEqual(first['post'], {'id': 'p', 'reaction_count': 9})
+        self.assertEqual(second['type'], 'post_deleted')
+        self.assertTrue(await socket.receive_nothing())
+        await socket.disconnect()
+
+    def test_writes_publish_only_after_commit(self):
+        author, fan = make_user('author'), make_user('fan')
+        post = WallPost.objects.create(user=author, content='hi')
+        client = APIClient()
+        client.force_authenticate(fan)
+
+        with mock.patch('wall.broadcast.outbox.enqueue') as enqueue:
+            with self.captureOnCommitCallbacks() as callbacks:
+                client.post(f'/api/posts/{post.id}/react/', {'reaction_type': 'fire'})
+            enqueue.assert_not_called()
+            for callback in callbacks:
+                callback()
+        message, key = enqueue.call_args.args
+        self.assertEqual(set(message['post']), {'id', 'reaction_count', 'reaction_counts'})
+        self.assertEqual(message['post']['reaction_counts']['fire'], 1)
+        self.assertEqual(key, ('reaction_updated', str(post.id)))
+
+
+class WallProtocolTests(TestCase):
+    message = {'type': 'reaction_updated', 'v': PROTOCOL_VERSION, 'post': {'id': 'p', 'reaction_count': 3}}
+
+    async def _receive(self, path):
+        socket = WebsocketCommunicator(WallConsumer.as_asgi(), path)
+        await socket.connect()
+        await group_send_all(get_channel_layer(), {'type': 'wall_update', 'message': self.message})
+        frame = await socket.receive_output()
+        await socket.disconnect()
+        return frame
+
+    async def test_default_framing_is_json_text(self):
+        frame = await self._receive('/ws/wall/')
+        self.assertEqual(json.loads(frame['text']), self.message)
+
+    async def test_msgpack_framing(self):
+        frame = await self._receive('/ws/wall/?format=msgpack')
+        self.assertEqual(msgpack.unpackb(frame['bytes']), self.message)
+
+    async def test_deflate_framing(self):
+        frame = await self._receive('/ws/wall/?format=deflate')
+        inflated = zlib.decompressobj(wbits=-zlib.MAX_WBITS).decompress(frame['bytes'])
+        self.assertEqual(json.loads(inflated), self.message)
+
+
+class WallSearchTests(TestCase):
+    def setUp(self):
+        self.author = make_user('rohan')
+        self.client = APIClient()
+
+    def post(self, content, title='', **fields):
+        return WallPost.objects.create(user=self.author, title=title, content=content, **fields)
+
+    def search(self, q, **params):
+        response = self.client.get('/api/posts/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def ids(self, q):
+        return [row['id'] for row in self.search(q)['results']]
+
+    def test_ranks_title_matches_first_and_matches_prefixes(self):
+        body = self.post('the canteen samosa ran out again')
+        titled = self.post('nothing to add', title='Samosa shortage')
+        self.post('library is closed')
+        self.assertEqual(self.ids('samosa'), [str(titled.id), str(body.id)])
+        self.assertEqual(self.ids('canteen sam'), [str(body.id)])
+        # Stemming, and operators in user input are just words
+        self.assertEqual(self.ids('samosas'), [str(titled.id), str(body.id)])
+        self.assertEqual(self.ids('"samosa" OR NEAR('), [])
+
+    def test_index_follows_edits_soft_and_hard_deletes(self):
+        post = self.post('midnight maggi run')
+        post.content = 'midnight chai run'
+        post.save()
+        self.assertEqual(self.ids('maggi'), [])
+        self.assertEqual(self.ids('chai'), [str(post.id)])
+
+        WallPost.objects.filter(pk=post.pk).update(is_deleted=True)
+        self.assertEqual(self.ids('chai'), [])
+        WallPost.objects.filter(pk=post.pk).update(is_deleted=False)
+        post.delete()
+        self.assertEqual(self.ids('chai'), [])
+
+    def test_anonymous_posts_stay_anonymous(self):
+        post = self.post('who keeps stealing my cycle', is_anonymous=True)
+        self.assertEqual(self.ids('rohan'), [])
+        row = self.search('cycle')['results'][0]
+        self.assertEqual(row['id'], str(post.id))
+        self.assertNotIn('username', row['user'])
+        self.assertEqual(row['user']['profile']['nickname'], post.anon_name)
+
+    def test_pages_by_offset(self):
+        for i in range(5):
+            self.post(f'hostel wifi is down again, day {i}')
+        first = self.search('wifi', limit=3)
+        rest = self.search('wifi', limit=3, offset=first['next_offset'])
+        self.assertEqual(len(first['results']) + len(rest['results']), 5)
+        self.assertIsNone(rest['next_offset'])
+        self.assertEqual(self.client.get('/api/posts/search/').status_code, 400)
+
+    def test_admin_search_uses_the_index_and_exact_usernames(self):
+        from django.contrib.admin.sites import site
+
+        post = self.post('lost my id card near the gate')
+        other = WallPost.objects.create(user=make_user('meera'), content='found a card')
+        admin = site._registry[WallPost]
+        results, _ = admin.get_search_results(None, WallPost.objects.all(), 'gate')
+        self.assertEqual(list(results), [post])
+        results, _ = admin.get_search_results(None, WallPost.objects.all(), 'meera')
+        self.assertEqual(list(results), [other])
+
+    def test_ranks_only_the_newest_matches(self):
+        posts = [self.post(f'hostel wifi is down again, day {i}') for i in range(3)]
+        for age, post in enumerate(reversed(posts)):
+            WallPost.objects.filter(pk=post.pk).update(created_at=timezone.now() - timedelta(hours=age))
+        post_index.rebuild()
+        ranked = post_index.search(WallPost.objects.all(), 'wifi', window=2)
+        self.assertEqual(set(ranked.values_list('pk', flat=True)), {posts[1].pk, posts[2].pk})
+        self.assertEqual(post_index.search(WallPost.objects.all(), 'wifi', window=None).count(), 3)
+
+    def test_newer_soft_deleted_matches_do_not_crowd_out_visible_ones(self):
+        visible = self.post('hostel wifi is down')
+        deleted = [self.post(f'hostel wifi is down again, day {i}', is_deleted=True) for i in range(3)]
+        for age, post in enumerate(reversed([visible, *deleted])):
+            WallPost.objects.filter(pk=post.pk).update(created_at=timezone.now() - timedelta(hours=age))
+        post_index.rebuild()
+        found = post_index.search(WallPost.objects.filter(is_deleted=False), 'wifi', window=3)
+        self.assertEqual(list(found), [visible])
+
+    def test_rows_sharing_a_rowid_both_stay_searchable(self):
+        # Same millisecond, same low UUID bits: the second row probes on
+        posts = [self.post('hostel wifi', id=uuid.UUID(int=n << 100 | 7)) for n in (1, 2)]
+        WallPost.objects.filter(pk__in=[post.pk for post in posts]).update(created_at=posts[0].created_at)
+        post_index.rebuild()
+        self.assertEqual(set(self.ids('wifi')), {str(post.id) for post in posts})
+
+        for post in WallPost.objects.filter(pk__in=[post.pk for post in posts]):
+            post.content = 'hostel wifi is back'
+            post.save()
+        self.assertEqual(len(self.ids('wifi')), 2)
+        WallPost.objects.get(pk=posts[0].pk).delete()
+        self.assertEqual(self.ids('back'), [str(posts[1].id)])
 
-# Create your tests here.
+    def test_rebuild_indexes_bulk_created_posts(self):
+        WallPost.objects.bulk_create([WallPost(user=self.author, content='bulk imported confession')])
+        self.assertEqual(self.ids('confession'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.ids('confession')), 1)
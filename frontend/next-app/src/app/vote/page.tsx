@@ -47,6 +47,9 @@ export default function VotePage() {
                 ));
             } else if (data.type === 'event_deleted') {
                 setPendingEvents(prev => prev.filter(e => e.id !== data.event.id));
+            } else if (data.type === 'events_rejected') {
+                const rejected = new Set(data.events.map((e: any) => e.id));
+                setPendingEvents(prev => prev.filter(e => !rejected.has(e.id)));
             }
         };
 
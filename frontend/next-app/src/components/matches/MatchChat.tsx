@@ -17,22 +17,73 @@ export function MatchChat({ matchId, isLocked, expiresAt }: MatchChatProps) {
     const [loading, setLoading] = useState(false);
     const scrollRef = useRef<HTMLDivElement>(null);
 
-    const fetchMessages = async () => {
-        if (isLocked) return;
-        try {
-            const res = await api.get(`/mutual/${matchId}/messages/`);
-            setMessages(res.data);
-        } catch (err) {
-            console.error("Failed to fetch messages:", err);
-        }
+    const [partnerTyping, setPartnerTyping] = useState(false);
+    const socketRef = useRef<WebSocket | null>(null);
+    const lastIdRef = useRef<number | null>(null);
+    const typingRef = useRef(false);
+
+    const addMessages = (incoming: any[]) => {
+        if (!incoming.length) return;
+        lastIdRef.current = Math.max(lastIdRef.current ?? 0, ...incoming.map(m => m.id));
+        setMessages(prev => {
+            const known = new Set(prev.filter(m => !m.pending).map(m => m.id));
+            const fresh = incoming.filter(m => !known.has(m.id));
+            // A confirmed message of ours replaces its optimistic copy
+            const confirmed = new Set(fresh.filter(m => m.is_me).map(m => m.text));
+            return [...prev.filter(m => !(m.pending && confirmed.has(m.text))), ...fresh];
+        });
     };
 
     useEffect(() => {
-        fetchMessages();
-        const interval = setInterval(fetchMessages, 5000);
-        return () => clearInterval(interval);
+        if (isLocked) return;
+        let closed = false;
+        let retry: ReturnType<typeof setTimeout>;
+
+        const connect = () => {
+            // First open gets the latest messages; a reconnect replays only
+            // what we missed since the last message we saw
+            const token = localStorage.getItem('token') || '';
+            const after = lastIdRef.current !== null ? `&after_id=${lastIdRef.current}` : '';
+            const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+            const ws = new WebSocket(`${wsProtocol}//localhost:8000/ws/matches/${matchId}/chat/?token=${token}${after}`);
+            socketRef.current = ws;
+
+            ws.onmessage = (event) => {
+                const data = JSON.parse(event.data);
+                if (data.type === 'history') {
+                    addMessages(data.messages);
+                    // Long replays come in pages; keep asking until caught up
+                    if (data.next_after_id != null) {
+                        ws.send(JSON.stringify({ type: 'history', after_id: data.next_after_id }));
+                    }
+                } else if (data.type === 'message') {
+                    addMessages([data.message]);
+                    if (!data.message.is_me) setPartnerTyping(false);
+                } else if (data.type === 'typing') {
+                    setPartnerTyping(data.is_typing);
+                }
+            };
+            ws.onclose = (event) => {
+                // 4403: not allowed (chat locked or not our match), 4410: expired; don't retry
+                if (!closed && event.code !== 4403 && event.code !== 4410) retry = setTimeout(connect, 2000);
+            };
+        };
+
+        connect();
+        return () => {
+            closed = true;
+            clearTimeout(retry);
+            socketRef.current?.close();
+        };
     }, [matchId, isLocked]);
 
+    const sendTyping = (isTyping: boolean) => {
+        const ws = socketRef.current;
+        if (ws?.readyState !== WebSocket.OPEN || typingRef.current === isTyping) return;
+        typingRef.current = isTyping;
+        ws.send(JSON.stringify({ type: 'typing', is_typing: isTyping }));
+    };
+
     useEffect(() => {
         if (scrollRef.current) {
             scrollRef.current.scrollTop = scrollRef.current.scrollHeight;
@@ -43,14 +94,21 @@ export function MatchChat({ matchId, isLocked, expiresAt }: MatchChatProps) {
         e.preventDefault();
         if (!text.trim() || loading || isLocked) return;
 
-        const optimisticMsg = { id: Date.now(), text, is_me: true, created_at: new Date().toISOString() };
+        const optimisticMsg = { id: `pending-${Date.now()}`, text, is_me: true, pending: true, created_at: new Date().toISOString() };
         setMessages(prev => [...prev, optimisticMsg]);
         const currentText = text;
         setText("");
+        sendTyping(false);
 
+        const ws = socketRef.current;
+        if (ws?.readyState === WebSocket.OPEN) {
+            ws.send(JSON.stringify({ type: 'message', text: currentText }));
+            return;
+        }
         try {
-            await api.post(`/mutual/${matchId}/send_message/`, { text: currentText });
-            fetchMessages();
+            // Socket down: the REST write is still pushed to everyone connected
+            const res = await api.post(`/mutual/${matchId}/send_message/`, { text: currentText });
+            addMessages([res.data]);
         } catch (err) {
             console.error("Send failed:", err);
         }
@@ -100,6 +158,10 @@ export function MatchChat({ matchId, isLocked, expiresAt }: MatchChatProps) {
                     ))}
                 </AnimatePresence>
 
+                {partnerTyping && !isLocked && (
+                    <p className="text-[10px] font-black text-white/30 uppercase tracking-widest">typing...</p>
+                )}
+
                 {isLocked && (
                     <div className="absolute inset-0 bg-campus-dark/40 backdrop-blur-sm z-10 flex flex-col items-center justify-center p-12 text-center">
                         <div className="w-16 h-16 bg-white/5 rounded-3xl flex items-center justify-center mb-6 border border-white/10">
@@ -119,7 +181,11 @@ export function MatchChat({ matchId, isLocked, expiresAt }: MatchChatProps) {
                     <input
                         type="text"
                         value={text}
-                        onChange={(e) => setText(e.target.value)}
+                        onChange={(e) => {
+                            setText(e.target.value);
+                            sendTyping(e.target.value.length > 0);
+                        }}
+                        onBlur={() => sendTyping(false)}
                         disabled={isLocked}
                         placeholder={isLocked ? "Confirm meetup to unlock..." : "Say something chaotic..."}
                         className="w-full bg-white/5 border border-white/10 rounded-2xl py-4 pl-6 pr-14 text-xs font-bold text-white placeholder:text-white/20 focus:outline-none focus:ring-2 focus:ring-campus-accent/50 focus:border-transparent transition-all"